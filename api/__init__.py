@@ -1,10 +1,60 @@
 """
 API client module for JSONPlaceholder API.
+
+The client classes are imported on first access, so ``import api`` (and
+importing a light submodule such as ``api.models``) does not load ``requests``,
+``httpx`` or the other clients.
 """
 
-from api.base_api_client import BaseAPIClient
-from api.user_api import UserAPI
-from api.post_api import PostAPI
-from api.comment_api import CommentAPI
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from api.async_base_api_client import AsyncBaseAPIClient
+    from api.async_comment_api import AsyncCommentAPI
+    from api.async_post_api import AsyncPostAPI
+    from api.async_resource_api import AsyncAlbumAPI, AsyncPhotoAPI, AsyncTodoAPI
+    from api.async_user_api import AsyncUserAPI
+    from api.base_api_client import BaseAPIClient
+    from api.batch import BatchResult
+    from api.comment_api import CommentAPI
+    from api.post_api import PostAPI
+    from api.resource_api import AlbumAPI, PhotoAPI, TodoAPI
+    from api.response import APIResponse
+    from api.user_api import UserAPI
+
+_EXPORTS = {
+    "BaseAPIClient": "api.base_api_client",
+    "UserAPI": "api.user_api",
+    "PostAPI": "api.post_api",
+    "CommentAPI": "api.comment_api",
+    "TodoAPI": "api.resource_api",
+    "AlbumAPI": "api.resource_api",
+    "PhotoAPI": "api.resource_api",
+    "AsyncBaseAPIClient": "api.async_base_api_client",
+    "AsyncUserAPI": "api.async_user_api",
+    "AsyncPostAPI": "api.async_post_api",
+    "AsyncCommentAPI": "api.async_comment_api",
+    "AsyncTodoAPI": "api.async_resource_api",
+    "AsyncAlbumAPI": "api.async_resource_api",
+    "AsyncPhotoAPI": "api.async_resource_api",
+    "BatchResult": "api.batch",
+    "APIResponse": "api.response",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    """Import an exported class on first access and keep it on the package."""
+    try:
+        module = _EXPORTS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = globals()[name] = getattr(import_module(module), name)
+    return value
+
 
-__all__ = ["BaseAPIClient", "UserAPI", "PostAPI", "CommentAPI"]
+def __dir__():
+    """List the exported classes along with the loaded attributes."""
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,205 @@
+"""
+Async Base API Client sharing one bounded connection pool per base URL.
+"""
+
+import asyncio
+import time
+import weakref
+from functools import partial
+
+import httpx
+from api.batch import run_batch_async
+from api.circuit_breaker import get_circuit_breaker
+from api.concurrency import get_concurrency_limiter
+from api.endpoints import install_endpoints
+from api.metrics import HTTPXTrace, endpoint_template, get_recorder, sample_from_httpx
+from api.rate_limit import get_rate_limiter
+from api.request_log import get_request_log
+from api.single_flight import flight_key, get_async_single_flight
+from api.transport import async_transport
+from config import get_config
+
+# One pool per (event loop, base URL); httpx connections are bound to the loop
+# that opened them, so pools cannot be shared across loops.
+_pools = weakref.WeakKeyDictionary()
+
+
+class AsyncConnectionPool:
+    """Keep-alive connection pool with a limit on in-flight requests."""
+
+    def __init__(self, base_url: str, config):
+        """Create the underlying httpx client and in-flight semaphore."""
+        self.base_url = base_url
+        limits = httpx.Limits(
+            max_connections=config.MAX_CONNECTIONS,
+            max_keepalive_connections=config.MAX_KEEPALIVE_CONNECTIONS,
+        )
+        self.client = httpx.AsyncClient(
+            verify=config.VERIFY_SSL,
+            limits=limits,
+            # Waiting for a free connection is bounded by the semaphore, not by a timeout.
+            timeout=httpx.Timeout(config.TIMEOUT, pool=None),
+            transport=async_transport(config, limits),
+        )
+        self.semaphore = asyncio.Semaphore(config.MAX_IN_FLIGHT)
+        self.refcount = 0
+
+    async def request(self, method: str, url: str, **kwargs):
+        """Send a request once an in-flight slot is available."""
+        async with self.semaphore:
+            return await self.client.request(method, url, **kwargs)
+
+    async def aclose(self):
+        """Close all pooled connections."""
+        await self.client.aclose()
+
+
+def get_pool(config) -> AsyncConnectionPool:
+    """Get the shared pool for the config's base URL on the running loop."""
+    loop = asyncio.get_running_loop()
+    pools = _pools.setdefault(loop, {})
+    key = (config.BASE_URL, config.VERIFY_SSL)
+    if key not in pools:
+        pools[key] = AsyncConnectionPool(config.BASE_URL, config)
+    return pools[key]
+
+
+async def release_pool(pool: AsyncConnectionPool):
+    """Drop a reference to a pool and close it when no client uses it."""
+    pool.refcount -= 1
+    if pool.refcount > 0:
+        return
+    pools = _pools.get(asyncio.get_running_loop(), {})
+    for key, value in list(pools.items()):
+        if value is pool:
+            del pools[key]
+    await pool.aclose()
+
+
+class AsyncBaseAPIClient:
+    """Base class for all async API clients; subclasses naming a ``resource`` get its generated endpoint methods."""
+
+    resource = None
+
+    def __init_subclass__(cls, **kwargs):
+        """Generate the async methods of the subclass's registered resource."""
+        super().__init_subclass__(**kwargs)
+        if vars(cls).get("resource"):
+            install_endpoints(cls, cls.resource, asynchronous=True)
+
+    def __init__(self, config=None, metrics=None):
+        """Initialize the API client with configuration and an optional metrics recorder."""
+        self.config = config or get_config()
+        self.base_url = self.config.BASE_URL
+        self.timeout = self.config.TIMEOUT
+        self.verify_ssl = self.config.VERIFY_SSL
+        self.batch_concurrency = self.config.BATCH_CONCURRENCY
+        self.metrics = metrics if metrics is not None else get_recorder(self.config)
+        self.request_log = get_request_log(self.config)
+        self.rate_limiter = get_rate_limiter(self.config)
+        self.circuit_breaker = get_circuit_breaker(self.config, self.base_url)
+        self.concurrency = get_concurrency_limiter(self.config, self.base_url)
+        self._pool = None
+
+    @property
+    def pool(self) -> AsyncConnectionPool:
+        """Get the shared connection pool, acquiring it on first use."""
+        if self._pool is None:
+            self._pool = get_pool(self.config)
+            self._pool.refcount += 1
+        return self._pool
+
+    async def _request(self, method: str, endpoint: str, template: str = None, **kwargs):
+        """Perform a request, sharing identical in-flight GETs on this loop.
+
+        ``template`` is the endpoint's metrics template; it is derived from ``endpoint`` when not given.
+        """
+        url = f"{self.base_url}{endpoint}"
+        template = template or endpoint_template(endpoint)
+        single_flight = get_async_single_flight(self.config) if method == "GET" else None
+        if single_flight is None:
+            return await self._send(method, url, template, kwargs)
+        key = flight_key(url, kwargs.get("params"), kwargs.get("headers"))
+        return await single_flight.do(key, partial(self._send, method, url, template, kwargs))
+
+    async def _send(self, method: str, url: str, template: str, kwargs: dict):
+        """Send a request through the shared pool and the host's breaker and limits."""
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.allow()
+        try:
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire_async()
+            if self.concurrency is not None:
+                await self.concurrency.acquire_async()
+        except BaseException:
+            # Cancelled or timed out before sending; hand back a half-open probe so the breaker is not stuck on it.
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.release()
+            raise
+        trace = HTTPXTrace()
+        response = None
+        try:
+            if self.metrics is None and self.request_log is None:
+                response = await self.pool.request(method, url, timeout=self.timeout, **kwargs)
+            else:
+                response = await self.pool.request(
+                    method, url, timeout=self.timeout, extensions={"trace": trace}, **kwargs
+                )
+        finally:
+            total = time.perf_counter() - trace.started
+            status_code = response.status_code if response is not None else None
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.record(status_code)
+            if self.concurrency is not None:
+                self.concurrency.release(total, status_code is not None and status_code < 500)
+            if self.metrics is not None or self.request_log is not None:
+                sample = sample_from_httpx(method, template, total, response, trace)
+                if self.metrics is not None:
+                    self.metrics.record(sample)
+                if self.request_log is not None:
+                    self.request_log.record(sample)
+        return response
+
+    async def _call(self, method: str, endpoint: str, template: str, params: dict, json, headers: dict):
+        """Dispatch a generated endpoint method with its formatted path and precompiled metrics template."""
+        if method == "GET":
+            return await self._request("GET", endpoint, template, params=params, headers=headers)
+        return await self._request(method, endpoint, template, json=json, headers=headers)
+
+    async def get(self, endpoint: str, params: dict = None, headers: dict = None):
+        """Perform a GET request."""
+        return await self._request("GET", endpoint, params=params, headers=headers)
+
+    async def post(self, endpoint: str, json: dict = None, data: dict = None, headers: dict = None):
+        """Perform a POST request."""
+        return await self._request("POST", endpoint, json=json, data=data, headers=headers)
+
+    async def put(self, endpoint: str, json: dict = None, data: dict = None, headers: dict = None):
+        """Perform a PUT request."""
+        return await self._request("PUT", endpoint, json=json, data=data, headers=headers)
+
+    async def patch(self, endpoint: str, json: dict = None, data: dict = None, headers: dict = None):
+        """Perform a PATCH request."""
+        return await self._request("PATCH", endpoint, json=json, data=data, headers=headers)
+
+    async def delete(self, endpoint: str, headers: dict = None):
+        """Perform a DELETE request."""
+        return await self._request("DELETE", endpoint, headers=headers)
+
+    async def batch(self, func, items, concurrency: int = None):
+        """Await ``func`` for every item concurrently on this client's pool, in input order."""
+        return await run_batch_async(func, items, concurrency or self.batch_concurrency)
+
+    async def close(self):
+        """Release the shared pool."""
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
+            await release_pool(pool)
+
+    async def __aenter__(self):
+        """Enter the async context manager."""
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        """Release the shared pool on exit."""
+        await self.close()
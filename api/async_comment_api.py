@@ -0,0 +1,11 @@
+"""
+Async comment API client for managing comment endpoints.
+"""
+
+from api.async_base_api_client import AsyncBaseAPIClient
+
+
+class AsyncCommentAPI(AsyncBaseAPIClient):
+    """Async client for Comment API endpoints, generated from the ``comments`` resource in ``api.endpoints``."""
+
+    resource = "comments"
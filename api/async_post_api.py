@@ -0,0 +1,11 @@
+"""
+Async post API client for managing post endpoints.
+"""
+
+from api.async_base_api_client import AsyncBaseAPIClient
+
+
+class AsyncPostAPI(AsyncBaseAPIClient):
+    """Async client for Post API endpoints, generated from the ``posts`` resource in ``api.endpoints``."""
+
+    resource = "posts"
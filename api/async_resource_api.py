@@ -0,0 +1,40 @@
+"""
+Async clients for the todos, albums and photos resources.
+"""
+
+from api.async_base_api_client import AsyncBaseAPIClient
+from api.endpoints import RESOURCES
+
+_classes = {}
+
+
+class AsyncTodoAPI(AsyncBaseAPIClient):
+    """Async client for Todo API endpoints."""
+
+    resource = "todos"
+
+
+class AsyncAlbumAPI(AsyncBaseAPIClient):
+    """Async client for Album API endpoints."""
+
+    resource = "albums"
+
+
+class AsyncPhotoAPI(AsyncBaseAPIClient):
+    """Async client for Photo API endpoints."""
+
+    resource = "photos"
+
+
+def async_client_class(name: str) -> type:
+    """Get an async client class for a registered resource, generating it once per registration."""
+    resource = RESOURCES.get(name)
+    if resource is None:
+        raise ValueError(f"Unknown resource {name!r}, register it in api.endpoints first")
+    cls = _classes.get(resource)
+    if cls is None:
+        title = resource.item.title().replace("_", "")
+        cls = _classes[resource] = type(f"Async{title}API", (AsyncBaseAPIClient,), {
+            "__doc__": f"Async client for {title} API endpoints.", "__module__": __name__, "resource": name,
+        })
+    return cls
@@ -0,0 +1,11 @@
+"""
+Async user API client for managing user endpoints.
+"""
+
+from api.async_base_api_client import AsyncBaseAPIClient
+
+
+class AsyncUserAPI(AsyncBaseAPIClient):
+    """Async client for User API endpoints, generated from the ``users`` resource in ``api.endpoints``."""
+
+    resource = "users"
@@ -2,7 +2,23 @@
 Base API Client with common methods for all API endpoints.
 """
 
+import time
+from functools import partial
+
 import requests
+from api.batch import iter_batch, run_batch
+from api.cache import CacheEntry, cache_key, get_cache, is_storable
+from api.circuit_breaker import get_circuit_breaker
+from api.concurrency import get_concurrency_limiter
+from api.endpoints import install_endpoints
+from api.metrics import endpoint_template, get_recorder, sample_from_response, start_phases
+from api.pagination import iter_collection
+from api.rate_limit import get_rate_limiter
+from api.request_log import get_request_log
+from api.response import APIResponse
+from api.retry import RETRY_ERRORS, get_hedge_policy, get_hedger, get_retry_policy
+from api.session_pool import create_session
+from api.single_flight import flight_key, get_single_flight
 from config import get_config
 import logging
 
@@ -10,78 +26,195 @@ logger = logging.getLogger(__name__)
 
 
 class BaseAPIClient:
-    """Base class for all API clients."""
+    """Base class for all API clients; subclasses naming a ``resource`` get its generated endpoint methods."""
+
+    resource = None
+
+    def __init_subclass__(cls, **kwargs):
+        """Generate the methods of the subclass's registered resource."""
+        super().__init_subclass__(**kwargs)
+        if vars(cls).get("resource"):
+            install_endpoints(cls, cls.resource)
 
-    def __init__(self, config=None):
-        """Initialize the API client with configuration."""
+    def __init__(self, config=None, session: requests.Session = None, cache=None, metrics=None):
+        """Initialize the API client, optionally on a shared pooled session, cache and recorder."""
         self.config = config or get_config()
         self.base_url = self.config.BASE_URL
         self.timeout = self.config.TIMEOUT
         self.verify_ssl = self.config.VERIFY_SSL
-        self.session = requests.Session()
+        self.batch_concurrency = self.config.BATCH_CONCURRENCY
+        # Per-client headers, kept off the session so shared sessions stay clean.
+        self.headers = {}
+        self._owns_session = session is None
+        self.session = session or create_session(self.config)
+        self.cache = cache if cache is not None else get_cache(self.config)
+        self.metrics = metrics if metrics is not None else get_recorder(self.config)
+        self.request_log = get_request_log(self.config)
+        self.rate_limiter = get_rate_limiter(self.config)
+        self.retry = get_retry_policy(self.config)
+        self.hedge = get_hedge_policy(self.config)
+        self.circuit_breaker = get_circuit_breaker(self.config, self.base_url)
+        self.concurrency = get_concurrency_limiter(self.config, self.base_url)
+        self.single_flight = get_single_flight(self.config)
 
-    def get(self, endpoint: str, params: dict = None, headers: dict = None):
-        """Perform a GET request."""
+    def _send(self, method: str, url: str, template: str, headers: dict, kwargs: dict) -> requests.Response:
+        """Send one attempt of a request through the host's breaker and limits, timed."""
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.allow()
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        if self.concurrency is not None:
+            self.concurrency.acquire()
+        phases = start_phases()
+        started = time.perf_counter()
+        response = None
+        try:
+            response = self.session.request(
+                method,
+                url,
+                headers=headers,
+                timeout=self.timeout,
+                verify=self.verify_ssl,
+                **kwargs,
+            )
+        finally:
+            total = time.perf_counter() - started
+            status_code = response.status_code if response is not None else None
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.record(status_code)
+            if self.concurrency is not None:
+                self.concurrency.release(total, status_code is not None and status_code < 500)
+            if self.metrics is not None or self.request_log is not None:
+                sample = sample_from_response(method, template, total, response, phases)
+                if self.metrics is not None:
+                    self.metrics.record(sample)
+                if self.request_log is not None:
+                    self.request_log.record(sample)
+        return response
+
+    def _hedge_delay(self, method: str, template: str, kwargs: dict):
+        """Get how long a GET may run before it is hedged, or None to send it once."""
+        if self.hedge is None or method != "GET" or kwargs.get("stream"):
+            return None
+        return self.hedge.delay(self.metrics, f"GET {template}")
+
+    def _perform(self, method: str, url: str, template: str, headers: dict, kwargs: dict) -> requests.Response:
+        """Send a request, hedging slow GETs and retrying idempotent methods."""
+        send = partial(self._send, method, url, template, headers, kwargs)
+        hedge_delay = self._hedge_delay(method, template, kwargs)
+        attempt = 0
+        while True:
+            try:
+                if hedge_delay is None:
+                    response = send()
+                else:
+                    response = get_hedger(self.config).run(send, hedge_delay)
+            except RETRY_ERRORS as error:
+                if not self.retry.allows(method, attempt):
+                    raise
+                delay = self.retry.delay(attempt)
+                reason = type(error).__name__
+            else:
+                if not self.retry.retry_status(method, response.status_code, attempt):
+                    return response
+                delay = self.retry.delay(attempt, response)
+                reason = response.status_code
+                response.close()
+            attempt += 1
+            logger.warning("Retrying %s %s after %s in %.3fs (retry %d)", method, url, reason, delay, attempt)
+            time.sleep(delay)
+
+    def _request(self, method: str, endpoint: str, headers: dict = None, template: str = None, **kwargs) -> APIResponse:
+        """Perform a request with the client's headers merged in, sharing identical in-flight GETs.
+
+        ``template`` is the endpoint's metrics template; it is derived from ``endpoint`` when not given.
+        """
         url = f"{self.base_url}{endpoint}"
-        logger.info(f"GET {url}")
-        return self.session.get(
-            url,
-            params=params,
-            headers=headers,
-            timeout=self.timeout,
-            verify=self.verify_ssl,
+        template = template or endpoint_template(endpoint)
+        if self.headers:
+            headers = {**self.headers, **(headers or {})}
+        if self.cache is not None and method != "GET":
+            self.cache.invalidate(url)
+        perform = partial(self._perform, method, url, template, headers, kwargs)
+        if self.single_flight is None or method != "GET" or kwargs.get("stream"):
+            return APIResponse(perform())
+        key = flight_key(url, kwargs.get("params"), headers)
+        return APIResponse(self.single_flight.do(key, perform))
+
+    def _cached_get(self, endpoint: str, params: dict = None, headers: dict = None, template: str = None) -> APIResponse:
+        """Serve a GET from the cache, revalidating stale entries with the server."""
+        sent = {**self.headers, **headers} if headers else self.headers
+        key = cache_key("GET", f"{self.base_url}{endpoint}", params, sent)
+        entry = self.cache.get(key)
+        no_cache = any(
+            name.lower() == "cache-control" and "no-cache" in value.lower()
+            for name, value in (headers or {}).items()
         )
+        if entry is not None and entry.is_fresh and not no_cache:
+            return APIResponse(entry.to_response(), from_cache=True)
+        if entry is not None:
+            headers = {**entry.validators(), **(headers or {})}
+        response = self._request("GET", endpoint, headers, template, params=params)
+        if entry is not None and response.status_code == 304:
+            entry.refresh(response.response)
+            self.cache.set(key, entry)
+            return APIResponse(entry.to_response(), from_cache=True)
+        if is_storable(response.response):
+            self.cache.set(key, CacheEntry.from_response(response.response))
+        return response
+
+    def _call(self, method: str, endpoint: str, template: str, params: dict, json, headers: dict) -> APIResponse:
+        """Dispatch a generated endpoint method with its formatted path and precompiled metrics template."""
+        if method != "GET":
+            return self._request(method, endpoint, headers, template, json=json)
+        if self.cache is not None:
+            return self._cached_get(endpoint, params, headers, template)
+        return self._request("GET", endpoint, headers, template, params=params)
+
+    def get(self, endpoint: str, params: dict = None, headers: dict = None):
+        """Perform a GET request, served from the response cache when it is enabled."""
+        if self.cache is not None:
+            return self._cached_get(endpoint, params=params, headers=headers)
+        return self._request("GET", endpoint, params=params, headers=headers)
 
     def post(self, endpoint: str, json: dict = None, data: dict = None, headers: dict = None):
         """Perform a POST request."""
-        url = f"{self.base_url}{endpoint}"
-        logger.info(f"POST {url}")
-        return self.session.post(
-            url,
-            json=json,
-            data=data,
-            headers=headers,
-            timeout=self.timeout,
-            verify=self.verify_ssl,
-        )
+        return self._request("POST", endpoint, json=json, data=data, headers=headers)
 
     def put(self, endpoint: str, json: dict = None, data: dict = None, headers: dict = None):
         """Perform a PUT request."""
-        url = f"{self.base_url}{endpoint}"
-        logger.info(f"PUT {url}")
-        return self.session.put(
-            url,
-            json=json,
-            data=data,
-            headers=headers,
-            timeout=self.timeout,
-            verify=self.verify_ssl,
-        )
+        return self._request("PUT", endpoint, json=json, data=data, headers=headers)
 
     def patch(self, endpoint: str, json: dict = None, data: dict = None, headers: dict = None):
         """Perform a PATCH request."""
-        url = f"{self.base_url}{endpoint}"
-        logger.info(f"PATCH {url}")
-        return self.session.patch(
-            url,
-            json=json,
-            data=data,
-            headers=headers,
-            timeout=self.timeout,
-            verify=self.verify_ssl,
-        )
+        return self._request("PATCH", endpoint, json=json, data=data, headers=headers)
 
     def delete(self, endpoint: str, headers: dict = None):
         """Perform a DELETE request."""
-        url = f"{self.base_url}{endpoint}"
-        logger.info(f"DELETE {url}")
-        return self.session.delete(
-            url,
-            headers=headers,
-            timeout=self.timeout,
-            verify=self.verify_ssl,
-        )
+        return self._request("DELETE", endpoint, headers=headers)
+
+    def batch(self, func, items, concurrency: int = None):
+        """Call ``func`` for every item concurrently over this client's session."""
+        return run_batch(func, items, concurrency or self.batch_concurrency)
+
+    def iter_batch(self, func, items, concurrency: int = None):
+        """Like ``batch``, but pull items lazily and yield results as they complete, in input order."""
+        return iter_batch(func, items, concurrency or self.batch_concurrency)
+
+    def paginate(
+        self,
+        endpoint: str,
+        params: dict = None,
+        page_size: int = 100,
+        paging: str = "page",
+        prefetch: bool = True,
+        incremental: bool = False,
+        max_pages: int = 100_000,
+    ):
+        """Iterate over a collection endpoint page by page with bounded memory."""
+        return iter_collection(self, endpoint, params, page_size, paging, prefetch, incremental, max_pages)
 
     def close(self):
-        """Close the session."""
-        self.session.close()
+        """Close the session if this client owns it."""
+        if self._owns_session:
+            self.session.close()
@@ -0,0 +1,79 @@
+"""
+Concurrent fan-out of many requests through one client.
+"""
+
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from itertools import islice, repeat
+from typing import Any, Awaitable, Callable, Iterable, Iterator, List, Optional
+
+from api.response import APIResponse
+
+
+@dataclass
+class BatchResult:
+    """Outcome of one item in a batch: its input, response and error."""
+
+    item: Any
+    response: Optional[APIResponse] = None
+    error: Optional[Exception] = None
+
+    @property
+    def status_code(self) -> Optional[int]:
+        """Get the response status code, or None if the request failed."""
+        return self.response.status_code if self.response is not None else None
+
+    @property
+    def ok(self) -> bool:
+        """Check whether the request completed without raising."""
+        return self.error is None
+
+
+def _call(func: Callable, item) -> BatchResult:
+    """Call ``func`` on one item, capturing its response or error."""
+    try:
+        return BatchResult(item, response=func(item))
+    except Exception as error:
+        return BatchResult(item, error=error)
+
+
+def run_batch(func: Callable, items: Iterable, concurrency: int) -> List[BatchResult]:
+    """Call ``func`` on every item concurrently, returning results in input order."""
+    items = list(items)
+    if not items:
+        return []
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(items))) as executor:
+        return list(executor.map(_call, repeat(func), items))
+
+
+def iter_batch(func: Callable, items: Iterable, concurrency: int) -> Iterator[BatchResult]:
+    """Call ``func`` on items pulled lazily from ``items``, yielding results in input order.
+
+    At most ``concurrency`` items are in flight or waiting to be consumed, so
+    memory stays bounded however long (or endless) ``items`` is.
+    """
+    items = iter(items)
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        pending = deque(executor.submit(_call, func, item) for item in islice(items, concurrency))
+        while pending:
+            result = pending.popleft().result()
+            for item in islice(items, 1):
+                pending.append(executor.submit(_call, func, item))
+            yield result
+
+
+async def run_batch_async(func: Callable[..., Awaitable], items: Iterable, concurrency: int) -> List[BatchResult]:
+    """Await ``func`` on every item with at most ``concurrency`` in flight, returning results in input order."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def call(item) -> BatchResult:
+        """Await one item, capturing its response or error."""
+        async with semaphore:
+            try:
+                return BatchResult(item, response=await func(item))
+            except Exception as error:
+                return BatchResult(item, error=error)
+
+    return list(await asyncio.gather(*map(call, items)))
@@ -0,0 +1,279 @@
+"""
+Opt-in GET response cache with LRU+TTL eviction and HTTP revalidation.
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import Optional
+from urllib.parse import urlencode
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+# Headers a 304 may carry that update the stored response.
+_REFRESHED_HEADERS = ("Age", "Cache-Control", "Date", "ETag", "Expires", "Last-Modified")
+# Request headers that control caching itself rather than select a representation.
+_UNKEYED_HEADERS = frozenset(("cache-control", "pragma", "if-none-match", "if-modified-since"))
+
+
+def cache_key(method: str, url: str, params: dict = None, headers: dict = None) -> str:
+    """Build a cache key from the method, URL, sorted params and a digest of the request headers.
+
+    Every header sent with the request is keyed, which covers whatever a response's
+    ``Vary`` names, so clients with different auth or ``Accept`` headers never share an entry.
+    """
+    query = urlencode(sorted((params or {}).items()), doseq=True)
+    key = f"{method} {url}?{query}"
+    keyed = sorted(
+        (name.lower(), str(value)) for name, value in (headers or {}).items() if name.lower() not in _UNKEYED_HEADERS
+    )
+    if keyed:
+        # Hashed so credentials are not stored in the (possibly on-disk) cache keys.
+        key += "#" + hashlib.blake2b(repr(keyed).encode(), digest_size=16).hexdigest()
+    return key
+
+
+def _key_prefix(url: str) -> str:
+    """Get the prefix shared by the cache keys of every GET to a URL."""
+    return cache_key("GET", url)
+
+
+def _directives(headers) -> str:
+    """Get the lower-cased Cache-Control header value."""
+    return headers.get("Cache-Control", "").lower()
+
+
+def freshness_lifetime(headers) -> float:
+    """Get how many seconds a response stays fresh from Cache-Control or Expires."""
+    directives = _directives(headers)
+    if "no-cache" in directives:
+        return 0.0
+    match = _MAX_AGE.search(directives)
+    if match:
+        return float(match.group(1))
+    if "Expires" in headers:
+        try:
+            expires = parsedate_to_datetime(headers["Expires"]).timestamp()
+            date = parsedate_to_datetime(headers["Date"]).timestamp() if "Date" in headers else time.time()
+        except (TypeError, ValueError):
+            return 0.0
+        return max(expires - date, 0.0)
+    return 0.0
+
+
+def current_age(headers) -> float:
+    """Get the seconds a response had already spent in upstream caches, from its Age header."""
+    try:
+        return max(float(headers.get("Age", 0)), 0.0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def fresh_until(headers) -> float:
+    """Get the time until which a response just received stays fresh."""
+    return time.time() + freshness_lifetime(headers) - current_age(headers)
+
+
+@dataclass
+class CacheEntry:
+    """A stored response plus what is needed to serve or revalidate it."""
+
+    url: str
+    status_code: int
+    headers: CaseInsensitiveDict
+    content: bytes
+    encoding: Optional[str]
+    fresh_until: float
+    stored_at: float = field(default_factory=time.time)
+
+    @classmethod
+    def from_response(cls, response: requests.Response) -> "CacheEntry":
+        """Capture a response for storage."""
+        return cls(
+            url=response.url,
+            status_code=response.status_code,
+            headers=CaseInsensitiveDict(response.headers),
+            content=response.content,
+            encoding=response.encoding,
+            fresh_until=fresh_until(response.headers),
+        )
+
+    @property
+    def is_fresh(self) -> bool:
+        """Check whether the entry can be served without revalidation."""
+        return time.time() < self.fresh_until
+
+    def validators(self) -> dict:
+        """Get the conditional request headers for revalidation."""
+        headers = {}
+        if "ETag" in self.headers:
+            headers["If-None-Match"] = self.headers["ETag"]
+        if "Last-Modified" in self.headers:
+            headers["If-Modified-Since"] = self.headers["Last-Modified"]
+        return headers
+
+    def refresh(self, not_modified: requests.Response):
+        """Update the entry's headers and freshness from a 304 response."""
+        # The old Age described the original response, not this revalidation.
+        self.headers.pop("Age", None)
+        for name in _REFRESHED_HEADERS:
+            if name in not_modified.headers:
+                self.headers[name] = not_modified.headers[name]
+        self.fresh_until = fresh_until(self.headers)
+
+    def to_response(self) -> requests.Response:
+        """Rebuild a response from the stored entry."""
+        response = requests.Response()
+        response.url = self.url
+        response.status_code = self.status_code
+        response.headers = CaseInsensitiveDict(self.headers)
+        response._content = self.content
+        response.encoding = self.encoding
+        return response
+
+
+def is_storable(response: requests.Response) -> bool:
+    """Check whether a GET response may be stored."""
+    if response.status_code != 200 or "no-store" in _directives(response.headers):
+        return False
+    # ``Vary: *`` means no request can be matched to the stored response.
+    if response.headers.get("Vary", "").strip() == "*":
+        return False
+    headers = response.headers
+    return freshness_lifetime(headers) > 0 or "ETag" in headers or "Last-Modified" in headers
+
+
+class MemoryCache:
+    """In-process LRU cache whose entries are evicted after ``ttl`` seconds."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300):
+        """Create an empty cache."""
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Get an entry, dropping it if it outlived the TTL."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.time() - entry.stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CacheEntry):
+        """Store an entry, evicting the least recently used beyond ``maxsize``."""
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, url: str):
+        """Drop every entry stored for a URL."""
+        with self._lock:
+            prefix = _key_prefix(url)
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+
+
+class DiskCache:
+    """SQLite-backed cache that several processes, such as pytest workers, can share."""
+
+    def __init__(self, path: str, maxsize: int = 1024, ttl: float = 300):
+        """Open or create the cache database."""
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, meta TEXT, content BLOB, stored_at REAL, accessed_at REAL)"
+        )
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Get an entry, dropping it if it outlived the TTL."""
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT meta, content, stored_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            meta, content, stored_at = row
+            if now - stored_at > self.ttl:
+                self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                return None
+            self._db.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+        meta = json.loads(meta)
+        meta["headers"] = CaseInsensitiveDict(meta["headers"])
+        return CacheEntry(content=content, stored_at=stored_at, **meta)
+
+    def set(self, key: str, entry: CacheEntry):
+        """Store an entry, evicting the least recently used beyond ``maxsize``."""
+        meta = json.dumps({
+            "url": entry.url,
+            "status_code": entry.status_code,
+            "headers": dict(entry.headers),
+            "encoding": entry.encoding,
+            "fresh_until": entry.fresh_until,
+        })
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                (key, meta, entry.content, entry.stored_at, time.time()),
+            )
+            self._db.execute(
+                "DELETE FROM entries WHERE key IN "
+                "(SELECT key FROM entries ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.maxsize,),
+            )
+
+    def invalidate(self, url: str):
+        """Drop every entry stored for a URL."""
+        with self._lock:
+            prefix = _key_prefix(url)
+            self._db.execute("DELETE FROM entries WHERE substr(key, 1, ?) = ?", (len(prefix), prefix))
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._db.execute("DELETE FROM entries")
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(config):
+    """Get the process-wide cache for the config's backend, or None if caching is off."""
+    if not config.CACHE_ENABLED:
+        return None
+    key = (config.CACHE_BACKEND, config.CACHE_PATH)
+    with _caches_lock:
+        if key not in _caches:
+            if config.CACHE_BACKEND == "memory":
+                _caches[key] = MemoryCache(config.CACHE_MAXSIZE, config.CACHE_TTL)
+            elif config.CACHE_BACKEND == "disk":
+                _caches[key] = DiskCache(config.CACHE_PATH, config.CACHE_MAXSIZE, config.CACHE_TTL)
+            else:
+                raise ValueError(f"Unknown cache backend {config.CACHE_BACKEND!r}")
+        return _caches[key]
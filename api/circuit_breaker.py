@@ -0,0 +1,97 @@
+"""
+Per-host circuit breakers that fail requests fast while a host is down.
+"""
+
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised instead of sending a request to a host whose circuit is open."""
+
+    def __init__(self, host: str, retry_in: float):
+        """Describe the open circuit."""
+        super().__init__(f"Circuit open for {host}, next probe in {retry_in:.1f}s")
+        self.host = host
+        self.retry_in = retry_in
+
+
+def host_of(url: str) -> str:
+    """Get the ``scheme://host:port`` a URL is sent to."""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+class CircuitBreaker:
+    """Open after consecutive failures, then let one probe through every ``reset_timeout`` seconds."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, host: str, failures: int, reset_timeout: float, statuses=()):
+        """Trip after ``failures`` consecutive errors or responses with one of ``statuses``."""
+        self.host = host
+        self.failures = failures
+        self.reset_timeout = reset_timeout
+        self.statuses = frozenset(statuses)
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._opened = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Raise ``CircuitOpenError`` unless a request may be sent now."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            retry_in = self._opened + self.reset_timeout - time.monotonic()
+            if self.state == self.OPEN and retry_in <= 0:
+                # Let this request through as the probe; others fail fast until it completes.
+                self.state = self.HALF_OPEN
+                return
+            raise CircuitOpenError(self.host, max(retry_in, 0.0))
+
+    def release(self):
+        """Give up an allowed request that was never sent, letting the next request probe in its place."""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                # The reset timeout has already passed, so the next ``allow`` makes a new probe.
+                self.state = self.OPEN
+
+    def is_failure(self, status_code) -> bool:
+        """Check whether a response (None if the request raised) counts as a failure."""
+        return status_code is None or status_code in self.statuses
+
+    def record(self, status_code):
+        """Record the outcome of an allowed request."""
+        with self._lock:
+            if not self.is_failure(status_code):
+                self.state = self.CLOSED
+                self.consecutive_failures = 0
+                return
+            self.consecutive_failures += 1
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failures:
+                self.state = self.OPEN
+                self._opened = time.monotonic()
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(config, url: str):
+    """Get the process-wide breaker for the host of ``url``, or None if breakers are off."""
+    # Replays never reach a host, so there is nothing to protect.
+    if not config.CIRCUIT_FAILURES or config.TRANSPORT_MODE == "replay":
+        return None
+    key = (host_of(url), config.CIRCUIT_FAILURES, config.CIRCUIT_RESET_TIMEOUT)
+    with _breakers_lock:
+        if key not in _breakers:
+            _breakers[key] = CircuitBreaker(
+                key[0], config.CIRCUIT_FAILURES, config.CIRCUIT_RESET_TIMEOUT, config.CIRCUIT_STATUSES
+            )
+        return _breakers[key]
@@ -0,0 +1,89 @@
+"""
+Adaptive per-host concurrency limits (AIMD) driven by observed latency and errors.
+"""
+
+import asyncio
+import threading
+import time
+
+from api.circuit_breaker import host_of
+
+
+class AdaptiveLimiter:
+    """Limit in-flight requests, growing the limit additively and cutting it multiplicatively.
+
+    A request that fails, or takes longer than ``tolerance`` times the fastest
+    latency seen, is a congestion signal and multiplies the limit by ``backoff``.
+    Requests already in flight when the limit was cut do not cut it again. Each
+    other request adds ``1 / limit``, so the limit grows by about one per round
+    trip while at least half of it is in use.
+    """
+
+    def __init__(self, initial: int, minimum: int, maximum: int, tolerance: float = 2.0, backoff: float = 0.5):
+        """Start at ``initial`` in-flight requests, staying between ``minimum`` and ``maximum``."""
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self.in_flight = 0
+        self.min_latency = None
+        self._last_decrease = float("-inf")
+        self._condition = threading.Condition()
+
+    def try_acquire(self) -> bool:
+        """Take an in-flight slot if one is free."""
+        with self._condition:
+            if self.in_flight >= int(self.limit):
+                return False
+            self.in_flight += 1
+            return True
+
+    def acquire(self):
+        """Block until an in-flight slot is free."""
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+
+    async def acquire_async(self, poll: float = 0.001):
+        """Wait on the event loop until an in-flight slot is free."""
+        while not self.try_acquire():
+            await asyncio.sleep(poll)
+            poll = min(poll * 2, 0.05)
+
+    def release(self, latency: float, ok: bool):
+        """Free a slot and adjust the limit from the request's latency and outcome."""
+        with self._condition:
+            self.in_flight -= 1
+            now = time.monotonic()
+            if ok and (self.min_latency is None or latency < self.min_latency):
+                self.min_latency = latency
+            congested = not ok or latency > self.tolerance * self.min_latency
+            if congested:
+                if now - latency >= self._last_decrease:
+                    self.limit = max(self.limit * self.backoff, self.minimum)
+                    self._last_decrease = now
+            elif self.in_flight + 1 >= self.limit / 2:
+                self.limit = min(self.limit + 1 / self.limit, self.maximum)
+            self._condition.notify_all()
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_concurrency_limiter(config, url: str):
+    """Get the process-wide limiter for the host of ``url``, or None if adaptive concurrency is off."""
+    if not config.ADAPTIVE_CONCURRENCY:
+        return None
+    key = (host_of(url), config.CONCURRENCY_INITIAL, config.CONCURRENCY_MIN, config.CONCURRENCY_MAX)
+    with _limiters_lock:
+        if key not in _limiters:
+            _limiters[key] = AdaptiveLimiter(
+                config.CONCURRENCY_INITIAL,
+                config.CONCURRENCY_MIN,
+                config.CONCURRENCY_MAX,
+                config.CONCURRENCY_LATENCY_TOLERANCE,
+            )
+        return _limiters[key]
@@ -0,0 +1,214 @@
+"""
+Declarative endpoint registry that generates the resource clients' methods.
+
+A ``Resource`` lists its path, record type, CRUD methods, query filters and
+nested collections; it expands into ``Endpoint`` entries (method name, HTTP
+method, path template, query parameters and body argument). Client classes
+name their resource with ``resource = "posts"`` and get one generated method
+per endpoint, compiled from source like the schema validators: the path
+template becomes an f-string, and the metrics template and default headers are
+constants, so a call only builds its path and hands off to the client's shared
+dispatch (cache, single flight, retries, metrics). Sync clients also get
+``get_<items>``/``create_<items>`` batch methods, ``iter_<items>`` pagination
+and ``fetch_*`` methods returning records; async clients get the batch methods.
+Methods defined on the class itself are left alone.
+"""
+
+import re
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, List, Optional, Tuple
+
+from api.models import Album, Comment, Photo, Post, Todo, User
+
+_PLACEHOLDER = re.compile(r"\{(\w+)\}")
+
+CRUD = ("list", "get", "create", "update", "patch", "delete")
+
+
+@dataclass(frozen=True)
+class Endpoint:
+    """One generated client method: HTTP method, path template, query and body arguments."""
+
+    name: str
+    method: str
+    path: str
+    # (argument, query parameter) pairs, e.g. (("user_id", "userId"),).
+    query: Tuple[Tuple[str, str], ...] = ()
+    body: Optional[str] = None
+    model: Optional[type] = None
+    many: bool = True
+    headers: Tuple[Tuple[str, str], ...] = ()
+    doc: str = ""
+
+    @property
+    def path_arguments(self) -> Tuple[str, ...]:
+        """Get the argument names taken by the path template."""
+        return tuple(_PLACEHOLDER.findall(self.path))
+
+    @property
+    def arguments(self) -> Tuple[str, ...]:
+        """Get the generated method's arguments in order: path, query, then body."""
+        return self.path_arguments + tuple(argument for argument, _ in self.query) + ((self.body,) if self.body else ())
+
+    @property
+    def template(self) -> str:
+        """Get the metrics template, e.g. ``/posts/{id}`` for ``/posts/{post_id}``."""
+        return _PLACEHOLDER.sub("{id}", self.path)
+
+    @property
+    def fetch_name(self) -> Optional[str]:
+        """Get the name of the record-returning ``fetch_`` method, if this is a GET with a model."""
+        if self.method != "GET" or self.model is None:
+            return None
+        return "fetch_" + self.name[len("get_all_"):] if self.name.startswith("get_all_") else "fetch" + self.name[3:]
+
+
+@dataclass(frozen=True)
+class Resource:
+    """A collection at ``/<name>`` with items at ``/<name>/{<item>_id}``."""
+
+    name: str
+    item: str
+    model: Optional[type] = None
+    methods: Tuple[str, ...] = CRUD
+    # (argument, query parameter) pairs, each generating ``get_<name>_by_<argument>``.
+    filters: Tuple[Tuple[str, str], ...] = ()
+    # Resources listed under ``/<name>/{<item>_id}/<child>``.
+    children: Tuple[str, ...] = ()
+    headers: Tuple[Tuple[str, str], ...] = ()
+    extra: Tuple[Endpoint, ...] = ()
+
+    @property
+    def item_path(self) -> str:
+        """Get the path template of one item."""
+        return f"/{self.name}/{{{self.item}_id}}"
+
+    def endpoints(self) -> List[Endpoint]:
+        """Expand the resource into its endpoints."""
+        name, item, model, headers = self.name, self.item, self.model, self.headers
+        data = f"{item}_data"
+        standard = {
+            "list": Endpoint(f"get_all_{name}", "GET", f"/{name}", model=model, headers=headers, doc=f"Get all {name}."),
+            "get": Endpoint(
+                f"get_{item}", "GET", self.item_path, model=model, many=False, headers=headers, doc=f"Get a {item} by ID."
+            ),
+            "create": Endpoint(
+                f"create_{item}", "POST", f"/{name}", body=data, headers=headers, doc=f"Create a new {item}."
+            ),
+            "update": Endpoint(
+                f"update_{item}", "PUT", self.item_path, body=data, headers=headers, doc=f"Update an existing {item}."
+            ),
+            "patch": Endpoint(
+                f"patch_{item}", "PATCH", self.item_path, body=data, headers=headers, doc=f"Partially update a {item}."
+            ),
+            "delete": Endpoint(f"delete_{item}", "DELETE", self.item_path, headers=headers, doc=f"Delete a {item}."),
+        }
+        endpoints = [standard[method] for method in self.methods]
+        for child in self.children:
+            child_model = RESOURCES[child].model if child in RESOURCES else None
+            endpoints.append(Endpoint(
+                f"get_{item}_{child}", "GET", f"{self.item_path}/{child}", model=child_model, headers=headers,
+                doc=f"Get all {child} of a {item}.",
+            ))
+        for argument, parameter in self.filters:
+            label = argument[:-len("_id")] if argument.endswith("_id") else argument
+            endpoints.append(Endpoint(
+                f"get_{name}_by_{label}", "GET", f"/{name}", query=((argument, parameter),), model=model,
+                headers=headers, doc=f"Get all {name} with the given {parameter}.",
+            ))
+        # Resource headers are merged into the extra endpoints' own once, here, with the endpoint's winning.
+        return endpoints + [replace(endpoint, headers=headers + endpoint.headers) for endpoint in self.extra]
+
+
+RESOURCES: Dict[str, Resource] = {}
+
+
+def register(resource: Resource) -> Resource:
+    """Add a resource to the registry, replacing one of the same name."""
+    RESOURCES[resource.name] = resource
+    return resource
+
+
+register(Resource("users", "user", User, children=("posts", "comments", "todos", "albums")))
+register(Resource("posts", "post", Post, filters=(("user_id", "userId"),), children=("comments",)))
+register(Resource(
+    "comments", "comment", Comment, methods=("list", "get", "create", "update", "delete"),
+    filters=(("post_id", "postId"), ("email", "email")),
+))
+register(Resource("todos", "todo", Todo, filters=(("user_id", "userId"),)))
+register(Resource("albums", "album", Album, filters=(("user_id", "userId"),), children=("photos",)))
+register(Resource("photos", "photo", Photo, filters=(("album_id", "albumId"),)))
+
+
+def _build(source: str, constants: dict, name: str, owner: type) -> Callable:
+    """Compile a generated method and name it as a method of ``owner``."""
+    namespace = dict(constants)
+    exec(compile(source, f"<endpoint {owner.__name__}.{name}>", "exec"), namespace)
+    function = namespace[name]
+    function.__module__ = owner.__module__
+    function.__qualname__ = f"{owner.__qualname__}.{name}"
+    return function
+
+
+def generate_methods(owner: type, resource: Resource, asynchronous: bool = False) -> Dict[str, Callable]:
+    """Generate the methods of a resource's endpoints for a sync or async client class."""
+    prefix, wait = ("async ", "await ") if asynchronous else ("", "")
+    methods = {}
+
+    def add(name: str, source: str, doc: str, constants: dict = None):
+        """Compile one method and give it its docstring."""
+        methods[name] = _build(source, constants or {}, name, owner)
+        methods[name].__doc__ = doc
+
+    for endpoint in resource.endpoints():
+        path = f"f{endpoint.path!r}" if endpoint.path_arguments else repr(endpoint.path)
+        params = "{" + ", ".join(f"{parameter!r}: {argument}" for argument, parameter in endpoint.query) + "}"
+        signature = "".join(f", {argument}" for argument in endpoint.arguments)
+        source = (
+            f"{prefix}def {endpoint.name}(self{signature}):\n"
+            f"    return {wait}self._call({endpoint.method!r}, {path}, {endpoint.template!r}, "
+            f"{params if endpoint.query else None}, {endpoint.body}, HEADERS)\n"
+        )
+        add(endpoint.name, source, endpoint.doc, {"HEADERS": dict(endpoint.headers) or None})
+        if asynchronous or endpoint.fetch_name is None:
+            continue
+        convert, noun = ("as_records", "records") if endpoint.many else ("as_record", "a record")
+        source = (
+            f"def {endpoint.fetch_name}(self{signature}):\n"
+            f"    response = self.{endpoint.name}({', '.join(endpoint.arguments)})\n"
+            f"    response.raise_for_status()\n"
+            f"    return response.{convert}(MODEL)\n"
+        )
+        doc = f"{endpoint.doc[:-1]} as {noun.replace('record', f'``{endpoint.model.__name__}`` record')}."
+        add(endpoint.fetch_name, source, doc, {"MODEL": endpoint.model})
+
+    name, item = resource.name, resource.item
+    batches = (
+        ("get", f"get_{name}", f"get_{item}", f"{item}_ids", f"Get many {name} by ID concurrently, in input order."),
+        ("create", f"create_{name}", f"create_{item}", f"{name}_data", f"Create many {name} concurrently, in input order."),
+    )
+    for method, batch, single, argument, doc in batches:
+        if method in resource.methods:
+            source = (
+                f"{prefix}def {batch}(self, {argument}, concurrency=None):\n"
+                f"    return {wait}self.batch(self.{single}, {argument}, concurrency)\n"
+            )
+            add(batch, source, doc)
+    if not asynchronous and "list" in resource.methods:
+        source = (
+            f"def iter_{name}(self, page_size=100, **kwargs):\n"
+            f"    return self.paginate({'/' + name!r}, page_size=page_size, **kwargs)\n"
+        )
+        add(f"iter_{name}", source, f"Iterate over all {name} page by page.")
+    return methods
+
+
+def install_endpoints(owner: type, name: str, asynchronous: bool = False):
+    """Add a registered resource's generated methods to a client class, keeping methods it defines."""
+    try:
+        resource = RESOURCES[name]
+    except KeyError:
+        raise ValueError(f"Unknown resource {name!r}, register it in api.endpoints first") from None
+    for method_name, method in generate_methods(owner, resource, asynchronous).items():
+        if method_name not in vars(owner):
+            setattr(owner, method_name, method)
@@ -0,0 +1,35 @@
+"""
+Exclusive advisory file locks that work with ``fcntl`` on POSIX and ``msvcrt`` on Windows.
+"""
+
+import os
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+def lock_file(fd: int):
+    """Block until this process holds the exclusive lock on an open file descriptor."""
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        return
+    # msvcrt locks a byte range from the current position; lock the first byte, retrying past its timeout.
+    os.lseek(fd, 0, os.SEEK_SET)
+    while True:
+        try:
+            msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+            return
+        except OSError:
+            continue
+
+
+def unlock_file(fd: int):
+    """Release a lock taken with ``lock_file``."""
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        return
+    os.lseek(fd, 0, os.SEEK_SET)
+    msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
@@ -0,0 +1,114 @@
+"""
+Compact log-linear latency histogram in the style of HdrHistogram.
+"""
+
+import math
+
+# 2**7 sub-buckets per power of two keeps every recorded value within 1/64 (~1.6%).
+_PRECISION_BITS = 7
+_SUB_BUCKETS = 1 << _PRECISION_BITS
+_HALF = _SUB_BUCKETS >> 1
+
+
+def _bucket(value: int) -> int:
+    """Get the bucket index of a non-negative integer value."""
+    if value < _SUB_BUCKETS:
+        return value
+    shift = value.bit_length() - _PRECISION_BITS
+    return _SUB_BUCKETS + (shift - 1) * _HALF + ((value >> shift) - _HALF)
+
+
+def _highest_equivalent(index: int) -> int:
+    """Get the largest value that falls into a bucket."""
+    if index < _SUB_BUCKETS:
+        return index
+    shift = (index - _SUB_BUCKETS) // _HALF + 1
+    mantissa = (index - _SUB_BUCKETS) % _HALF + _HALF
+    return ((mantissa + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    """Sparse histogram of durations, stored in microseconds.
+
+    Memory grows with the number of distinct buckets (a few hundred for any
+    realistic latency range), not with the number of recorded values.
+    """
+
+    __slots__ = ("counts", "count", "total", "min", "max")
+
+    def __init__(self):
+        """Create an empty histogram."""
+        self.counts = {}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    def record(self, seconds: float):
+        """Record one duration in seconds."""
+        value = max(int(seconds * 1_000_000), 0)
+        index = _bucket(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: "LatencyHistogram"):
+        """Add another histogram's values into this one."""
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def percentile(self, percent: float) -> float:
+        """Get the value at a percentile, in milliseconds."""
+        if not self.count:
+            return 0.0
+        target = max(math.ceil(percent / 100 * self.count), 1)
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                return min(_highest_equivalent(index), self.max) / 1000
+        return self.max / 1000
+
+    @property
+    def mean(self) -> float:
+        """Get the mean value in milliseconds."""
+        return self.total / self.count / 1000 if self.count else 0.0
+
+    def summary(self) -> dict:
+        """Get count, mean, p50/p95/p99 and max in milliseconds."""
+        return {
+            "count": self.count,
+            "mean_ms": round(self.mean, 3),
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "max_ms": self.max / 1000,
+        }
+
+    def to_dict(self) -> dict:
+        """Get the raw buckets so histograms can be stored and merged later."""
+        return {
+            "counts": {str(index): count for index, count in self.counts.items()},
+            "count": self.count,
+            "total": self.total,
+            "min": self.min,
+            "max": self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LatencyHistogram":
+        """Rebuild a histogram from ``to_dict`` output."""
+        histogram = cls()
+        histogram.counts = {int(index): count for index, count in data["counts"].items()}
+        histogram.count = data["count"]
+        histogram.total = data["total"]
+        histogram.min = data["min"]
+        histogram.max = data["max"]
+        return histogram
@@ -0,0 +1,357 @@
+"""
+Per-request latency instrumentation aggregated per endpoint template.
+"""
+
+import json
+import re
+import socket
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Optional
+
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NameResolutionError, NewConnectionError
+from urllib3.util.connection import allowed_gai_family
+from urllib3.util.timeout import _DEFAULT_TIMEOUT
+
+from api.histogram import LatencyHistogram
+
+_ID_SEGMENT = re.compile(r"^-?\d+$")
+# Connection phase timings of the request running on this thread.
+_phases = threading.local()
+
+PHASES = ("dns", "connect", "tls", "ttfb", "total")
+
+
+@lru_cache(maxsize=4096)
+def endpoint_template(endpoint: str) -> str:
+    """Replace numeric path segments with ``{id}``, e.g. ``/posts/17`` -> ``/posts/{id}``."""
+    path = endpoint.split("?", 1)[0]
+    return "/".join("{id}" if _ID_SEGMENT.match(segment) else segment for segment in path.split("/"))
+
+
+def start_phases() -> dict:
+    """Reset and return the connection phase timings for this thread's next request."""
+    _phases.current = {}
+    return _phases.current
+
+
+def _current_phases() -> dict:
+    """Get the connection phase timings being filled on this thread."""
+    phases = getattr(_phases, "current", None)
+    return phases if phases is not None else {}
+
+
+class TimedHTTPConnection(HTTPConnection):
+    """HTTP connection that times DNS resolution and the TCP connect."""
+
+    def _new_conn(self):
+        """Resolve the host once, then connect to its addresses in turn, timing both phases."""
+        phases = _current_phases()
+        started = time.perf_counter()
+        try:
+            host = self._dns_host.strip("[]")
+            addresses = socket.getaddrinfo(host, self.port, allowed_gai_family(), socket.SOCK_STREAM)
+        except socket.gaierror as error:
+            raise NameResolutionError(self.host, self, error) from error
+        finally:
+            resolved = time.perf_counter()
+            phases["dns"] = resolved - started
+        try:
+            sock = self._connect_first(addresses)
+        except socket.timeout as error:
+            raise ConnectTimeoutError(
+                self, f"Connection to {self.host} timed out. (connect timeout={self.timeout})"
+            ) from error
+        except OSError as error:
+            raise NewConnectionError(self, f"Failed to establish a new connection: {error}") from error
+        finally:
+            phases["connect"] = time.perf_counter() - resolved
+        sys.audit("http.client.connect", self, self.host, self.port)
+        return sock
+
+    def _connect_first(self, addresses) -> socket.socket:
+        """Connect to the first reachable resolved address, as urllib3's ``create_connection`` does."""
+        error = OSError("getaddrinfo returns an empty list")
+        for family, kind, protocol, _, address in addresses:
+            sock = socket.socket(family, kind, protocol)
+            try:
+                for option in self.socket_options or ():
+                    sock.setsockopt(*option)
+                if self.timeout is not _DEFAULT_TIMEOUT:
+                    sock.settimeout(self.timeout)
+                if self.source_address:
+                    sock.bind(self.source_address)
+                sock.connect(address)
+                return sock
+            except OSError as failure:
+                sock.close()
+                error = failure
+        raise error
+
+
+class TimedHTTPSConnection(TimedHTTPConnection, HTTPSConnection):
+    """HTTPS connection that also times the TLS handshake."""
+
+    def connect(self):
+        """Connect and derive the TLS handshake time."""
+        started = time.perf_counter()
+        super().connect()
+        phases = _current_phases()
+        elapsed = time.perf_counter() - started
+        phases["tls"] = max(elapsed - phases.get("dns", 0.0) - phases.get("connect", 0.0), 0.0)
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    """Connection pool opening timed HTTP connections."""
+
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    """Connection pool opening timed HTTPS connections."""
+
+    ConnectionCls = TimedHTTPSConnection
+
+
+TIMED_POOL_CLASSES = {"http": TimedHTTPConnectionPool, "https": TimedHTTPSConnectionPool}
+
+
+@dataclass
+class RequestSample:
+    """Timings and sizes of one request, in seconds and bytes."""
+
+    method: str
+    template: str
+    status_code: Optional[int]
+    total: float
+    ttfb: Optional[float] = None
+    dns: Optional[float] = None
+    connect: Optional[float] = None
+    tls: Optional[float] = None
+    request_bytes: int = 0
+    response_bytes: int = 0
+
+    @property
+    def key(self) -> str:
+        """Get the endpoint key, e.g. ``GET /posts/{id}``."""
+        return f"{self.method} {self.template}"
+
+
+def _body_size(body) -> int:
+    """Get the size of a request body."""
+    if body is None:
+        return 0
+    return len(body) if isinstance(body, (bytes, str)) else 0
+
+
+def sample_from_response(method: str, template: str, total: float, response, phases: dict) -> RequestSample:
+    """Build a sample for an endpoint template from a ``requests.Response`` (or None if the request raised)."""
+    sample = RequestSample(method, template, None, total, **phases)
+    if response is None:
+        return sample
+    sample.status_code = response.status_code
+    sample.ttfb = response.elapsed.total_seconds()
+    if response.request is not None:
+        sample.request_bytes = _body_size(response.request.body)
+    # Streamed bodies are not read yet, so fall back to the declared length.
+    if response._content not in (False, None):
+        sample.response_bytes = len(response._content)
+    else:
+        sample.response_bytes = int(response.headers.get("Content-Length", 0))
+    return sample
+
+
+class HTTPXTrace:
+    """httpx ``trace`` extension collecting connect, TLS and time-to-first-byte timings."""
+
+    def __init__(self):
+        """Start timing a request."""
+        self.started = time.perf_counter()
+        self.phases = {}
+        self._marks = {}
+
+    async def __call__(self, event: str, info: dict):
+        """Receive an httpcore trace event."""
+        now = time.perf_counter()
+        if event.endswith(".started"):
+            self._marks[event[:-len(".started")]] = now
+        elif event == "connection.connect_tcp.complete":
+            self.phases["connect"] = now - self._marks.get("connection.connect_tcp", now)
+        elif event == "connection.start_tls.complete":
+            self.phases["tls"] = now - self._marks.get("connection.start_tls", now)
+        elif event.endswith(".receive_response_headers.complete"):
+            self.phases["ttfb"] = now - self.started
+
+
+def sample_from_httpx(method: str, template: str, total: float, response, trace: HTTPXTrace) -> RequestSample:
+    """Build a sample for an endpoint template from an ``httpx.Response`` (or None if the request raised)."""
+    sample = RequestSample(method, template, None, total, **trace.phases)
+    if response is not None:
+        sample.status_code = response.status_code
+        sample.request_bytes = len(response.request.content)
+        sample.response_bytes = len(response.content)
+    return sample
+
+
+class EndpointMetrics:
+    """Histograms and byte counts for one endpoint template."""
+
+    __slots__ = ("histograms", "count", "failures", "request_bytes", "response_bytes", "statuses")
+
+    def __init__(self):
+        """Create empty metrics."""
+        self.histograms = {phase: LatencyHistogram() for phase in PHASES}
+        self.count = 0
+        self.failures = 0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.statuses = {}
+
+    def add(self, sample: RequestSample):
+        """Add one request's timings and sizes."""
+        self.count += 1
+        if sample.status_code is None:
+            self.failures += 1
+        else:
+            self.statuses[sample.status_code] = self.statuses.get(sample.status_code, 0) + 1
+        self.request_bytes += sample.request_bytes
+        self.response_bytes += sample.response_bytes
+        for phase in PHASES:
+            value = getattr(sample, phase)
+            if value is not None:
+                self.histograms[phase].record(value)
+
+    def to_dict(self) -> dict:
+        """Get the raw counts and histograms so another process can merge them."""
+        return {
+            "count": self.count,
+            "failures": self.failures,
+            "request_bytes": self.request_bytes,
+            "response_bytes": self.response_bytes,
+            "statuses": self.statuses,
+            "histograms": {phase: histogram.to_dict() for phase, histogram in self.histograms.items()},
+        }
+
+    def merge_dict(self, data: dict):
+        """Add raw metrics from ``to_dict`` into these."""
+        self.count += data["count"]
+        self.failures += data["failures"]
+        self.request_bytes += data["request_bytes"]
+        self.response_bytes += data["response_bytes"]
+        for status, count in data["statuses"].items():
+            self.statuses[int(status)] = self.statuses.get(int(status), 0) + count
+        for phase, histogram in data["histograms"].items():
+            self.histograms[phase].merge(LatencyHistogram.from_dict(histogram))
+
+    def summary(self) -> dict:
+        """Get counts, sizes and per-phase percentiles."""
+        return {
+            "count": self.count,
+            "failures": self.failures,
+            "statuses": {str(status): count for status, count in sorted(self.statuses.items())},
+            "request_bytes": self.request_bytes,
+            "response_bytes": self.response_bytes,
+            **{phase: histogram.summary() for phase, histogram in self.histograms.items() if histogram.count},
+        }
+
+
+class MetricsRecorder:
+    """Collect request samples per endpoint and pass each one to registered hooks."""
+
+    def __init__(self):
+        """Create an empty recorder."""
+        self.endpoints = {}
+        # Replaced rather than mutated, so threads recording samples never see a half-updated list.
+        self.hooks = ()
+        self._lock = threading.Lock()
+
+    def add_hook(self, hook: Callable[[RequestSample], None]):
+        """Call ``hook`` with every recorded sample."""
+        with self._lock:
+            self.hooks = (*self.hooks, hook)
+
+    def remove_hook(self, hook: Callable[[RequestSample], None]):
+        """Stop calling a hook."""
+        with self._lock:
+            self.hooks = tuple(existing for existing in self.hooks if existing != hook)
+
+    def record(self, sample: RequestSample):
+        """Record one sample."""
+        with self._lock:
+            endpoint = self.endpoints.get(sample.key)
+            if endpoint is None:
+                endpoint = self.endpoints[sample.key] = EndpointMetrics()
+            endpoint.add(sample)
+        for hook in self.hooks:
+            hook(sample)
+
+    def export(self) -> dict:
+        """Get raw per-endpoint metrics that another recorder can merge."""
+        with self._lock:
+            return {key: endpoint.to_dict() for key, endpoint in self.endpoints.items()}
+
+    def merge(self, exported: dict):
+        """Add metrics exported by another recorder, e.g. a parallel worker's."""
+        with self._lock:
+            for key, data in exported.items():
+                endpoint = self.endpoints.get(key)
+                if endpoint is None:
+                    endpoint = self.endpoints[key] = EndpointMetrics()
+                endpoint.merge_dict(data)
+
+    def reset(self):
+        """Drop all recorded metrics."""
+        with self._lock:
+            self.endpoints.clear()
+
+    def histograms(self, phase: str = "total") -> dict:
+        """Get a copy of one phase's histogram for every endpoint."""
+        with self._lock:
+            snapshot = {}
+            for key, endpoint in self.endpoints.items():
+                histogram = snapshot[key] = LatencyHistogram()
+                histogram.merge(endpoint.histograms[phase])
+            return snapshot
+
+    def latency_percentile(self, key: str, percent: float, min_samples: int = 1) -> Optional[float]:
+        """Get an endpoint's total latency percentile in ms, or None below ``min_samples`` requests."""
+        with self._lock:
+            endpoint = self.endpoints.get(key)
+            if endpoint is None or endpoint.histograms["total"].count < min_samples:
+                return None
+            return endpoint.histograms["total"].percentile(percent)
+
+    def summary(self) -> dict:
+        """Get the metrics of every endpoint."""
+        with self._lock:
+            return {key: self.endpoints[key].summary() for key in sorted(self.endpoints)}
+
+    def format(self) -> str:
+        """Format total latency percentiles per endpoint as a text table."""
+        lines = [f"{'endpoint':<36}{'count':>7}{'fail':>6}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}"]
+        for key, endpoint in self.summary().items():
+            total = endpoint.get("total", LatencyHistogram().summary())
+            lines.append(
+                f"{key:<36}{endpoint['count']:>7}{endpoint['failures']:>6}"
+                f"{total['p50_ms']:>9.1f}{total['p95_ms']:>9.1f}{total['p99_ms']:>9.1f}{total['max_ms']:>9.1f}"
+            )
+        return "\n".join(lines)
+
+    def dump_json(self, path: str):
+        """Write the per-endpoint summary as JSON."""
+        with open(path, "w") as handle:
+            json.dump(self.summary(), handle, indent=2)
+
+
+# Default recorder shared by every client in the process.
+recorder = MetricsRecorder()
+
+
+def get_recorder(config) -> Optional[MetricsRecorder]:
+    """Get the shared recorder, or None if metrics are disabled."""
+    return recorder if config.METRICS_ENABLED else None
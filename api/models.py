@@ -0,0 +1,252 @@
+"""
+Compact ``__slots__`` record types for decoded resources.
+
+Records keep values in slots instead of a per-object dict of repeated keys, intern
+repeated short strings, and store a user's address and company as packed tuples
+that become ``Address``/``Company`` records only when first read. Records also
+answer ``record["userId"]`` with the JSON key, so they can stand in for dicts in
+assertions.
+"""
+
+from itertools import starmap
+from operator import itemgetter
+from sys import intern
+from typing import Iterable, List
+
+
+def _intern(value):
+    """Intern a string value, leaving other values alone."""
+    return intern(value) if type(value) is str else value
+
+
+class Record:
+    """Base class of the resource records; subclasses list their JSON keys in slot order."""
+
+    __slots__ = ()
+    _keys = ()
+
+    def __init_subclass__(cls, **kwargs):
+        """Map the subclass's JSON keys to its attribute names."""
+        super().__init_subclass__(**kwargs)
+        cls._attributes = tuple(slot.lstrip("_") for slot in cls.__slots__)
+        cls._by_key = dict(zip(cls._keys, cls._attributes))
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Record":
+        """Build a record from a decoded JSON object; missing keys become None."""
+        return cls(*map(data.get, cls._keys))
+
+    @classmethod
+    def from_list(cls, items: Iterable[dict]) -> List["Record"]:
+        """Build records from a decoded JSON array."""
+        items = items if isinstance(items, list) else list(items)
+        try:
+            return list(starmap(cls, map(itemgetter(*cls._keys), items)))
+        except (KeyError, TypeError):
+            return list(map(cls.from_dict, items))
+
+    def to_dict(self) -> dict:
+        """Get the record as a JSON-ready dict."""
+        return {
+            key: value.to_dict() if isinstance(value, Record) else value
+            for key, value in zip(self._keys, (getattr(self, name) for name in self._attributes))
+        }
+
+    def __getitem__(self, key: str):
+        """Get a value by its JSON key, e.g. ``post["userId"]``."""
+        try:
+            return getattr(self, self._by_key[key])
+        except KeyError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key: str) -> bool:
+        """Check whether the record has a JSON key."""
+        return key in self._by_key
+
+    def __eq__(self, other):
+        """Compare records of the same type by value."""
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __hash__(self):
+        """Hash the record by type and id."""
+        return hash((type(self).__name__, getattr(self, "id", None)))
+
+    def __repr__(self):
+        """Represent the record by its values."""
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self._attributes)
+        return f"{type(self).__name__}({fields})"
+
+
+class Geo(Record):
+    """Coordinates of an address."""
+
+    __slots__ = ("lat", "lng")
+    _keys = ("lat", "lng")
+
+    def __init__(self, lat: str = None, lng: str = None):
+        """Store the coordinates."""
+        self.lat = lat
+        self.lng = lng
+
+
+class Address(Record):
+    """Postal address of a user."""
+
+    __slots__ = ("street", "suite", "city", "zipcode", "geo")
+    _keys = ("street", "suite", "city", "zipcode", "geo")
+
+    def __init__(self, street: str = None, suite: str = None, city: str = None, zipcode: str = None, geo=None):
+        """Store the address, interning the city."""
+        self.street = street
+        self.suite = suite
+        self.city = _intern(city)
+        self.zipcode = zipcode
+        self.geo = Geo.from_dict(geo) if isinstance(geo, dict) else geo
+
+
+class Company(Record):
+    """Employer of a user."""
+
+    __slots__ = ("name", "catch_phrase", "bs")
+    _keys = ("name", "catchPhrase", "bs")
+
+    def __init__(self, name: str = None, catch_phrase: str = None, bs: str = None):
+        """Store the company, interning its name."""
+        self.name = _intern(name)
+        self.catch_phrase = catch_phrase
+        self.bs = bs
+
+
+def _pack_address(address):
+    """Pack a decoded address into a tuple, interning the city."""
+    if not isinstance(address, dict):
+        return address
+    geo = address.get("geo")
+    if isinstance(geo, dict):
+        geo = (geo.get("lat"), geo.get("lng"))
+    return (address.get("street"), address.get("suite"), _intern(address.get("city")), address.get("zipcode"), geo)
+
+
+def _pack_company(company):
+    """Pack a decoded company into a tuple, interning its name."""
+    if not isinstance(company, dict):
+        return company
+    return (_intern(company.get("name")), company.get("catchPhrase"), company.get("bs"))
+
+
+class User(Record):
+    """A user; ``address`` and ``company`` are decoded on first access."""
+
+    __slots__ = ("id", "name", "username", "email", "_address", "phone", "website", "_company")
+    _keys = ("id", "name", "username", "email", "address", "phone", "website", "company")
+
+    def __init__(
+        self,
+        id: int = None,
+        name: str = None,
+        username: str = None,
+        email: str = None,
+        address=None,
+        phone: str = None,
+        website: str = None,
+        company=None,
+    ):
+        """Store the user, packing the nested objects."""
+        self.id = id
+        self.name = name
+        self.username = username
+        self.email = email
+        self._address = _pack_address(address)
+        self.phone = phone
+        self.website = website
+        self._company = _pack_company(company)
+
+    @property
+    def address(self) -> Address:
+        """Get the address, decoding it on first access."""
+        if type(self._address) is tuple:
+            street, suite, city, zipcode, geo = self._address
+            self._address = Address(street, suite, city, zipcode, Geo(*geo) if type(geo) is tuple else geo)
+        return self._address
+
+    @property
+    def company(self) -> Company:
+        """Get the company, decoding it on first access."""
+        if type(self._company) is tuple:
+            self._company = Company(*self._company)
+        return self._company
+
+
+class Post(Record):
+    """A post."""
+
+    __slots__ = ("user_id", "id", "title", "body")
+    _keys = ("userId", "id", "title", "body")
+
+    def __init__(self, user_id: int = None, id: int = None, title: str = None, body: str = None):
+        """Store the post."""
+        self.user_id = user_id
+        self.id = id
+        self.title = title
+        self.body = body
+
+
+class Comment(Record):
+    """A comment on a post."""
+
+    __slots__ = ("post_id", "id", "name", "email", "body")
+    _keys = ("postId", "id", "name", "email", "body")
+
+    def __init__(self, post_id: int = None, id: int = None, name: str = None, email: str = None, body: str = None):
+        """Store the comment, interning the commenter's email."""
+        self.post_id = post_id
+        self.id = id
+        self.name = name
+        self.email = _intern(email)
+        self.body = body
+
+
+class Todo(Record):
+    """A todo item of a user."""
+
+    __slots__ = ("user_id", "id", "title", "completed")
+    _keys = ("userId", "id", "title", "completed")
+
+    def __init__(self, user_id: int = None, id: int = None, title: str = None, completed: bool = None):
+        """Store the todo."""
+        self.user_id = user_id
+        self.id = id
+        self.title = title
+        self.completed = completed
+
+
+class Album(Record):
+    """A photo album of a user."""
+
+    __slots__ = ("user_id", "id", "title")
+    _keys = ("userId", "id", "title")
+
+    def __init__(self, user_id: int = None, id: int = None, title: str = None):
+        """Store the album."""
+        self.user_id = user_id
+        self.id = id
+        self.title = title
+
+
+class Photo(Record):
+    """A photo in an album."""
+
+    __slots__ = ("album_id", "id", "title", "url", "thumbnail_url")
+    _keys = ("albumId", "id", "title", "url", "thumbnailUrl")
+
+    def __init__(
+        self, album_id: int = None, id: int = None, title: str = None, url: str = None, thumbnail_url: str = None
+    ):
+        """Store the photo."""
+        self.album_id = album_id
+        self.id = id
+        self.title = title
+        self.url = url
+        self.thumbnail_url = thumbnail_url
@@ -0,0 +1,147 @@
+"""
+Paginated, streaming iteration over collection endpoints.
+"""
+
+import codecs
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator
+
+import requests
+
+PAGING_STYLES = ("page", "range")
+
+
+def page_params(paging: str, index: int, page_size: int) -> dict:
+    """Build the query params for a zero-based page index."""
+    if paging == "page":
+        return {"_page": index + 1, "_limit": page_size}
+    if paging == "range":
+        return {"_start": index * page_size, "_end": (index + 1) * page_size}
+    raise ValueError(f"Unknown paging style {paging!r}, expected one of {PAGING_STYLES}")
+
+
+def iter_json_array(response: requests.Response, chunk_size: int = 65536) -> Iterator:
+    """Yield the elements of a streamed JSON array without loading the whole body."""
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder(response.encoding or "utf-8")()
+    chunks = response.iter_content(chunk_size=chunk_size)
+    buffer, pos, started, exhausted = "", 0, False, False
+
+    def read_more():
+        nonlocal buffer, pos, exhausted
+        chunk = next(chunks, None)
+        if chunk is None:
+            exhausted = True
+            buffer = buffer[pos:] + text.decode(b"", final=True)
+        else:
+            buffer = buffer[pos:] + text.decode(chunk)
+        pos = 0
+
+    with response:
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos == len(buffer):
+                if exhausted:
+                    raise ValueError("Unexpected end of JSON array")
+                read_more()
+                continue
+            if not started:
+                if buffer[pos] != "[":
+                    raise ValueError("Response body is not a JSON array")
+                started = True
+                pos += 1
+                continue
+            if buffer[pos] == "]":
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if exhausted:
+                    raise
+                read_more()
+                continue
+            # A value not followed by a delimiter may be a truncated number.
+            if not exhausted and (end == len(buffer) or buffer[end] not in " \t\r\n,]"):
+                read_more()
+                continue
+            pos = end
+            yield item
+
+
+def iter_collection(
+    client,
+    endpoint: str,
+    params: dict = None,
+    page_size: int = 100,
+    paging: str = "page",
+    prefetch: bool = True,
+    incremental: bool = False,
+    max_pages: int = 100_000,
+) -> Iterator:
+    """Yield every item of a collection endpoint, one page at a time.
+
+    The next page is requested while the current one is consumed when
+    ``prefetch`` is set, and ``incremental`` parses each page as it streams
+    in. Pass ``page_size=None`` to stream an unpaginated collection. Paging
+    stops at a short page, and also at a page longer than ``page_size`` or
+    one repeating the previous page, which is how a backend that ignores the
+    paging params answers; more than ``max_pages`` pages raises RuntimeError.
+    """
+
+    def fetch(index):
+        query = dict(params or {})
+        if page_size is not None:
+            query.update(page_params(paging, index, page_size))
+        response = client._request("GET", endpoint, params=query, stream=incremental)
+        response.raise_for_status()
+        return response
+
+    def items(response):
+        return iter_json_array(response) if incremental else response.json()
+
+    def discard(future):
+        if incremental and not future.cancelled() and future.exception() is None:
+            future.result().close()
+
+    def responses():
+        index = 0
+        if page_size is None or not prefetch:
+            while True:
+                yield fetch(index)
+                index += 1
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(fetch, index)
+            try:
+                while True:
+                    response = future.result()
+                    future = executor.submit(fetch, index + 1)
+                    yield response
+                    index += 1
+            finally:
+                future.add_done_callback(discard)
+
+    pages = responses()
+    try:
+        previous = None
+        for number, response in enumerate(pages, 1):
+            page = iter(items(response))
+            current = []
+            for item in page:
+                if not current and previous and item == previous[0]:
+                    # Possibly the same page again; hold it back until it is known to differ.
+                    current = [item, *page]
+                    if current == previous:
+                        return
+                    yield from current
+                    break
+                current.append(item)
+                yield item
+            if page_size is None or len(current) != page_size:
+                return
+            if number >= max_pages:
+                raise RuntimeError(f"Stopped paginating {endpoint} after {max_pages} pages")
+            previous = current
+    finally:
+        pages.close()
@@ -0,0 +1,106 @@
+"""
+Token-bucket rate limiting, in-process or shared across processes through a locked file.
+"""
+
+import asyncio
+import os
+import struct
+import threading
+import time
+
+from api.file_lock import lock_file, unlock_file
+
+_STATE = struct.Struct("dd")
+
+
+class TokenBucket:
+    """Token bucket shared by the threads of one process."""
+
+    def __init__(self, rate: float, burst: int):
+        """Allow ``rate`` requests per second with bursts of up to ``burst``."""
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> float:
+        """Take a token, returning 0, or return how long to wait for the next one."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self):
+        """Block until a token is available."""
+        while True:
+            wait = self.try_acquire()
+            if not wait:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """Wait on the event loop until a token is available."""
+        while True:
+            wait = self.try_acquire()
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+
+class FileTokenBucket(TokenBucket):
+    """Token bucket whose state lives in a file, shared by every process that opens it."""
+
+    def __init__(self, path: str, rate: float, burst: int):
+        """Open (or create) the shared state file."""
+        super().__init__(rate, burst)
+        self.path = path
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+
+    def try_acquire(self) -> float:
+        """Take a token under an exclusive file lock."""
+        with self._lock:
+            lock_file(self._fd)
+            try:
+                now = time.time()
+                # Seek, read and write rather than pread/pwrite, which Windows lacks; both locks are held.
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                state = os.read(self._fd, _STATE.size)
+                tokens, updated = _STATE.unpack(state) if len(state) == _STATE.size else (self.burst, now)
+                tokens = min(self.burst, tokens + max(now - updated, 0) * self.rate)
+                wait = 0.0
+                if tokens >= 1:
+                    tokens -= 1
+                else:
+                    wait = (1 - tokens) / self.rate
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                os.write(self._fd, _STATE.pack(tokens, now))
+                return wait
+            finally:
+                unlock_file(self._fd)
+
+    def close(self):
+        """Close the state file."""
+        os.close(self._fd)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(config):
+    """Get the process-wide limiter for the config, or None if rate limiting is off."""
+    if not config.RATE_LIMIT:
+        return None
+    key = (config.RATE_LIMIT, config.RATE_LIMIT_BURST, config.RATE_LIMIT_FILE)
+    with _limiters_lock:
+        if key not in _limiters:
+            if config.RATE_LIMIT_FILE:
+                _limiters[key] = FileTokenBucket(config.RATE_LIMIT_FILE, config.RATE_LIMIT, config.RATE_LIMIT_BURST)
+            else:
+                _limiters[key] = TokenBucket(config.RATE_LIMIT, config.RATE_LIMIT_BURST)
+        return _limiters[key]
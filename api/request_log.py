@@ -0,0 +1,166 @@
+"""
+Structured request events, logged off the request path.
+
+Clients hand each request's ``RequestSample`` to a ``RequestLog``. Unless the
+event is sampled out, it is wrapped in an unformatted ``LogRecord`` and put on a
+bounded queue without blocking; a ``QueueListener`` thread formats it and writes
+it to the ``api.requests`` log handlers and, optionally, a JSONL file. When
+``LOG_LEVEL`` is above WARNING (the level of failed requests) and no JSONL file
+is set there is no ``RequestLog`` at all, so clients skip logging entirely.
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+from logging.handlers import QueueListener
+
+from api.metrics import RequestSample
+
+logger = logging.getLogger("api.requests")
+
+MESSAGE = "%s %s -> %s in %.1f ms"
+
+
+class _Relay(logging.Handler):
+    """Hand records from the listener thread to the ``api.requests`` logger's usual handlers."""
+
+    def emit(self, record: logging.LogRecord):
+        """Pass the record through the logger's level and filters and up the hierarchy."""
+        if logger.isEnabledFor(record.levelno):
+            logger.handle(record)
+
+
+class _Listener(QueueListener):
+    """Queue listener that waits for room to post its stop sentinel on a full queue."""
+
+    def enqueue_sentinel(self):
+        """Post the stop sentinel, blocking until the queue has room."""
+        self.queue.put(self._sentinel)
+
+
+class JSONLinesHandler(logging.Handler):
+    """Append request events to a JSONL file, one whole-line write per batch."""
+
+    def __init__(self, path: str, batch: int = 256):
+        """Open ``path`` for appending; several processes may share it."""
+        super().__init__()
+        self.path = path
+        self.batch = batch
+        self._lines = []
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+
+    def emit(self, record: logging.LogRecord):
+        """Buffer one event, writing the buffer once it is full."""
+        event = record.event
+        self._lines.append(json.dumps({
+            "ts": round(record.created, 6),
+            "method": event.method,
+            "template": event.template,
+            "status": event.status_code,
+            "latency_ms": round(event.total * 1000, 3),
+            "request_bytes": event.request_bytes,
+            "response_bytes": event.response_bytes,
+        }))
+        if len(self._lines) >= self.batch:
+            self.flush()
+
+    def flush(self):
+        """Write the buffered lines in one call, so lines from other processes do not interleave."""
+        if self._lines:
+            self._file.write("\n".join(self._lines) + "\n")
+            self._file.flush()
+            self._lines = []
+
+    def close(self):
+        """Flush and close the file."""
+        self.flush()
+        self._file.close()
+        super().close()
+
+
+class RequestLog:
+    """Sampled, non-blocking sink for request events."""
+
+    def __init__(self, level: int = logging.INFO, sample_rate: float = 1.0, path: str = "", queue_size: int = 10000):
+        """Start the background thread writing log lines at ``level`` and/or JSONL to ``path``."""
+        self.level = level
+        self.sample_rate = sample_rate
+        self.path = path
+        self.dropped = 0
+        self._queue = queue.Queue(queue_size)
+        self._random = random.random
+        handlers = []
+        if level <= logging.WARNING:
+            relay = _Relay()
+            relay.setLevel(level)
+            handlers.append(relay)
+        if path:
+            handlers.append(JSONLinesHandler(path))
+        self._handlers = handlers
+        self._listener = _Listener(self._queue, *handlers, respect_handler_level=True)
+        self._listener.start()
+
+    def record(self, sample: RequestSample):
+        """Queue one request event; failed requests and 5xx responses are never sampled out."""
+        failed = sample.status_code is None or sample.status_code >= 500
+        if self.sample_rate < 1.0 and not failed and self._random() >= self.sample_rate:
+            return
+        level = logging.WARNING if failed else logging.INFO
+        if level < self.level and not self.path:
+            return
+        # The client method that sent the request is the caller; one frame lookup is far cheaper than findCaller.
+        caller = sys._getframe(1)
+        record = logger.makeRecord(
+            logger.name, level, caller.f_code.co_filename, caller.f_lineno, MESSAGE,
+            (sample.method, sample.template, sample.status_code, sample.total * 1000), None,
+            caller.f_code.co_name, {"event": sample},
+        )
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        """Drain the queue, stop the thread and close the JSONL file."""
+        self._listener.stop()
+        for handler in self._handlers:
+            handler.close()
+
+
+_logs = {}
+_logs_lock = threading.Lock()
+
+
+def get_request_log(config):
+    """Get the process-wide request log for the config, or None if nothing would be written."""
+    level = logging.getLevelName(str(config.LOG_LEVEL).upper())
+    level = level if isinstance(level, int) else logging.INFO
+    path = config.REQUEST_LOG_PATH
+    if (level > logging.WARNING and not path) or config.REQUEST_LOG_SAMPLE_RATE <= 0:
+        return None
+    key = (level, config.REQUEST_LOG_SAMPLE_RATE, path)
+    with _logs_lock:
+        log = _logs.get(key)
+        if log is None:
+            log = _logs[key] = RequestLog(level, config.REQUEST_LOG_SAMPLE_RATE, path, config.REQUEST_LOG_QUEUE_SIZE)
+        return log
+
+
+def close_request_logs():
+    """Flush and stop every request log."""
+    with _logs_lock:
+        logs = list(_logs.values())
+        _logs.clear()
+    for log in logs:
+        log.close()
+
+
+atexit.register(close_request_logs)
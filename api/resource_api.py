@@ -0,0 +1,44 @@
+"""
+Clients for the resources without hand-tuned modules: todos, albums and photos.
+
+Every method is generated from the resource's entry in ``api.endpoints``; a new
+resource needs only a ``register`` call there and a two-line class here, or
+``client_class(name)`` for a client built on demand.
+"""
+
+from api.base_api_client import BaseAPIClient
+from api.endpoints import RESOURCES
+
+_classes = {}
+
+
+class TodoAPI(BaseAPIClient):
+    """Client for Todo API endpoints."""
+
+    resource = "todos"
+
+
+class AlbumAPI(BaseAPIClient):
+    """Client for Album API endpoints."""
+
+    resource = "albums"
+
+
+class PhotoAPI(BaseAPIClient):
+    """Client for Photo API endpoints."""
+
+    resource = "photos"
+
+
+def client_class(name: str) -> type:
+    """Get a client class for a registered resource, generating it once per registration."""
+    resource = RESOURCES.get(name)
+    if resource is None:
+        raise ValueError(f"Unknown resource {name!r}, register it in api.endpoints first")
+    cls = _classes.get(resource)
+    if cls is None:
+        title = resource.item.title().replace("_", "")
+        cls = _classes[resource] = type(f"{title}API", (BaseAPIClient,), {
+            "__doc__": f"Client for {title} API endpoints.", "__module__": __name__, "resource": name,
+        })
+    return cls
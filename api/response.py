@@ -0,0 +1,129 @@
+"""
+Response wrapper that decodes JSON bodies lazily, once, with the fastest available backend.
+"""
+
+import json
+import time
+
+import requests
+
+try:
+    import orjson
+
+    JSON_BACKEND = "orjson"
+    json_loads = orjson.loads
+except ImportError:
+    try:
+        import ujson
+
+        JSON_BACKEND = "ujson"
+        json_loads = ujson.loads
+    except ImportError:
+        JSON_BACKEND = "json"
+        json_loads = json.loads
+
+_UNSET = object()
+# Callbacks receiving the seconds spent decoding each body, e.g. the profiler's.
+_decode_hooks = ()
+
+
+def add_decode_hook(hook):
+    """Call ``hook(seconds)`` after every body decode."""
+    global _decode_hooks
+    _decode_hooks = (*_decode_hooks, hook)
+
+
+def remove_decode_hook(hook):
+    """Stop calling a decode hook."""
+    global _decode_hooks
+    _decode_hooks = tuple(existing for existing in _decode_hooks if existing != hook)
+
+
+class APIResponse:
+    """Wrapper around ``requests.Response`` that caches the decoded JSON body.
+
+    Every other attribute (``status_code``, ``headers``, ``text`` ...) is read
+    from the wrapped response.
+    """
+
+    __slots__ = ("response", "from_cache", "_json")
+
+    def __init__(self, response: requests.Response, from_cache: bool = False):
+        """Wrap a response."""
+        self.response = response
+        self.from_cache = from_cache
+        self._json = _UNSET
+
+    def __getattr__(self, name):
+        """Delegate to the wrapped response."""
+        return getattr(self.response, name)
+
+    def json(self):
+        """Decode the JSON body on first access and return the same object afterwards."""
+        if self._json is _UNSET:
+            self._json = self._decode()
+        return self._json
+
+    def json_list(self) -> list:
+        """Get the decoded body, which must be a JSON array."""
+        body = self.json()
+        if not isinstance(body, list):
+            raise TypeError(f"Expected a JSON array, got {type(body).__name__}")
+        return body
+
+    def json_dict(self) -> dict:
+        """Get the decoded body, which must be a JSON object."""
+        body = self.json()
+        if not isinstance(body, dict):
+            raise TypeError(f"Expected a JSON object, got {type(body).__name__}")
+        return body
+
+    def _decode(self):
+        """Get the decoded body without caching it, unless ``json()`` already has."""
+        if self._json is not _UNSET:
+            return self._json
+        content = self.response.content
+        started = time.perf_counter() if _decode_hooks else None
+        try:
+            body = json_loads(content)
+        except ValueError as error:
+            raise requests.exceptions.JSONDecodeError(str(error), self.response.text, 0)
+        if started is not None:
+            elapsed = time.perf_counter() - started
+            for hook in _decode_hooks:
+                hook(elapsed)
+        return body
+
+    def as_records(self, model) -> list:
+        """Decode a JSON array body straight into ``model`` records (see ``api.models``)."""
+        body = self._decode()
+        if not isinstance(body, list):
+            raise TypeError(f"Expected a JSON array, got {type(body).__name__}")
+        return model.from_list(body)
+
+    def as_record(self, model):
+        """Decode a JSON object body straight into a ``model`` record (see ``api.models``)."""
+        body = self._decode()
+        if not isinstance(body, dict):
+            raise TypeError(f"Expected a JSON object, got {type(body).__name__}")
+        return model.from_dict(body)
+
+    def __bool__(self):
+        """Check whether the status code is below 400."""
+        return bool(self.response)
+
+    def __iter__(self):
+        """Iterate over the body in chunks."""
+        return iter(self.response)
+
+    def __enter__(self):
+        """Enter the context manager."""
+        return self
+
+    def __exit__(self, *args):
+        """Close the wrapped response."""
+        self.response.close()
+
+    def __repr__(self):
+        """Represent the wrapper by its status code."""
+        return f"<APIResponse [{self.response.status_code}]>"
@@ -0,0 +1,149 @@
+"""
+Retry policies with exponential backoff and jitter, and hedged GET requests.
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Callable, FrozenSet, Optional
+
+import requests
+
+# Methods that are safe to send more than once (RFC 9110, section 9.2.2).
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE", "TRACE"})
+RETRY_ERRORS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Get the seconds to wait from a ``Retry-After`` header in seconds or HTTP-date form."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class RetryPolicy:
+    """When and how long to wait before retrying a request."""
+
+    total: int = 0
+    backoff_factor: float = 0.1
+    backoff_max: float = 10.0
+    statuses: FrozenSet[int] = frozenset({429, 500, 502, 503, 504})
+    methods: FrozenSet[str] = IDEMPOTENT_METHODS
+    respect_retry_after: bool = True
+
+    def allows(self, method: str, attempt: int) -> bool:
+        """Check whether a failed attempt (counted from 0) may be retried."""
+        return attempt < self.total and method.upper() in self.methods
+
+    def retry_status(self, method: str, status_code: int, attempt: int) -> bool:
+        """Check whether a response status should be retried."""
+        return status_code in self.statuses and self.allows(method, attempt)
+
+    def backoff(self, attempt: int) -> float:
+        """Get a "full jitter" backoff: uniform between 0 and the capped exponential delay."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_factor * 2 ** attempt))
+
+    def delay(self, attempt: int, response=None) -> float:
+        """Get how long to wait before the next attempt, preferring the server's ``Retry-After``."""
+        if self.respect_retry_after and response is not None:
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if retry_after is not None:
+                return min(retry_after, self.backoff_max)
+        return self.backoff(attempt)
+
+
+@dataclass
+class HedgePolicy:
+    """When to send a duplicate GET for a slow request."""
+
+    percentile: float = 95.0
+    min_samples: int = 20
+    min_delay: float = 0.0
+
+    def delay(self, metrics, key: str) -> Optional[float]:
+        """Get how long to wait before hedging, or None until enough latencies were observed."""
+        if metrics is None:
+            return None
+        observed = metrics.latency_percentile(key, self.percentile, self.min_samples)
+        if observed is None:
+            return None
+        return max(observed / 1000, self.min_delay)
+
+
+def _close_response(future):
+    """Release the connection of a response nobody will read."""
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+
+class Hedger:
+    """Run a request, and a duplicate of it if the first is slower than the hedge delay."""
+
+    def __init__(self, max_workers: int):
+        """Create the thread pool running hedged requests."""
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hedge")
+        self.hedged = 0
+
+    def run(self, send: Callable[[], requests.Response], delay: float) -> requests.Response:
+        """Get the first successful response of the request and its hedge."""
+        first = self.executor.submit(send)
+        done, _ = wait([first], timeout=delay)
+        if done:
+            return first.result()
+        self.hedged += 1
+        hedge = self.executor.submit(send)
+        pending = {first, hedge}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    for loser in pending:
+                        loser.add_done_callback(_close_response)
+                    return future.result()
+                error = future.exception()
+        raise error
+
+
+_hedger = None
+_hedger_lock = threading.Lock()
+
+
+def get_retry_policy(config) -> RetryPolicy:
+    """Build the retry policy from the config."""
+    return RetryPolicy(
+        total=config.RETRY_TOTAL,
+        backoff_factor=config.RETRY_BACKOFF_FACTOR,
+        backoff_max=config.RETRY_BACKOFF_MAX,
+        statuses=frozenset(config.RETRY_STATUSES),
+    )
+
+
+def get_hedge_policy(config) -> Optional[HedgePolicy]:
+    """Build the hedge policy from the config, or None if hedging is off."""
+    if not config.HEDGE_ENABLED:
+        return None
+    return HedgePolicy(
+        percentile=config.HEDGE_PERCENTILE,
+        min_samples=config.HEDGE_MIN_SAMPLES,
+        min_delay=config.HEDGE_MIN_DELAY,
+    )
+
+
+def get_hedger(config) -> Hedger:
+    """Get the process-wide hedger."""
+    global _hedger
+    with _hedger_lock:
+        if _hedger is None:
+            _hedger = Hedger(config.HEDGE_MAX_WORKERS)
+        return _hedger
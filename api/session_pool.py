@@ -0,0 +1,90 @@
+"""
+Shared, pooled requests sessions with one tuned HTTPAdapter per host.
+"""
+
+import threading
+from collections import Counter
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from api.metrics import TIMED_POOL_CLASSES
+from api.transport import wrap_adapter
+
+_sessions = {}
+_lock = threading.Lock()
+# Counters of sessions that were already closed, so totals survive teardown.
+_closed_stats = Counter()
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that times new connections and reports how often they are reused."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        """Create the pool manager with timed connection pools."""
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = TIMED_POOL_CLASSES
+
+    def connection_stats(self) -> Counter:
+        """Count requests sent and connections opened by this adapter."""
+        stats = Counter()
+        pools = self.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            stats["requests"] += pool.num_requests
+            stats["opened"] += pool.num_connections
+        return stats
+
+
+def _host_prefix(base_url: str) -> str:
+    """Get the scheme and host prefix an adapter is mounted on."""
+    parts = urlsplit(base_url)
+    return f"{parts.scheme}://{parts.netloc}/"
+
+
+def create_session(config, prefixes=("http://", "https://")) -> requests.Session:
+    """Create a session with a tuned PooledHTTPAdapter, wrapped for record/replay, on each prefix."""
+    session = requests.Session()
+    for prefix in prefixes:
+        adapter = PooledHTTPAdapter(
+            pool_connections=config.POOL_CONNECTIONS,
+            pool_maxsize=config.POOL_MAXSIZE,
+        )
+        session.mount(prefix, wrap_adapter(adapter, config))
+    return session
+
+
+def get_session(config) -> requests.Session:
+    """Get the shared session for the host of the config's base URL."""
+    prefix = _host_prefix(config.BASE_URL)
+    with _lock:
+        session = _sessions.get(prefix)
+        if session is None:
+            session = _sessions[prefix] = create_session(config, prefixes=(prefix,))
+        return session
+
+
+def connection_stats() -> dict:
+    """Get request, opened and reused connection counts for all shared sessions."""
+    stats = Counter(_closed_stats)
+    with _lock:
+        for prefix, session in _sessions.items():
+            stats += session.get_adapter(prefix).connection_stats()
+    requests_sent, opened = stats["requests"], stats["opened"]
+    return {
+        "requests": requests_sent,
+        "opened": opened,
+        "reused": max(requests_sent - opened, 0),
+    }
+
+
+def close_sessions():
+    """Close all shared sessions, keeping their connection counts."""
+    with _lock:
+        for prefix, session in _sessions.items():
+            _closed_stats.update(session.get_adapter(prefix).connection_stats())
+            session.close()
+        _sessions.clear()
@@ -0,0 +1,99 @@
+"""
+Single-flight deduplication: concurrent identical GETs share one network call.
+"""
+
+import asyncio
+import threading
+import weakref
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Optional
+
+from api.cache import cache_key
+
+
+def flight_key(url: str, params: dict = None, headers: dict = None) -> str:
+    """Build the key identical GETs share: URL, sorted params and sorted headers."""
+    key = cache_key("GET", url, params)
+    if headers:
+        key += "\n" + "\n".join(f"{name.lower()}: {value}" for name, value in sorted(headers.items()))
+    return key
+
+
+class SingleFlight:
+    """Run one call per key at a time across threads; callers arriving meanwhile wait for its result."""
+
+    def __init__(self):
+        """Create an empty in-flight table."""
+        self.calls = 0
+        self.shared = 0
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, func: Callable):
+        """Call ``func``, or wait for the in-flight call with the same key and return its result."""
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+                self.calls += 1
+            else:
+                self.shared += 1
+        if not leader:
+            return future.result()
+        try:
+            result = func()
+        except BaseException as error:
+            self._finish(key)
+            future.set_exception(error)
+            raise
+        self._finish(key)
+        future.set_result(result)
+        return result
+
+    def _finish(self, key: str):
+        """Let later callers start a new call for the key."""
+        with self._lock:
+            del self._in_flight[key]
+
+
+class AsyncSingleFlight:
+    """Run one coroutine per key at a time on an event loop; concurrent callers await its result."""
+
+    def __init__(self):
+        """Create an empty in-flight table."""
+        self.calls = 0
+        self.shared = 0
+        self._in_flight = {}
+
+    async def do(self, key: str, func: Callable[[], Awaitable]):
+        """Await ``func()``, or the in-flight call with the same key."""
+        task = self._in_flight.get(key)
+        if task is None:
+            # A task of its own, so one caller being cancelled does not cancel the others.
+            task = self._in_flight[key] = asyncio.ensure_future(func())
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+            self.calls += 1
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+
+_single_flight = SingleFlight()
+# Tasks belong to one event loop, so each loop gets its own table.
+_async_single_flights = weakref.WeakKeyDictionary()
+
+
+def get_single_flight(config) -> Optional[SingleFlight]:
+    """Get the process-wide single-flight table, or None if deduplication is off."""
+    return _single_flight if config.SINGLE_FLIGHT else None
+
+
+def get_async_single_flight(config) -> Optional[AsyncSingleFlight]:
+    """Get the single-flight table of the running loop, or None if deduplication is off."""
+    if not config.SINGLE_FLIGHT:
+        return None
+    loop = asyncio.get_running_loop()
+    if loop not in _async_single_flights:
+        _async_single_flights[loop] = AsyncSingleFlight()
+    return _async_single_flights[loop]
@@ -0,0 +1,254 @@
+"""
+Columnar tables for bulk assertions over collection responses.
+
+A ``Table`` stores each field as one column: ``array.array`` (or a NumPy array
+when NumPy is installed) for integer, float and boolean fields, and a list for
+everything else. Hash indexes are built once per column on first use, so lookups,
+joins, group counts and referential checks run in linear time.
+"""
+
+from array import array
+from collections import Counter
+from itertools import compress, repeat
+from typing import Dict, Iterable, List, Sequence
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+_TYPECODES = {int: "q", float: "d", bool: "b"}
+
+
+def _pluck(record, path: List[str]):
+    """Get a possibly nested value, or None if any part of the path is missing."""
+    for part in path:
+        if not isinstance(record, dict):
+            return None
+        record = record.get(part)
+    return record
+
+
+def _to_column(values: list):
+    """Pack a list of values into the most compact column type that holds them."""
+    kinds = set(map(type, values))
+    if kinds == {int, float}:
+        kinds = {float}
+    if len(kinds) != 1:
+        return values
+    typecode = _TYPECODES.get(kinds.pop())
+    if typecode is None:
+        return values
+    if numpy is not None:
+        return numpy.array(values, dtype={"q": numpy.int64, "d": numpy.float64, "b": numpy.bool_}[typecode])
+    try:
+        return array(typecode, values)
+    except OverflowError:
+        return values
+
+
+class TableAssertionError(AssertionError):
+    """Raised by the ``assert_*`` methods, listing the offending values."""
+
+    def __init__(self, message: str, values: list, limit: int = 20):
+        """Describe the failure with up to ``limit`` offending values."""
+        shown = ", ".join(repr(value) for value in values[:limit])
+        more = f" and {len(values) - limit} more" if len(values) > limit else ""
+        super().__init__(f"{message}: {shown}{more}")
+        self.values = values
+
+
+class Table:
+    """Column-oriented view of a list of records."""
+
+    def __init__(self, columns: Dict[str, Sequence], name: str = "table"):
+        """Wrap equally long columns."""
+        lengths = {len(column) for column in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"Columns of {name} have different lengths: {sorted(lengths)}")
+        self.columns = columns
+        self.name = name
+        self._length = lengths.pop() if lengths else 0
+        self._indexes = {}
+
+    @classmethod
+    def from_records(cls, records: Iterable[dict], fields: Sequence[str] = None, name: str = "table") -> "Table":
+        """Build a table from dicts; ``fields`` may name nested values as ``address.city``."""
+        records = records if isinstance(records, list) else list(records)
+        if fields is None:
+            fields = list(records[0]) if records else []
+        columns = {}
+        for field in fields:
+            path = field.split(".")
+            if len(path) == 1:
+                values = [record.get(field) for record in records]
+            else:
+                values = [_pluck(record, path) for record in records]
+            columns[field] = _to_column(values)
+        return cls(columns, name)
+
+    @classmethod
+    def from_response(cls, response, fields: Sequence[str] = None, name: str = None) -> "Table":
+        """Build a table from a collection response (an ``APIResponse`` or ``requests.Response``)."""
+        if name is None:
+            name = response.url.split("?", 1)[0].rstrip("/").rsplit("/", 1)[-1]
+        return cls.from_records(response.json(), fields, name)
+
+    def __len__(self):
+        """Get the number of rows."""
+        return self._length
+
+    def __getitem__(self, name: str) -> Sequence:
+        """Get a column."""
+        return self.columns[name]
+
+    def __repr__(self):
+        """Represent the table by its name, size and columns."""
+        return f"<Table {self.name} {self._length} rows {list(self.columns)}>"
+
+    def records(self) -> List[dict]:
+        """Get the rows back as dicts."""
+        names = list(self.columns)
+        return [dict(zip(names, row)) for row in zip(*(self._values(name) for name in names))]
+
+    def _values(self, name: str) -> list:
+        """Get a column as a list of Python values."""
+        column = self.columns[name]
+        return column.tolist() if hasattr(column, "tolist") else list(column)
+
+    def index(self, name: str) -> Dict[object, List[int]]:
+        """Get (building once) the hash index of a column: value -> row positions."""
+        index = self._indexes.get(name)
+        if index is None:
+            index = {}
+            for position, value in enumerate(self._values(name)):
+                rows = index.get(value)
+                if rows is None:
+                    index[value] = [position]
+                else:
+                    rows.append(position)
+            self._indexes[name] = index
+        return index
+
+    def _positions(self, name: str) -> Dict[object, int]:
+        """Get (building once) value -> last row position; as long as the table if values are unique."""
+        key = (name, "unique")
+        positions = self._indexes.get(key)
+        if positions is None:
+            positions = self._indexes[key] = dict(zip(self._values(name), range(self._length)))
+        return positions
+
+    def take(self, positions: Sequence[int]) -> "Table":
+        """Get a table of the rows at ``positions``."""
+        if positions == range(self._length):
+            return Table(dict(self.columns), self.name)
+        columns = {}
+        for name, column in self.columns.items():
+            if numpy is not None and isinstance(column, numpy.ndarray):
+                columns[name] = column[numpy.asarray(positions, dtype=numpy.int64)]
+            elif isinstance(column, array):
+                columns[name] = array(column.typecode, map(column.tolist().__getitem__, positions))
+            else:
+                columns[name] = list(map(column.__getitem__, positions))
+        return Table(columns, self.name)
+
+    def where(self, name: str, value) -> "Table":
+        """Get the rows whose column equals ``value``, through the column's index."""
+        return self.take(self.index(name).get(value, ()))
+
+    def filter(self, name: str, predicate) -> "Table":
+        """Get the rows whose column value satisfies ``predicate``."""
+        return self.take(list(compress(range(self._length), map(predicate, self._values(name)))))
+
+    def count_by(self, name: str) -> Dict[object, int]:
+        """Count rows per distinct value of a column."""
+        column = self.columns[name]
+        if numpy is not None and isinstance(column, numpy.ndarray):
+            values, counts = numpy.unique(column, return_counts=True)
+            return dict(zip(values.tolist(), counts.tolist()))
+        return dict(Counter(column))
+
+    def group_by(self, name: str) -> Dict[object, "Table"]:
+        """Split the table into one table per distinct value of a column."""
+        return {value: self.take(rows) for value, rows in self.index(name).items()}
+
+    def distinct(self, name: str) -> set:
+        """Get the distinct values of a column."""
+        return set(self._values(name))
+
+    def duplicates(self, name: str) -> list:
+        """Get the values that occur in more than one row."""
+        return [value for value, count in self.count_by(name).items() if count > 1]
+
+    def is_unique(self, name: str) -> bool:
+        """Check that no value occurs twice in a column."""
+        return len(self.distinct(name)) == self._length
+
+    def missing_references(self, name: str, other: "Table", other_name: str = "id") -> list:
+        """Get the values of a column that do not occur in ``other``'s column, sorted when possible."""
+        column, target = self.columns[name], other.columns[other_name]
+        if numpy is not None and isinstance(column, numpy.ndarray) and isinstance(target, numpy.ndarray):
+            return numpy.setdiff1d(column, target).tolist()
+        missing = set(column).difference(target)
+        try:
+            return sorted(missing)
+        except TypeError:
+            return list(missing)
+
+    def join(self, other: "Table", on: str, other_on: str = "id", how: str = "inner", suffix: str = "_right") -> "Table":
+        """Hash join on ``self[on] == other[other_on]``; ``how`` is ``inner`` or ``left``."""
+        if how not in ("inner", "left"):
+            raise ValueError(f"Unknown join {how!r}, expected 'inner' or 'left'")
+        left_values = self._values(on)
+        positions = other._positions(other_on)
+        if len(positions) == len(other):
+            # Joining on a unique key: one lookup per row, looped in C.
+            right_rows = list(map(positions.get, left_values, repeat(-1)))
+            left_rows = range(self._length)
+            if how == "inner" and -1 in right_rows:
+                keep = list(map((-1).__ne__, right_rows))
+                left_rows = list(compress(left_rows, keep))
+                right_rows = list(compress(right_rows, keep))
+        else:
+            index = other.index(other_on)
+            left_rows, right_rows = array("q"), array("q")
+            for position, value in enumerate(left_values):
+                matches = index.get(value)
+                if matches is None:
+                    if how == "left":
+                        left_rows.append(position)
+                        right_rows.append(-1)
+                    continue
+                left_rows.extend(repeat(position, len(matches)))
+                right_rows.extend(matches)
+        columns = dict(self.take(left_rows).columns)
+        matched = list(map((-1).__ne__, right_rows))
+        for name in other.columns:
+            values = other._values(name)
+            if all(matched):
+                column = list(map(values.__getitem__, right_rows))
+            else:
+                column = [values[row] if keep else None for row, keep in zip(right_rows, matched)]
+            columns[name + suffix if name in columns else name] = _to_column(column)
+        return Table(columns, f"{self.name}+{other.name}")
+
+    def assert_unique(self, name: str):
+        """Raise ``TableAssertionError`` listing duplicated values of a column."""
+        duplicates = self.duplicates(name)
+        if duplicates:
+            raise TableAssertionError(f"{self.name}.{name} has {len(duplicates)} duplicated value(s)", duplicates)
+
+    def assert_references(self, name: str, other: "Table", other_name: str = "id"):
+        """Raise ``TableAssertionError`` listing values of a column missing from ``other``'s column."""
+        missing = self.missing_references(name, other, other_name)
+        if missing:
+            raise TableAssertionError(
+                f"{self.name}.{name} has {len(missing)} value(s) missing from {other.name}.{other_name}", missing
+            )
+
+    def assert_counts(self, name: str, expected: int):
+        """Raise ``TableAssertionError`` listing values of a column whose row count is not ``expected``."""
+        wrong = [value for value, count in self.count_by(name).items() if count != expected]
+        if wrong:
+            raise TableAssertionError(f"{self.name}.{name} values without exactly {expected} rows", wrong)
+
@@ -0,0 +1,363 @@
+"""
+Record/replay transports that capture responses into an indexed cassette file and serve them back offline.
+"""
+
+import atexit
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+from collections import Counter
+from typing import Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import httpx
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from api.file_lock import lock_file, unlock_file
+
+TRANSPORT_MODES = ("live", "record", "replay")
+
+_MAGIC = b"APICAS01"
+# Footer: magic, index offset, entry count.
+_FOOTER = struct.Struct("<8sQQ")
+# Index entry: request key, record offset, record length; entries are sorted by key.
+_ENTRY = struct.Struct("<16sQI")
+# Record: length of the JSON metadata that precedes the body.
+_RECORD = struct.Struct("<I")
+# Headers that describe the wire encoding, not the stored (decoded) body.
+_WIRE_HEADERS = ("Content-Encoding", "Content-Length", "Transfer-Encoding", "Connection")
+
+
+class CassetteMissError(requests.exceptions.RequestException):
+    """No response was recorded for a request being replayed; not a connection error, so it is never retried."""
+
+
+def _normalize_url(url: str) -> str:
+    """Sort the query string so parameter order does not change the key."""
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, query, ""))
+
+
+def body_digest(body, content_type: str = None) -> str:
+    """Hash a request body, canonicalizing JSON so key order and spacing do not matter."""
+    if not body:
+        return ""
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    if content_type and "json" in content_type:
+        try:
+            body = json.dumps(json.loads(body), sort_keys=True, separators=(",", ":")).encode("utf-8")
+        except ValueError:
+            pass
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+def request_key(method: str, url: str, body=None, content_type: str = None) -> bytes:
+    """Build the 16-byte cassette key of a request from its method, URL and body hash."""
+    identity = f"{method.upper()} {_normalize_url(url)} {body_digest(body, content_type)}"
+    return hashlib.blake2b(identity.encode("utf-8"), digest_size=16).digest()
+
+
+def encode_record(status_code: int, reason: str, url: str, headers, content: bytes) -> bytes:
+    """Serialize a response as metadata length, JSON metadata and raw body."""
+    headers = {name: value for name, value in headers.items() if name.title() not in _WIRE_HEADERS}
+    headers["Content-Length"] = str(len(content))
+    meta = json.dumps({"status_code": status_code, "reason": reason, "url": url, "headers": headers}).encode("utf-8")
+    return _RECORD.pack(len(meta)) + meta + content
+
+
+def decode_record(record) -> Tuple[dict, bytes]:
+    """Split a stored record into its metadata and body."""
+    (meta_length,) = _RECORD.unpack_from(record)
+    start = _RECORD.size
+    return json.loads(record[start:start + meta_length]), record[start + meta_length:]
+
+
+class Cassette:
+    """Recorded responses in one file, looked up by binary search over a memory-mapped index.
+
+    Records are written first, then the sorted index and a footer. Replays never
+    parse the file: a lookup reads log2(n) index entries and one record straight
+    from the mapping.
+    """
+
+    def __init__(self, path: str):
+        """Map the cassette file, if there is one."""
+        self.path = path
+        self._recorded = {}
+        self._lock = threading.Lock()
+        self._file = None
+        self._map = None
+        self._index_offset = 0
+        self._count = 0
+        self._load()
+
+    def _load(self):
+        """Map the cassette file and read its footer."""
+        self._unmap()
+        if not os.path.exists(self.path) or os.path.getsize(self.path) < _FOOTER.size:
+            return
+        self._file = open(self.path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self._index_offset, self._count = _FOOTER.unpack_from(self._map, len(self._map) - _FOOTER.size)
+        if magic != _MAGIC:
+            self._unmap()
+            raise ValueError(f"Not a cassette file: {self.path}")
+
+    def _unmap(self):
+        """Release the current mapping."""
+        if self._map is not None:
+            self._map.close()
+            self._file.close()
+        self._file = self._map = None
+        self._index_offset = self._count = 0
+
+    def __len__(self) -> int:
+        """Count the stored and newly recorded responses."""
+        with self._lock:
+            return len(set(self._keys()) | set(self._recorded))
+
+    def _entry(self, position: int) -> Tuple[bytes, int, int]:
+        """Read one index entry."""
+        return _ENTRY.unpack_from(self._map, self._index_offset + position * _ENTRY.size)
+
+    def _keys(self):
+        """Iterate over the keys in the mapped file."""
+        for position in range(self._count):
+            yield self._entry(position)[0]
+
+    def _find(self, key: bytes) -> Optional[bytes]:
+        """Binary search the mapped index for a key's record."""
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            entry_key, offset, length = self._entry(middle)
+            if entry_key == key:
+                return self._map[offset:offset + length]
+            if entry_key < key:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def get(self, key: bytes) -> Optional[Tuple[dict, bytes]]:
+        """Get the metadata and body recorded for a key; holds the lock because ``save`` remaps the file."""
+        with self._lock:
+            record = self._recorded.get(key)
+            if record is None and self._map is not None:
+                record = self._find(key)
+        return decode_record(record) if record is not None else None
+
+    def put(self, key: bytes, record: bytes):
+        """Record a response; it is written out on ``save``."""
+        with self._lock:
+            self._recorded[key] = record
+
+    def save(self):
+        """Merge new recordings into the file, holding a lock so concurrent recorders do not clobber it."""
+        with self._lock:
+            if not self._recorded:
+                return
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(f"{self.path}.lock", "w") as lock:
+                lock_file(lock.fileno())
+                try:
+                    # Another process may have saved since this one mapped the file.
+                    self._load()
+                    records = {}
+                    for position in range(self._count):
+                        key, offset, length = self._entry(position)
+                        records[key] = self._map[offset:offset + length]
+                    records.update(self._recorded)
+                    temporary = f"{self.path}.{os.getpid()}.tmp"
+                    with open(temporary, "wb") as handle:
+                        index = []
+                        offset = 0
+                        for key, record in records.items():
+                            handle.write(record)
+                            index.append((key, offset, len(record)))
+                            offset += len(record)
+                        for entry in sorted(index):
+                            handle.write(_ENTRY.pack(*entry))
+                        handle.write(_FOOTER.pack(_MAGIC, offset, len(index)))
+                    # Windows cannot replace a file that is still mapped.
+                    self._unmap()
+                    os.replace(temporary, self.path)
+                    self._recorded.clear()
+                    self._load()
+                finally:
+                    unlock_file(lock.fileno())
+
+    def close(self):
+        """Save new recordings and release the mapping."""
+        self.save()
+        with self._lock:
+            self._unmap()
+
+
+def _requests_key(request: requests.PreparedRequest) -> bytes:
+    """Get the cassette key of a prepared request."""
+    return request_key(request.method, request.url, request.body, request.headers.get("Content-Type"))
+
+
+def _build_response(request: requests.PreparedRequest, meta: dict, content: bytes) -> requests.Response:
+    """Rebuild a requests response from a record."""
+    response = requests.Response()
+    response.request = request
+    response.url = meta["url"]
+    response.status_code = meta["status_code"]
+    response.reason = meta["reason"]
+    response.headers = CaseInsensitiveDict(meta["headers"])
+    response.encoding = get_encoding_from_headers(response.headers)
+    response._content = content
+    response._content_consumed = True
+    return response
+
+
+class ReplayAdapter(BaseAdapter):
+    """Adapter that serves every request from a cassette and never touches the network."""
+
+    def __init__(self, cassette: Cassette):
+        """Serve responses from ``cassette``."""
+        super().__init__()
+        self.cassette = cassette
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        """Return the recorded response, or raise CassetteMissError."""
+        record = self.cassette.get(_requests_key(request))
+        if record is None:
+            raise CassetteMissError(f"No recorded response for {request.method} {request.url}", request=request)
+        return _build_response(request, *record)
+
+    def connection_stats(self) -> Counter:
+        """Report no network traffic."""
+        return Counter()
+
+    def close(self):
+        """Nothing to release; the cassette is shared."""
+
+
+class RecordingAdapter(BaseAdapter):
+    """Adapter that sends requests through another adapter and records each response."""
+
+    def __init__(self, adapter: BaseAdapter, cassette: Cassette):
+        """Wrap ``adapter``, recording into ``cassette``."""
+        super().__init__()
+        self.adapter = adapter
+        self.cassette = cassette
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        """Send the request and record the fully read response."""
+        response = self.adapter.send(request, stream=stream, timeout=timeout, verify=verify, cert=cert, proxies=proxies)
+        record = encode_record(response.status_code, response.reason, response.url, response.headers, response.content)
+        self.cassette.put(_requests_key(request), record)
+        return response
+
+    def connection_stats(self) -> Counter:
+        """Report the wrapped adapter's connection counts."""
+        return self.adapter.connection_stats()
+
+    def close(self):
+        """Close the wrapped adapter and write out the recordings."""
+        self.adapter.close()
+        self.cassette.save()
+
+
+def _httpx_key(request: httpx.Request) -> bytes:
+    """Get the cassette key of an httpx request."""
+    return request_key(request.method, str(request.url), request.content, request.headers.get("Content-Type"))
+
+
+def _build_httpx_response(request: httpx.Request, meta: dict, content: bytes) -> httpx.Response:
+    """Rebuild an httpx response from a record."""
+    return httpx.Response(meta["status_code"], headers=meta["headers"], content=content, request=request)
+
+
+class AsyncReplayTransport(httpx.AsyncBaseTransport):
+    """httpx transport that serves every request from a cassette."""
+
+    def __init__(self, cassette: Cassette):
+        """Serve responses from ``cassette``."""
+        self.cassette = cassette
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        """Return the recorded response, or raise CassetteMissError."""
+        record = self.cassette.get(_httpx_key(request))
+        if record is None:
+            raise CassetteMissError(f"No recorded response for {request.method} {request.url}")
+        return _build_httpx_response(request, *record)
+
+
+class AsyncRecordingTransport(httpx.AsyncBaseTransport):
+    """httpx transport that sends requests through another transport and records each response."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, cassette: Cassette):
+        """Wrap ``transport``, recording into ``cassette``."""
+        self.transport = transport
+        self.cassette = cassette
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        """Send the request and record the fully read response."""
+        response = await self.transport.handle_async_request(request)
+        try:
+            content = await response.aread()
+        finally:
+            await response.aclose()
+        record = encode_record(response.status_code, response.reason_phrase, str(request.url), response.headers, content)
+        self.cassette.put(_httpx_key(request), record)
+        return _build_httpx_response(request, *decode_record(record))
+
+    async def aclose(self):
+        """Close the wrapped transport and write out the recordings."""
+        await self.transport.aclose()
+        self.cassette.save()
+
+
+_cassettes = {}
+_cassettes_lock = threading.Lock()
+
+
+def get_cassette(config) -> Cassette:
+    """Get the process-wide cassette for the config's ``CASSETTE_PATH``."""
+    path = os.path.abspath(config.CASSETTE_PATH)
+    with _cassettes_lock:
+        cassette = _cassettes.get(path)
+        if cassette is None:
+            cassette = _cassettes[path] = Cassette(path)
+            # Recordings from sessions that are never closed are still saved.
+            atexit.register(cassette.save)
+        return cassette
+
+
+def check_mode(config) -> str:
+    """Get the config's transport mode, rejecting unknown ones."""
+    if config.TRANSPORT_MODE not in TRANSPORT_MODES:
+        raise ValueError(f"Unknown transport mode: {config.TRANSPORT_MODE}")
+    return config.TRANSPORT_MODE
+
+
+def wrap_adapter(adapter: BaseAdapter, config) -> BaseAdapter:
+    """Wrap a live adapter for the config's transport mode."""
+    mode = check_mode(config)
+    if mode == "record":
+        return RecordingAdapter(adapter, get_cassette(config))
+    if mode == "replay":
+        return ReplayAdapter(get_cassette(config))
+    return adapter
+
+
+def async_transport(config, limits: httpx.Limits) -> Optional[httpx.AsyncBaseTransport]:
+    """Get the httpx transport for the config's transport mode, or None to connect directly."""
+    mode = check_mode(config)
+    if mode == "record":
+        live = httpx.AsyncHTTPTransport(verify=config.VERIFY_SSL, limits=limits)
+        return AsyncRecordingTransport(live, get_cassette(config))
+    if mode == "replay":
+        return AsyncReplayTransport(get_cassette(config))
+    return None
@@ -2,6 +2,6 @@
 Configuration module for API testing.
 """
 
-from config.config import Config, get_config
+from config.config import Config, get_config, reset_config
 
-__all__ = ["Config", "get_config"]
+__all__ = ["Config", "get_config", "reset_config"]
@@ -1,35 +1,129 @@
 """
 Configuration management for API tests.
+
+Settings are read from the environment (and the ``.env`` file) the first time
+they are accessed rather than at import, and each one is parsed only once per
+process. Assigning an attribute on a config instance overrides it for that
+instance only.
 """
 
 import os
-from dotenv import load_dotenv
+from functools import lru_cache
+
+_UNSET = object()
+
+
+@lru_cache(maxsize=None)
+def load_env():
+    """Load environment variables from the .env file, once."""
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
+
+def _flag(value: str) -> bool:
+    """Parse a true/false setting."""
+    return value.lower() == "true"
+
+
+def _statuses(value: str) -> list:
+    """Parse a comma-separated list of status codes."""
+    return [int(status) for status in value.split(",")]
 
-# Load environment variables from .env file
-load_dotenv()
+
+class _Env:
+    """Class attribute read from an environment variable on first access, then cached."""
+
+    __slots__ = ("name", "default", "parse", "value")
+
+    def __init__(self, name: str, default: str, parse=str):
+        """Read ``name`` (or ``default``) through ``parse`` when first accessed."""
+        self.name = name
+        self.default = default
+        self.parse = parse
+        self.value = _UNSET
+
+    def __get__(self, instance, owner):
+        """Get the parsed setting, resolving it on first access."""
+        value = self.value
+        if value is _UNSET:
+            load_env()
+            value = self.value = self.parse(os.getenv(self.name, self.default))
+        return value
+
+    def reset(self):
+        """Forget the cached value so the next access reads the environment again."""
+        self.value = _UNSET
 
 
 class Config:
     """Base configuration class."""
 
-    BASE_URL = os.getenv("BASE_URL", "https://jsonplaceholder.typicode.com")
-    TIMEOUT = int(os.getenv("TIMEOUT", "5"))
-    VERIFY_SSL = os.getenv("VERIFY_SSL", "true").lower() == "true"
-    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+    BASE_URL = _Env("BASE_URL", "https://jsonplaceholder.typicode.com")
+    TIMEOUT = _Env("TIMEOUT", "5", int)
+    VERIFY_SSL = _Env("VERIFY_SSL", "true", _flag)
+    LOG_LEVEL = _Env("LOG_LEVEL", "INFO")
+    REQUEST_LOG_PATH = _Env("REQUEST_LOG_PATH", "")
+    REQUEST_LOG_SAMPLE_RATE = _Env("REQUEST_LOG_SAMPLE_RATE", "1.0", float)
+    REQUEST_LOG_QUEUE_SIZE = _Env("REQUEST_LOG_QUEUE_SIZE", "10000", int)
+    POOL_CONNECTIONS = _Env("POOL_CONNECTIONS", "10", int)
+    POOL_MAXSIZE = _Env("POOL_MAXSIZE", "32", int)
+    BATCH_CONCURRENCY = _Env("BATCH_CONCURRENCY", "16", int)
+    CACHE_ENABLED = _Env("CACHE_ENABLED", "false", _flag)
+    CACHE_BACKEND = _Env("CACHE_BACKEND", "memory")
+    CACHE_PATH = _Env("CACHE_PATH", ".api_cache.sqlite")
+    CACHE_MAXSIZE = _Env("CACHE_MAXSIZE", "1024", int)
+    CACHE_TTL = _Env("CACHE_TTL", "300", int)
+    METRICS_ENABLED = _Env("METRICS_ENABLED", "true", _flag)
+    SLA_TOLERANCE = _Env("SLA_TOLERANCE", "1.0", float)
+    REGRESSION_THRESHOLD = _Env("REGRESSION_THRESHOLD", "0.2", float)
+    REGRESSION_ALPHA = _Env("REGRESSION_ALPHA", "0.01", float)
+    REGRESSION_MIN_SAMPLES = _Env("REGRESSION_MIN_SAMPLES", "20", int)
+    RATE_LIMIT = _Env("RATE_LIMIT", "0", float)
+    RATE_LIMIT_BURST = _Env("RATE_LIMIT_BURST", "10", int)
+    RATE_LIMIT_FILE = _Env("RATE_LIMIT_FILE", "")
+    TRANSPORT_MODE = _Env("TRANSPORT_MODE", "live", str.lower)
+    CASSETTE_PATH = _Env("CASSETTE_PATH", "cassettes/api.cassette")
+    MAX_CONNECTIONS = _Env("MAX_CONNECTIONS", "100", int)
+    MAX_KEEPALIVE_CONNECTIONS = _Env("MAX_KEEPALIVE_CONNECTIONS", "20", int)
+    MAX_IN_FLIGHT = _Env("MAX_IN_FLIGHT", "100", int)
+    RETRY_TOTAL = _Env("RETRY_TOTAL", "0", int)
+    RETRY_BACKOFF_FACTOR = _Env("RETRY_BACKOFF_FACTOR", "0.1", float)
+    RETRY_BACKOFF_MAX = _Env("RETRY_BACKOFF_MAX", "10", float)
+    RETRY_STATUSES = _Env("RETRY_STATUSES", "429,500,502,503,504", _statuses)
+    HEDGE_ENABLED = _Env("HEDGE_ENABLED", "false", _flag)
+    HEDGE_PERCENTILE = _Env("HEDGE_PERCENTILE", "95", float)
+    HEDGE_MIN_SAMPLES = _Env("HEDGE_MIN_SAMPLES", "20", int)
+    HEDGE_MIN_DELAY = _Env("HEDGE_MIN_DELAY", "0.005", float)
+    HEDGE_MAX_WORKERS = _Env("HEDGE_MAX_WORKERS", "32", int)
+    CIRCUIT_FAILURES = _Env("CIRCUIT_FAILURES", "0", int)
+    CIRCUIT_RESET_TIMEOUT = _Env("CIRCUIT_RESET_TIMEOUT", "30", float)
+    CIRCUIT_STATUSES = _Env("CIRCUIT_STATUSES", "502,503,504", _statuses)
+    ADAPTIVE_CONCURRENCY = _Env("ADAPTIVE_CONCURRENCY", "false", _flag)
+    CONCURRENCY_INITIAL = _Env("CONCURRENCY_INITIAL", "16", int)
+    CONCURRENCY_MIN = _Env("CONCURRENCY_MIN", "1", int)
+    CONCURRENCY_MAX = _Env("CONCURRENCY_MAX", "128", int)
+    CONCURRENCY_LATENCY_TOLERANCE = _Env("CONCURRENCY_LATENCY_TOLERANCE", "2.0", float)
+    SINGLE_FLIGHT = _Env("SINGLE_FLIGHT", "true", _flag)
+    TEST_DATA_SEED = _Env("TEST_DATA_SEED", "0", int)
+    TEST_DATA_CASES = _Env("TEST_DATA_CASES", "10", int)
+    TEST_DATA_INVALID_RATIO = _Env("TEST_DATA_INVALID_RATIO", "0.3", float)
 
 
 class DevelopmentConfig(Config):
     """Development environment configuration."""
 
     DEBUG = True
-    BASE_URL = os.getenv("DEV_BASE_URL", "https://jsonplaceholder.typicode.com")
+    BASE_URL = _Env("DEV_BASE_URL", "https://jsonplaceholder.typicode.com")
+    SLA_TOLERANCE = _Env("DEV_SLA_TOLERANCE", "2.0", float)
 
 
 class StagingConfig(Config):
     """Staging environment configuration."""
 
     DEBUG = False
-    BASE_URL = os.getenv("STAGING_BASE_URL", "https://jsonplaceholder.typicode.com")
+    BASE_URL = _Env("STAGING_BASE_URL", "https://jsonplaceholder.typicode.com")
+    SLA_TOLERANCE = _Env("STAGING_SLA_TOLERANCE", "1.5", float)
 
 
 class ProductionConfig(Config):
@@ -37,14 +131,25 @@ class ProductionConfig(Config):
 
     DEBUG = False
     VERIFY_SSL = True
-    BASE_URL = os.getenv("PROD_BASE_URL", "https://jsonplaceholder.typicode.com")
+    BASE_URL = _Env("PROD_BASE_URL", "https://jsonplaceholder.typicode.com")
+    SLA_TOLERANCE = _Env("PROD_SLA_TOLERANCE", "1.0", float)
+
+
+_CONFIGS = {
+    "dev": DevelopmentConfig,
+    "staging": StagingConfig,
+    "prod": ProductionConfig,
+}
 
 
 def get_config(env: str = "dev") -> Config:
-    """Get configuration for the specified environment."""
-    configs = {
-        "dev": DevelopmentConfig,
-        "staging": StagingConfig,
-        "prod": ProductionConfig,
-    }
-    return configs.get(env, DevelopmentConfig)()
+    """Get configuration for the specified environment; settings resolve on first access."""
+    return _CONFIGS.get(env, DevelopmentConfig)()
+
+
+def reset_config():
+    """Forget every resolved setting so the next access reads the environment again."""
+    for cls in (Config, *_CONFIGS.values()):
+        for value in vars(cls).values():
+            if isinstance(value, _Env):
+                value.reset()
@@ -2,14 +2,19 @@
 Pytest configuration and fixtures for API tests.
 """
 
-import pytest
+import copy
 import logging
-from api import UserAPI, PostAPI, CommentAPI
+
+import pytest
+from api import UserAPI, PostAPI, CommentAPI, TodoAPI, AlbumAPI, PhotoAPI
+from api.metrics import recorder
+from api.request_log import close_request_logs
+from api.session_pool import get_session, close_sessions, connection_stats
 from config import get_config
+from perf.stub_server import StubServer
+from testdata import PayloadGenerator
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
+pytest_plugins = ["perf.sla", "perf.parallel", "perf.profile", "testdata.plugin"]
 
 
 def pytest_addoption(parser):
@@ -20,35 +25,103 @@ def pytest_addoption(parser):
         default="dev",
         help="Environment to run tests against: dev, staging, or prod",
     )
+    parser.addoption(
+        "--metrics-json",
+        action="store",
+        default=None,
+        help="Write per-endpoint latency metrics as JSON to this path",
+    )
+    parser.addoption(
+        "--stub-server",
+        action="store_true",
+        default=False,
+        help="Run the API tests against the local stub server instead of BASE_URL",
+    )
+
+
+@pytest.fixture(scope="session")
+def stub_server():
+    """Provide a local stub of the API, serving on a background thread."""
+    with StubServer() as server:
+        yield server
 
 
 @pytest.fixture(scope="session")
 def config(request):
     """Provide configuration based on environment."""
     env = request.config.getoption("--env")
-    return get_config(env)
+    settings = get_config(env)
+    if request.config.getoption("--stub-server"):
+        settings.BASE_URL = request.getfixturevalue("stub_server").url
+    return settings
+
+
+@pytest.fixture
+def stub_config(config, stub_server):
+    """Provide the configuration pointed at the local stub server."""
+    settings = copy.copy(config)
+    settings.BASE_URL = stub_server.url
+    return settings
+
+
+@pytest.fixture(scope="session")
+def payload_generator(config):
+    """Provide the seeded test-data generator."""
+    return PayloadGenerator(seed=config.TEST_DATA_SEED)
+
+
+@pytest.fixture(scope="session")
+def http_session(config):
+    """Provide a pooled session shared by every test in this worker."""
+    session = get_session(config)
+    yield session
+    close_sessions()
 
 
 @pytest.fixture
-def user_api(config):
-    """Provide a UserAPI instance."""
-    api = UserAPI(config)
+def user_api(config, http_session):
+    """Provide a UserAPI instance with its own headers on the shared session."""
+    api = UserAPI(config, session=http_session)
     yield api
     api.close()
 
 
 @pytest.fixture
-def post_api(config):
-    """Provide a PostAPI instance."""
-    api = PostAPI(config)
+def post_api(config, http_session):
+    """Provide a PostAPI instance with its own headers on the shared session."""
+    api = PostAPI(config, session=http_session)
     yield api
     api.close()
 
 
 @pytest.fixture
-def comment_api(config):
-    """Provide a CommentAPI instance."""
-    api = CommentAPI(config)
+def comment_api(config, http_session):
+    """Provide a CommentAPI instance with its own headers on the shared session."""
+    api = CommentAPI(config, session=http_session)
+    yield api
+    api.close()
+
+
+@pytest.fixture
+def todo_api(config, http_session):
+    """Provide a TodoAPI instance with its own headers on the shared session."""
+    api = TodoAPI(config, session=http_session)
+    yield api
+    api.close()
+
+
+@pytest.fixture
+def album_api(config, http_session):
+    """Provide an AlbumAPI instance with its own headers on the shared session."""
+    api = AlbumAPI(config, session=http_session)
+    yield api
+    api.close()
+
+
+@pytest.fixture
+def photo_api(config, http_session):
+    """Provide a PhotoAPI instance with its own headers on the shared session."""
+    api = PhotoAPI(config, session=http_session)
     yield api
     api.close()
 
@@ -60,3 +133,28 @@ def pytest_configure(config):
     config.addinivalue_line("markers", "positive: Positive test cases")
     config.addinivalue_line("markers", "negative: Negative test cases")
     config.addinivalue_line("markers", "data_driven: Data-driven test cases")
+    logging.getLogger("api").setLevel(get_config(config.getoption("--env")).LOG_LEVEL)
+
+
+def pytest_sessionfinish(session):
+    """Flush request logs and dump per-endpoint latency metrics when requested."""
+    close_request_logs()
+    path = session.config.getoption("--metrics-json")
+    if path:
+        recorder.dump_json(path)
+
+
+def pytest_terminal_summary(terminalreporter):
+    """Report per-endpoint latency and how often pooled connections were reused."""
+    if recorder.endpoints:
+        terminalreporter.write_sep("-", "endpoint latency (ms)")
+        terminalreporter.write_line(recorder.format())
+    stats = connection_stats()
+    if not stats["requests"]:
+        return
+    reuse_rate = stats["reused"] / stats["requests"] * 100
+    terminalreporter.write_sep("-", "connection pool")
+    terminalreporter.write_line(
+        f"{stats['requests']} requests, {stats['opened']} connections opened, "
+        f"{stats['reused']} reused ({reuse_rate:.1f}% reuse)"
+    )
@@ -0,0 +1,3 @@
+"""
+Performance testing tools built on the API clients.
+"""
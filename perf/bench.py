@@ -0,0 +1,415 @@
+"""
+Benchmarks of the client layer with a tracked history.
+
+Every benchmark runs offline, against the local stub server or against canned
+responses, and reports one sample per round so runs can be compared.
+
+    python -m perf.bench run                  # run all, append to the history
+    python -m perf.bench run decode cache     # run benchmarks matching a prefix
+    python -m perf.bench compare              # latest run against the one before
+    python -m perf.bench compare abc123 HEAD  # two commits (or #N run indexes) against each other
+    python -m perf.bench list
+
+The history is a JSONL file (``--history``, default ``benchmarks/history.jsonl``)
+with one entry per run: commit, time, Python version and per-benchmark samples.
+``compare`` flags a benchmark as regressed when its median got worse by more
+than ``--threshold`` (default ``Config.REGRESSION_THRESHOLD``) and even its best
+new sample is worse than the old median, and exits with status 1 if any did.
+"""
+
+import argparse
+import asyncio
+import copy
+import datetime
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List
+
+import requests
+from api import AsyncPostAPI, PostAPI
+from api.cache import MemoryCache
+from api.metrics import MetricsRecorder
+from api.models import Comment, Post, Record
+from api.request_log import close_request_logs
+from api.response import APIResponse, json_loads
+from config import get_config
+from perf.stub_server import StubServer, StubSettings
+
+DEFAULT_HISTORY = os.path.join("benchmarks", "history.jsonl")
+
+
+@dataclass
+class Result:
+    """Samples of one benchmark, one per round."""
+
+    name: str
+    samples: List[float]
+    unit: str = "us/op"
+    higher_is_better: bool = False
+
+    @property
+    def median(self) -> float:
+        """Get the median sample."""
+        return statistics.median(self.samples)
+
+    @property
+    def best(self) -> float:
+        """Get the best sample."""
+        return max(self.samples) if self.higher_is_better else min(self.samples)
+
+    def to_dict(self) -> dict:
+        """Convert to a JSON-ready dict."""
+        return {"samples": self.samples, "unit": self.unit, "higher_is_better": self.higher_is_better}
+
+    @classmethod
+    def from_dict(cls, name: str, data: dict) -> "Result":
+        """Restore a result from its dict."""
+        return cls(name, data["samples"], data["unit"], data["higher_is_better"])
+
+
+@dataclass
+class BenchContext:
+    """Shared state of a benchmark run: the stub server, config and round settings."""
+
+    server: StubServer
+    config: object
+    repeat: int = 7
+    scale: float = 1.0
+    clients: list = field(default_factory=list)
+
+    def client(self, cls=PostAPI, **kwargs):
+        """Build a client against the stub server, recording metrics of its own and closed when the run ends."""
+        client = cls(config=self.config, metrics=MetricsRecorder(), **kwargs)
+        self.clients.append(client)
+        return client
+
+    def time(self, name: str, op: Callable[[], object], number: int, per: int = 1) -> Result:
+        """Time ``number`` calls of ``op`` per round, in microseconds per operation (``per`` ops a call)."""
+        number = max(int(number * self.scale), 1)
+        op()
+        samples = []
+        for _ in range(self.repeat):
+            started = time.perf_counter()
+            for _ in range(number):
+                op()
+            samples.append(round((time.perf_counter() - started) / (number * per) * 1e6, 3))
+        return Result(name, samples)
+
+    def time_async(self, name: str, op: Callable[[], object], number: int, per: int = 1) -> Result:
+        """Like ``time``, for a coroutine function, on one event loop."""
+        loop = asyncio.new_event_loop()
+        try:
+            return self.time(name, lambda: loop.run_until_complete(op()), number, per)
+        finally:
+            loop.close()
+
+
+BENCHMARKS: Dict[str, Callable[[BenchContext], List[Result]]] = {}
+
+
+def benchmark(name: str):
+    """Register a benchmark function returning a list of results."""
+    def register(func):
+        BENCHMARKS[name] = func
+        return func
+    return register
+
+
+def canned_response(body: bytes, status_code: int = 200) -> requests.Response:
+    """Build a response that a patched session returns without any I/O."""
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = body
+    response.headers["Content-Type"] = "application/json"
+    response.elapsed = datetime.timedelta(0)
+    response.encoding = "utf-8"
+    return response
+
+
+@benchmark("request")
+def bench_request(ctx: BenchContext) -> List[Result]:
+    """Round trip to the stub through the client versus a bare session, and the difference."""
+    client = ctx.client()
+    session = requests.Session()
+    url = f"{ctx.config.BASE_URL}/posts/1"
+    raw = ctx.time("request.raw_session_get", lambda: session.get(url).content, 300)
+    wrapped = ctx.time("request.client_get", lambda: client.get("/posts/1").content, 300)
+    session.close()
+    overhead = [round(max(mine - theirs, 0.0), 3) for mine, theirs in zip(wrapped.samples, raw.samples)]
+    return [raw, wrapped, Result("request.overhead", overhead)]
+
+
+@benchmark("dispatch")
+def bench_dispatch(ctx: BenchContext) -> List[Result]:
+    """Client-layer cost per call with the network replaced by a canned response."""
+    client = ctx.client()
+    canned = canned_response(b'{"id": 1}')
+    client.session.request = lambda *args, **kwargs: canned
+    return [
+        ctx.time("dispatch.generic_get", lambda: client.get("/posts/1"), 5000),
+        ctx.time("dispatch.get_post", lambda: client.get_post(1), 5000),
+        ctx.time("dispatch.create_post", lambda: client.create_post({"title": "t", "body": "b", "userId": 1}), 5000),
+        ctx.time("dispatch.get_posts_by_user", lambda: client.get_posts_by_user(1), 5000),
+    ]
+
+
+@benchmark("decode")
+def bench_decode(ctx: BenchContext) -> List[Result]:
+    """JSON decode of collection bodies into dicts and records."""
+    session = requests.Session()
+    posts = session.get(f"{ctx.config.BASE_URL}/posts").content
+    comments = session.get(f"{ctx.config.BASE_URL}/comments").content
+    session.close()
+    posts_response = canned_response(posts)
+    return [
+        ctx.time("decode.posts_json", lambda: json_loads(posts), 500),
+        ctx.time("decode.comments_json", lambda: json_loads(comments), 200),
+        ctx.time("decode.posts_records", lambda: APIResponse(posts_response).as_records(Post), 500),
+    ]
+
+
+@benchmark("cache")
+def bench_cache(ctx: BenchContext) -> List[Result]:
+    """GETs served from a fresh cache entry and after revalidation."""
+    client = ctx.client(cache=MemoryCache(1024, 300))
+    client.get("/posts/1")
+    fresh = ctx.time("cache.fresh_hit", lambda: client.get("/posts/1"), 5000)
+    revalidating = ctx.client(cache=MemoryCache(1024, 300))
+    revalidating.get("/posts")
+    revalidated = ctx.time(
+        "cache.revalidated_hit", lambda: revalidating.get("/posts", headers={"Cache-Control": "no-cache"}), 300
+    )
+    return [fresh, revalidated]
+
+
+@benchmark("batch")
+def bench_batch(ctx: BenchContext) -> List[Result]:
+    """Per-request cost of a 100-request thread-pool batch."""
+    client = ctx.client()
+    return [ctx.time("batch.get_posts_100", lambda: client.get_posts(range(1, 101)), 10, per=100)]
+
+
+@benchmark("async")
+def bench_async(ctx: BenchContext) -> List[Result]:
+    """Per-request cost of a 100-request asyncio fan-out."""
+
+    async def fan_out():
+        async with AsyncPostAPI(config=ctx.config, metrics=MetricsRecorder()) as client:
+            await asyncio.gather(*(client.get_post(post_id) for post_id in range(1, 101)))
+
+    return [ctx.time_async("async.get_posts_100", fan_out, 10, per=100)]
+
+
+def retained_size(value, seen: set = None) -> int:
+    """Get the bytes held by a decoded value, counting each shared object once."""
+    seen = set() if seen is None else seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(retained_size(key, seen) + retained_size(item, seen) for key, item in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(retained_size(item, seen) for item in value)
+    elif isinstance(value, Record):
+        size += sum(retained_size(getattr(value, slot), seen) for slot in type(value).__slots__)
+    return size
+
+
+@benchmark("memory")
+def bench_memory(ctx: BenchContext) -> List[Result]:
+    """Bytes held per decoded post and comment as dicts and as records."""
+    session = requests.Session()
+    bodies = {name: session.get(f"{ctx.config.BASE_URL}/{name}s").content for name in ("post", "comment")}
+    session.close()
+    results = []
+    for name, model in (("post", Post), ("comment", Comment)):
+        items = json_loads(bodies[name])
+        per_dict = round(retained_size(items) / len(items), 1)
+        per_record = round(retained_size(model.from_list(items)) / len(items), 1)
+        results.append(Result(f"memory.{name}_dict", [per_dict], "bytes/item"))
+        results.append(Result(f"memory.{name}_record", [per_record], "bytes/item"))
+    return results
+
+
+def run_benchmarks(names: List[str] = None, repeat: int = 7, scale: float = 1.0, config=None) -> List[Result]:
+    """Run the benchmarks whose names start with any of ``names`` (all by default)."""
+    selected = [name for name in BENCHMARKS if not names or any(name.startswith(prefix) for prefix in names)]
+    config = copy.copy(config or get_config())
+    config.CACHE_ENABLED = False
+    config.RETRY_TOTAL = 0
+    results = []
+    with StubServer(StubSettings(users=10, posts_per_user=10, comments_per_post=5)) as server:
+        config.BASE_URL = server.url
+        ctx = BenchContext(server, config, repeat, scale)
+        try:
+            for name in selected:
+                results.extend(BENCHMARKS[name](ctx))
+        finally:
+            for client in ctx.clients:
+                client.close()
+            close_request_logs()
+    return results
+
+
+def current_commit() -> tuple:
+    """Get the short commit hash and whether the tree has uncommitted changes."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = bool(subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True, check=True
+        ).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+    return commit, dirty
+
+
+def save_run(path: str, results: List[Result], commit: str = None, dirty: bool = False) -> dict:
+    """Append one run to the history file."""
+    if commit is None:
+        commit, dirty = current_commit()
+    entry = {
+        "commit": commit,
+        "dirty": dirty,
+        "time": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "results": {result.name: result.to_dict() for result in results},
+    }
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "a") as handle:
+        handle.write(json.dumps(entry) + "\n")
+    return entry
+
+
+def load_history(path: str) -> List[dict]:
+    """Read every run from the history file."""
+    with open(path) as handle:
+        return [json.loads(line) for line in handle if line.strip()]
+
+
+def _run_at(history: List[dict], index: str) -> dict:
+    """Get a run by its position in the history."""
+    try:
+        return history[int(index)]
+    except ValueError:
+        raise LookupError(f"Not a run index: {index!r}") from None
+    except IndexError:
+        raise LookupError(f"No run {index} in a history of {len(history)} runs") from None
+
+
+def find_run(history: List[dict], ref: str) -> dict:
+    """Find a run by commit prefix or ``HEAD`` (latest first), or by index as ``#N`` or a short number like ``-1``."""
+    if ref.startswith("#"):
+        return _run_at(history, ref[1:])
+    commit = current_commit()[0] if ref == "HEAD" else ref
+    # Git abbreviates commits to at least four characters, so shorter refs are never prefixes.
+    if len(commit) >= 4:
+        for entry in reversed(history):
+            if entry["commit"].startswith(commit) or commit.startswith(entry["commit"]):
+                return entry
+    if re.fullmatch(r"-?\d{1,3}", ref):
+        return _run_at(history, ref)
+    raise LookupError(f"No run for commit {ref!r} in the history")
+
+
+@dataclass
+class Comparison:
+    """Change of one benchmark between two runs."""
+
+    name: str
+    unit: str
+    base: float
+    head: float
+    change: float
+    regressed: bool
+
+
+def compare_runs(base: dict, head: dict, threshold: float) -> List[Comparison]:
+    """Compare the benchmarks two runs share; positive changes are worse."""
+    comparisons = []
+    for name, data in sorted(head["results"].items()):
+        if name not in base["results"]:
+            continue
+        old, new = Result.from_dict(name, base["results"][name]), Result.from_dict(name, data)
+        sign = -1 if new.higher_is_better else 1
+        change = sign * (new.median / old.median - 1) if old.median else 0.0
+        best_is_worse = sign * (new.best - old.median) > 0
+        comparisons.append(Comparison(name, new.unit, old.median, new.median, change, change > threshold and best_is_worse))
+    return comparisons
+
+
+def format_results(results: List[Result]) -> str:
+    """Format results as a table of medians and spreads."""
+    lines = [f"{'benchmark':<32} {'median':>12} {'best':>12} {'spread':>8}  unit"]
+    for result in results:
+        spread = (max(result.samples) - min(result.samples)) / result.median if result.median else 0.0
+        lines.append(f"{result.name:<32} {result.median:>12.2f} {result.best:>12.2f} {spread:>7.0%}  {result.unit}")
+    return "\n".join(lines)
+
+
+def format_comparison(base: dict, head: dict, comparisons: List[Comparison]) -> str:
+    """Format a comparison table, marking regressions."""
+    lines = [
+        f"base {base['commit']}{'+' if base.get('dirty') else ''} ({base['time']}) -> "
+        f"head {head['commit']}{'+' if head.get('dirty') else ''} ({head['time']})",
+        f"{'benchmark':<32} {'base':>12} {'head':>12} {'change':>8}",
+    ]
+    for item in comparisons:
+        flag = "  REGRESSION" if item.regressed else ""
+        lines.append(f"{item.name:<32} {item.base:>12.2f} {item.head:>12.2f} {item.change:>+8.1%}{flag}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """Run, list or compare benchmarks from the command line."""
+    parser = argparse.ArgumentParser(description="Benchmark the API client layer.")
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help="JSONL file of past runs")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("run", help="Run benchmarks and append them to the history")
+    run.add_argument("names", nargs="*", help="Run only benchmarks starting with these names")
+    run.add_argument("--repeat", type=int, default=7, help="Rounds per benchmark")
+    run.add_argument("--scale", type=float, default=1.0, help="Multiply the calls per round, e.g. 0.1 for a quick run")
+    run.add_argument("--no-save", action="store_true", help="Do not append this run to the history")
+    compare = commands.add_parser("compare", help="Compare two runs from the history")
+    compare.add_argument("base", nargs="?", default="#-2", help="Commit prefix or #index (default: previous run)")
+    compare.add_argument("head", nargs="?", default="#-1", help="Commit prefix or #index (default: latest run)")
+    compare.add_argument("--threshold", type=float, default=None, help="Relative slowdown that counts as a regression")
+    commands.add_parser("list", help="List the benchmarks")
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        for name, func in BENCHMARKS.items():
+            print(f"{name:<12} {func.__doc__}")
+        return 0
+    if args.command == "run":
+        results = run_benchmarks(args.names, args.repeat, args.scale)
+        print(format_results(results))
+        if not args.no_save:
+            entry = save_run(args.history, results)
+            print(f"saved run of {entry['commit']}{'+' if entry['dirty'] else ''} to {args.history}")
+        return 0
+    history = load_history(args.history)
+    base, head = find_run(history, args.base), find_run(history, args.head)
+    threshold = args.threshold if args.threshold is not None else get_config().REGRESSION_THRESHOLD
+    comparisons = compare_runs(base, head, threshold)
+    print(format_comparison(base, head, comparisons))
+    regressions = [item for item in comparisons if item.regressed]
+    if regressions:
+        print(f"{len(regressions)} regression(s) over {threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
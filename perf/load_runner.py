@@ -0,0 +1,364 @@
+"""
+Load runner that drives the API clients as weighted scenarios.
+
+Run from the command line with, for example:
+
+    python -m perf.load_runner --users 20 --duration 30 --ramp-up 5
+    python -m perf.load_runner --rate 200 --duration 60 --mode async
+    python -m perf.load_runner --users 50 --duration 10 --stub-server
+"""
+
+import argparse
+import asyncio
+import inspect
+import math
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List
+
+from config import get_config
+from perf.stub_server import StubServer, StubSettings
+
+
+@dataclass
+class Scenario:
+    """A named, weighted call against the API; ``func`` may take the caller's ``random.Random``."""
+
+    name: str
+    func: Callable
+    weight: float = 1.0
+
+    def __post_init__(self):
+        """Check once whether ``func`` takes a random generator."""
+        self.takes_rng = bool(inspect.signature(self.func).parameters)
+
+    def __call__(self, rng: random.Random = None):
+        """Run the scenario once, drawing its arguments from ``rng`` (the global generator by default)."""
+        return self.func(rng or random) if self.takes_rng else self.func()
+
+
+def is_success(result) -> bool:
+    """Check whether a scenario result counts as a success."""
+    status_code = getattr(result, "status_code", None)
+    return status_code is None or status_code < 400
+
+
+def percentile(sorted_values: List[float], percent: float) -> float:
+    """Get a nearest-rank percentile from sorted values."""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(percent / 100 * len(sorted_values))) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+@dataclass
+class LoadReport:
+    """Throughput, error rate and latency percentiles of a load run."""
+
+    duration: float
+    latencies: Dict[str, List[float]] = field(default_factory=dict)
+    errors: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def requests(self) -> int:
+        """Get the number of completed requests."""
+        return sum(len(values) for values in self.latencies.values())
+
+    @property
+    def error_count(self) -> int:
+        """Get the number of failed requests."""
+        return sum(self.errors.values())
+
+    @property
+    def throughput(self) -> float:
+        """Get completed requests per second."""
+        return self.requests / self.duration if self.duration else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        """Get the fraction of requests that failed."""
+        return self.error_count / self.requests if self.requests else 0.0
+
+    def summary(self, name: str = None) -> dict:
+        """Summarize one scenario, or all of them when no name is given."""
+        if name is None:
+            values = sorted(value for values in self.latencies.values() for value in values)
+            errors = self.error_count
+        else:
+            values = sorted(self.latencies.get(name, []))
+            errors = self.errors.get(name, 0)
+        return {
+            "requests": len(values),
+            "errors": errors,
+            "p50_ms": percentile(values, 50) * 1000,
+            "p90_ms": percentile(values, 90) * 1000,
+            "p95_ms": percentile(values, 95) * 1000,
+            "p99_ms": percentile(values, 99) * 1000,
+            "max_ms": (values[-1] if values else 0.0) * 1000,
+        }
+
+    def to_dict(self) -> dict:
+        """Get the report as plain data."""
+        return {
+            "duration_s": self.duration,
+            "throughput_rps": self.throughput,
+            "error_rate": self.error_rate,
+            "total": self.summary(),
+            "scenarios": {name: self.summary(name) for name in self.latencies},
+        }
+
+    def format(self) -> str:
+        """Format the report as a text table."""
+        lines = [
+            f"{self.requests} requests in {self.duration:.1f}s, "
+            f"{self.throughput:.1f} req/s, {self.error_rate:.2%} errors",
+            f"{'scenario':<24}{'requests':>10}{'errors':>8}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}",
+        ]
+        for name in [*sorted(self.latencies), None]:
+            row = self.summary(name)
+            lines.append(
+                f"{name or 'TOTAL':<24}{row['requests']:>10}{row['errors']:>8}"
+                f"{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}{row['p99_ms']:>9.1f}{row['max_ms']:>9.1f}"
+            )
+        return "\n".join(lines)
+
+
+class LoadRunner:
+    """Run weighted scenarios as a closed (virtual users) or open (arrival rate) workload.
+
+    ``mode="thread"`` runs blocking clients on a thread pool; ``mode="async"``
+    expects scenarios that return awaitables, such as calls on the async clients.
+    """
+
+    def __init__(
+        self,
+        scenarios: List[Scenario],
+        users: int = None,
+        rate: float = None,
+        duration: float = 10.0,
+        ramp_up: float = 0.0,
+        mode: str = "thread",
+        think_time: float = 0.0,
+        max_workers: int = 64,
+        seed: int = None,
+        clients: tuple = (),
+    ):
+        """Configure the workload; give exactly one of ``users`` or ``rate``."""
+        if (users is None) == (rate is None):
+            raise ValueError("Give exactly one of users (closed model) or rate (open model)")
+        if mode not in ("thread", "async"):
+            raise ValueError(f"Unknown mode {mode!r}, expected 'thread' or 'async'")
+        self.scenarios = scenarios
+        self.weights = [scenario.weight for scenario in scenarios]
+        self.users = users
+        self.rate = rate
+        self.duration = duration
+        self.ramp_up = ramp_up
+        self.mode = mode
+        self.think_time = think_time
+        self.max_workers = max_workers
+        self.seed = seed
+        self.clients = clients
+        self._lock = threading.Lock()
+
+    def run(self) -> LoadReport:
+        """Run the workload and report the results."""
+        self._report = LoadReport(duration=0.0)
+        start = time.perf_counter()
+        if self.mode == "async":
+            asyncio.run(self._run_async(start))
+        else:
+            self._run_threads(start)
+            for client in self.clients:
+                client.close()
+        self._report.duration = time.perf_counter() - start
+        return self._report
+
+    def _record(self, scenario: Scenario, latency: float, ok: bool):
+        """Record one completed request."""
+        with self._lock:
+            self._report.latencies.setdefault(scenario.name, []).append(latency)
+            if not ok:
+                self._report.errors[scenario.name] = self._report.errors.get(scenario.name, 0) + 1
+
+    def _rng(self, index: int) -> random.Random:
+        """Get the scenario picker for one virtual user or the arrival loop."""
+        return random.Random(None if self.seed is None else self.seed + index)
+
+    def _user_start(self, start: float, index: int) -> float:
+        """Get when a virtual user starts, spreading users over the ramp-up."""
+        return start + self.ramp_up * index / self.users
+
+    def _arrival(self, start: float, index: int) -> float:
+        """Get when arrival ``index`` is due, with the rate ramping up linearly from zero."""
+        # During the ramp the rate is rate * t / ramp_up, so n arrivals have happened by
+        # rate * t^2 / (2 * ramp_up); solving for t spaces them out along the ramp.
+        ramp_arrivals = self.rate * self.ramp_up / 2
+        if index < ramp_arrivals:
+            return start + math.sqrt(2 * index * self.ramp_up / self.rate)
+        return start + self.ramp_up + (index - ramp_arrivals) / self.rate
+
+    def _execute(self, scenario: Scenario, scheduled: float, rng: random.Random):
+        """Run a blocking scenario, timing from when it was scheduled."""
+        try:
+            ok = is_success(scenario(rng))
+        except Exception:
+            ok = False
+        self._record(scenario, time.perf_counter() - scheduled, ok)
+
+    async def _execute_async(self, scenario: Scenario, scheduled: float, rng: random.Random):
+        """Run an async scenario, timing from when it was scheduled."""
+        try:
+            ok = is_success(await scenario(rng))
+        except Exception:
+            ok = False
+        self._record(scenario, time.perf_counter() - scheduled, ok)
+
+    def _run_threads(self, start: float):
+        """Run the workload on threads."""
+        deadline = start + self.duration
+        if self.users is not None:
+            threads = [
+                threading.Thread(target=self._virtual_user, args=(index, start, deadline), daemon=True)
+                for index in range(self.users)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            return
+        rng = self._rng(0)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            arrivals = 0
+            scheduled = start
+            while scheduled < deadline:
+                time.sleep(max(scheduled - time.perf_counter(), 0))
+                scenario = rng.choices(self.scenarios, self.weights)[0]
+                # Each arrival runs on its own thread, so it gets its own generator seeded from the arrival loop.
+                executor.submit(self._execute, scenario, scheduled, random.Random(rng.getrandbits(64)))
+                arrivals += 1
+                scheduled = self._arrival(start, arrivals)
+
+    def _virtual_user(self, index: int, start: float, deadline: float):
+        """Loop one blocking virtual user until the deadline."""
+        time.sleep(max(self._user_start(start, index) - time.perf_counter(), 0))
+        rng = self._rng(index)
+        while time.perf_counter() < deadline:
+            self._execute(rng.choices(self.scenarios, self.weights)[0], time.perf_counter(), rng)
+            if self.think_time:
+                time.sleep(self.think_time)
+
+    async def _run_async(self, start: float):
+        """Run the workload as asyncio tasks."""
+        deadline = start + self.duration
+        if self.users is not None:
+            await asyncio.gather(*(
+                self._virtual_user_async(index, start, deadline) for index in range(self.users)
+            ))
+        else:
+            rng = self._rng(0)
+            tasks = set()
+            arrivals = 0
+            scheduled = start
+            while scheduled < deadline:
+                await asyncio.sleep(max(scheduled - time.perf_counter(), 0))
+                scenario = rng.choices(self.scenarios, self.weights)[0]
+                task = asyncio.create_task(
+                    self._execute_async(scenario, scheduled, random.Random(rng.getrandbits(64)))
+                )
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                arrivals += 1
+                scheduled = self._arrival(start, arrivals)
+            await asyncio.gather(*tasks)
+        for client in self.clients:
+            closed = client.close()
+            if inspect.isawaitable(closed):
+                await closed
+
+    async def _virtual_user_async(self, index: int, start: float, deadline: float):
+        """Loop one async virtual user until the deadline."""
+        await asyncio.sleep(max(self._user_start(start, index) - time.perf_counter(), 0))
+        rng = self._rng(index)
+        while time.perf_counter() < deadline:
+            await self._execute_async(rng.choices(self.scenarios, self.weights)[0], time.perf_counter(), rng)
+            if self.think_time:
+                await asyncio.sleep(self.think_time)
+
+
+def default_scenarios(config, mode: str = "thread"):
+    """Build a read-heavy scenario mix on the User, Post and Comment clients."""
+    if mode == "async":
+        from api import AsyncUserAPI as UserAPI, AsyncPostAPI as PostAPI, AsyncCommentAPI as CommentAPI
+        clients = UserAPI(config), PostAPI(config), CommentAPI(config)
+    else:
+        from api import UserAPI, PostAPI, CommentAPI
+        from api.session_pool import get_session
+
+        session = get_session(config)
+        clients = (
+            UserAPI(config, session=session),
+            PostAPI(config, session=session),
+            CommentAPI(config, session=session),
+        )
+    user_api, post_api, comment_api = clients
+    scenarios = [
+        Scenario("get_user", lambda rng: user_api.get_user(rng.randint(1, 10)), weight=3),
+        Scenario("get_post", lambda rng: post_api.get_post(rng.randint(1, 100)), weight=5),
+        Scenario("get_posts_by_user", lambda rng: post_api.get_posts_by_user(rng.randint(1, 10)), weight=2),
+        Scenario("get_comments_by_post", lambda rng: comment_api.get_comments_by_post(rng.randint(1, 100)), weight=2),
+        Scenario("create_post", lambda: post_api.create_post(
+            {"title": "Load Test Post", "body": "Created under load.", "userId": 1}
+        ), weight=1),
+    ]
+    return scenarios, clients
+
+
+def main(argv=None):
+    """Run the default scenario mix from the command line."""
+    parser = argparse.ArgumentParser(description="Run a load test against the API clients.")
+    workload = parser.add_mutually_exclusive_group(required=True)
+    workload.add_argument("--users", type=int, help="Closed model: number of virtual users")
+    workload.add_argument("--rate", type=float, help="Open model: arrivals per second")
+    parser.add_argument("--duration", type=float, default=10.0, help="Run time in seconds")
+    parser.add_argument("--ramp-up", type=float, default=0.0, help="Ramp-up time in seconds")
+    parser.add_argument("--mode", choices=("thread", "async"), default="thread")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Pause between a user's requests")
+    parser.add_argument("--env", default="dev", help="Environment: dev, staging, or prod")
+    parser.add_argument("--stub-server", action="store_true", help="Run against a local stub server")
+    parser.add_argument("--stub-latency", type=float, default=0.0, help="Seconds the stub adds to each response")
+    parser.add_argument("--adaptive", action="store_true", help="Adapt per-host concurrency to latency and errors")
+    parser.add_argument("--seed", type=int, default=None, help="Seed scenario picks and arguments for a repeatable run")
+    args = parser.parse_args(argv)
+
+    config = get_config(args.env)
+    if args.adaptive:
+        config.ADAPTIVE_CONCURRENCY = True
+    stub = None
+    if args.stub_server:
+        stub = StubServer(StubSettings(latency=args.stub_latency)).start()
+        config.BASE_URL = stub.url
+    scenarios, clients = default_scenarios(config, args.mode)
+    runner = LoadRunner(
+        scenarios,
+        users=args.users,
+        rate=args.rate,
+        duration=args.duration,
+        ramp_up=args.ramp_up,
+        mode=args.mode,
+        think_time=args.think_time,
+        seed=args.seed,
+        clients=clients,
+    )
+    try:
+        print(runner.run().format())
+    finally:
+        if stub is not None:
+            stub.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""
+Parallel test execution that schedules the slowest tests first and shares one rate limit.
+
+Run with ``pytest --workers=4``. The controller process collects the tests and
+orders them by their historical duration (kept in the pytest cache), longest
+first, then hands them out one at a time to worker processes over a local
+socket. Workers send back their test reports and latency metrics, so terminal
+output, exit status, SLA gating and metrics reports cover the whole run. When
+``RATE_LIMIT`` is set, every worker draws from one token bucket in a shared
+locked file, so the suite as a whole stays under the server's rate limit.
+"""
+
+import argparse
+import os
+import secrets
+import socket
+import subprocess
+import sys
+import tempfile
+from collections import deque
+from multiprocessing.connection import Client, Connection, answer_challenge, deliver_challenge, wait
+
+import pytest
+from api.metrics import recorder
+from config import get_config
+
+DURATIONS_KEY = "perf/durations"
+# Weight of the latest run in the moving average of test durations.
+DURATION_WEIGHT = 0.5
+# Options only the controller acts on; workers run without them.
+CONTROLLER_OPTIONS = ("--workers", "--metrics-json", "--sla-baseline", "--sla-save-baseline")
+
+
+def schedule(nodeids, durations: dict) -> list:
+    """Order tests longest first; tests without history go first, in collection order."""
+    unknown = [nodeid for nodeid in nodeids if nodeid not in durations]
+    known = sorted((nodeid for nodeid in nodeids if nodeid in durations), key=durations.get, reverse=True)
+    return unknown + known
+
+
+def update_durations(durations: dict, measured: dict) -> dict:
+    """Blend newly measured durations into the history."""
+    updated = dict(durations)
+    for nodeid, seconds in measured.items():
+        previous = updated.get(nodeid)
+        if previous is None:
+            updated[nodeid] = seconds
+        else:
+            updated[nodeid] = DURATION_WEIGHT * seconds + (1 - DURATION_WEIGHT) * previous
+    return updated
+
+
+def worker_args(args) -> list:
+    """Drop controller-only options from a pytest command line."""
+    result = []
+    skip_value = False
+    for arg in args:
+        if skip_value:
+            skip_value = False
+            continue
+        name, has_value, _ = arg.partition("=")
+        if name in CONTROLLER_OPTIONS:
+            skip_value = not has_value
+            continue
+        result.append(arg)
+    return result
+
+
+class ParallelSession:
+    """Per-session plugin that runs tests as controller or worker and tracks durations."""
+
+    def __init__(self, config):
+        """Read the parallel options."""
+        self.config = config
+        self.workers = config.getoption("--workers")
+        self.worker_address = config.getoption("--worker-address")
+        self.measured = {}
+        self.connection = None
+
+    @property
+    def is_worker(self) -> bool:
+        """Whether this process runs tests for a controller."""
+        return self.worker_address is not None
+
+    def pytest_runtest_logreport(self, report):
+        """Accumulate each test's setup, call and teardown time, or send the report to the controller."""
+        if self.connection is not None:
+            data = self.config.hook.pytest_report_to_serializable(config=self.config, report=report)
+            self.connection.send(("report", data))
+            return
+        self.measured[report.nodeid] = self.measured.get(report.nodeid, 0.0) + report.duration
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtestloop(self, session):
+        """Run the tests on workers, or as a worker pull them from the controller."""
+        if session.testsfailed and not self.config.option.continue_on_collection_errors:
+            return None
+        if self.config.option.collectonly:
+            return None
+        if self.is_worker:
+            return self._run_worker(session)
+        if self.workers > 0 and session.items:
+            return self._run_controller(session)
+        return None
+
+    def pytest_sessionfinish(self, session):
+        """Store the measured durations; workers leave that to the controller."""
+        cache = getattr(self.config, "cache", None)
+        if self.is_worker or cache is None or not self.measured:
+            return
+        durations = cache.get(DURATIONS_KEY, {})
+        cache.set(DURATIONS_KEY, update_durations(durations, self.measured))
+
+    def _worker_env(self, state_dir: str) -> dict:
+        """Get the workers' environment, pointing them at one shared rate-limit file."""
+        env = dict(os.environ)
+        settings = get_config(self.config.getoption("--env", default="dev"))
+        if settings.RATE_LIMIT and not settings.RATE_LIMIT_FILE:
+            env["RATE_LIMIT_FILE"] = os.path.join(state_dir, "rate_limit.bucket")
+        return env
+
+    def _run_controller(self, session) -> bool:
+        """Spawn workers, hand out tests longest first and relay their reports."""
+        config = self.config
+        cache = getattr(config, "cache", None)
+        durations = cache.get(DURATIONS_KEY, {}) if cache is not None else {}
+        queue = deque(schedule([item.nodeid for item in session.items], durations))
+        authkey = secrets.token_bytes(16)
+        server = socket.create_server(("127.0.0.1", 0))
+        host, port = server.getsockname()
+        command = [
+            sys.executable, "-m", "pytest",
+            *worker_args(config.invocation_params.args),
+            f"--worker-address={host}:{port}",
+        ]
+        started = set()
+        pending = {}
+        with server, tempfile.TemporaryDirectory() as state_dir:
+            env = self._worker_env(state_dir)
+            env["PARALLEL_AUTHKEY"] = authkey.hex()
+
+            def spawn():
+                # Worker terminal output would interleave; the controller reports every outcome instead.
+                return subprocess.Popen(
+                    command, env=env, cwd=str(config.invocation_params.dir), stdout=subprocess.DEVNULL
+                )
+
+            processes = [spawn() for _ in range(min(self.workers, len(queue)))]
+            accepted = 0
+            while pending or (accepted < len(processes) and any(p.poll() is None for p in processes)):
+                for ready in wait([server, *pending], timeout=1):
+                    if ready is server:
+                        pending[self._accept(server, authkey)] = []
+                        accepted += 1
+                        continue
+                    try:
+                        message = ready.recv()
+                    except EOFError:
+                        if self._worker_lost(session, pending.pop(ready), queue) and queue:
+                            processes.append(spawn())
+                        continue
+                    self._handle(session, ready, message, pending[ready], started, queue)
+            for process in processes:
+                process.wait()
+        if queue and not (session.shouldfail or session.shouldstop):
+            self._fail(session, queue)
+        return True
+
+    @staticmethod
+    def _accept(server, authkey: bytes) -> Connection:
+        """Accept a worker and authenticate it with the shared key."""
+        sock, _ = server.accept()
+        connection = Connection(sock.detach())
+        deliver_challenge(connection, authkey)
+        answer_challenge(connection, authkey)
+        return connection
+
+    def _handle(self, session, connection, message, assigned: list, started: set, queue: deque):
+        """Answer one worker message: hand out, take back or report a test, or merge metrics."""
+        config = self.config
+        if message[0] == "next":
+            nodeid = None
+            if queue and not (session.shouldfail or session.shouldstop):
+                nodeid = queue.popleft()
+                assigned.append(nodeid)
+            connection.send(nodeid)
+        elif message[0] == "report":
+            report = config.hook.pytest_report_from_serializable(config=config, data=message[1])
+            if report.nodeid not in started:
+                started.add(report.nodeid)
+                config.hook.pytest_runtest_logstart(nodeid=report.nodeid, location=report.location)
+            config.hook.pytest_runtest_logreport(report=report)
+            if report.when == "teardown":
+                assigned.remove(report.nodeid)
+                config.hook.pytest_runtest_logfinish(nodeid=report.nodeid, location=report.location)
+        elif message[0] == "release":
+            assigned.remove(message[1])
+            queue.appendleft(message[1])
+        elif message[0] == "metrics":
+            recorder.merge(message[1])
+
+    def _worker_lost(self, session, assigned: list, queue: deque) -> bool:
+        """Fail the test a dead worker was running and requeue the one it fetched ahead."""
+        if not assigned:
+            return False
+        self._fail(session, assigned[:1])
+        queue.extendleft(reversed(assigned[1:]))
+        return True
+
+    def _fail(self, session, nodeids):
+        """Count tests that no worker finished as failures."""
+        for nodeid in nodeids:
+            session.testsfailed += 1
+            self.config.get_terminal_writer().line(f"{nodeid}: worker exited before finishing", red=True)
+
+    def _run_worker(self, session) -> bool:
+        """Pull tests from the controller, one ahead so fixtures tear down at the right time."""
+        host, port = self.worker_address.rsplit(":", 1)
+        authkey = bytes.fromhex(os.environ["PARALLEL_AUTHKEY"])
+        self.connection = Client((host, int(port)), authkey=authkey)
+        items = {item.nodeid: item for item in session.items}
+
+        def next_nodeid():
+            self.connection.send(("next",))
+            return self.connection.recv()
+
+        nodeid = next_nodeid()
+        while nodeid is not None:
+            following = next_nodeid()
+            item = items[nodeid]
+            item.config.hook.pytest_runtest_protocol(item=item, nextitem=items.get(following))
+            if session.shouldfail or session.shouldstop:
+                if following is not None:
+                    # Hand the test fetched ahead back, so the controller does not count it as lost.
+                    self.connection.send(("release", following))
+                break
+            nodeid = following
+        self.connection.send(("metrics", recorder.export()))
+        self.connection.close()
+        return True
+
+
+def pytest_addoption(parser):
+    """Add parallel execution options."""
+    group = parser.getgroup("parallel", "rate-limit aware parallel execution")
+    group.addoption("--workers", type=int, default=0, help="Run tests in this many worker processes")
+    group.addoption("--worker-address", default=None, help=argparse.SUPPRESS)
+
+
+def pytest_configure(config):
+    """Register the per-session plugin."""
+    config.pluginmanager.register(ParallelSession(config), "parallel-session")
@@ -0,0 +1,301 @@
+"""
+Per-test hot-path profiling, enabled with ``pytest --api-profile``.
+
+Each test's wall time is split into fixture setup, request send (DNS, connect
+and TLS), server wait (up to the first response byte), body download, JSON
+decode, the rest of the test body (assertions and test code) and teardown. The
+request phases come from the metrics recorder and the decode time from
+``APIResponse``. Concurrent requests are summed, so a batch's request phases can
+add up to more than its wall time.
+
+With ``--api-profile-capture=cprofile`` or ``=sample`` the body of every test is
+also profiled, and the profiles of the slowest ``--api-profile-top`` tests are
+kept: cProfile dumps for ``pstats``/snakeviz, or stack samples of the test thread.
+The report is written to ``--api-profile-dir``:
+
+* ``profile.csv`` has one row per test and one column per phase, for sorting.
+* ``phases.folded`` holds collapsed stacks (``test;phase microseconds``) for
+  flamegraph.pl, speedscope or inferno.
+* ``samples.folded`` holds the sampled stacks of the slowest tests, when sampling.
+* ``cprofile/<test>.prof`` holds the cProfile dumps, when using cProfile.
+"""
+
+import cProfile
+import csv
+import heapq
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+import pytest
+from api.metrics import RequestSample, recorder
+from api.response import add_decode_hook, remove_decode_hook
+
+PHASES = ("setup", "send", "wait", "download", "decode", "assertions", "teardown")
+CAPTURES = ("none", "cprofile", "sample")
+
+_UNSAFE = re.compile(r"[^\w.-]+")
+
+
+@dataclass
+class PhaseProfile:
+    """Time a test spent in each phase and in total (setup to teardown), in seconds."""
+
+    nodeid: str
+    phases: Dict[str, float] = field(default_factory=lambda: dict.fromkeys(PHASES, 0.0))
+    requests: int = 0
+    total: float = 0.0
+
+    def add_request(self, sample: RequestSample):
+        """Split one request's time into send, wait and download."""
+        send = (sample.dns or 0.0) + (sample.connect or 0.0) + (sample.tls or 0.0)
+        ttfb = sample.total if sample.ttfb is None else min(sample.ttfb, sample.total)
+        self.phases["send"] += min(send, ttfb)
+        self.phases["wait"] += max(ttfb - send, 0.0)
+        self.phases["download"] += sample.total - ttfb
+        self.requests += 1
+
+    def sort_key(self, column: str) -> float:
+        """Get the value the report sorts by."""
+        return self.total if column == "total" else self.phases[column]
+
+
+class StackSampler:
+    """Sample the call stack of one thread at a fixed interval on a background thread."""
+
+    def __init__(self, thread_id: int, interval: float = 0.001):
+        """Prepare to sample ``thread_id`` every ``interval`` seconds."""
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="api-profile-sampler", daemon=True)
+
+    def _run(self):
+        """Record one stack per interval until stopped."""
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            # Stop at pytest's call of the test function, leaving out the runner's frames.
+            while frame is not None and frame.f_code.co_name != "pytest_pyfunc_call":
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def start(self):
+        """Start sampling."""
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        """Stop sampling and get the stack counts."""
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+
+def format_report(profiles: List[PhaseProfile], sort: str = "total", top: int = 10) -> str:
+    """Format the ``top`` tests by ``sort`` as a table of milliseconds."""
+    header = f"{'test':<60} {'total':>9} " + " ".join(f"{phase:>10}" for phase in PHASES) + f" {'requests':>8}"
+    lines = [header]
+    for profile in sorted(profiles, key=lambda item: item.sort_key(sort), reverse=True)[:top]:
+        nodeid = profile.nodeid if len(profile.nodeid) <= 60 else "..." + profile.nodeid[-57:]
+        phases = " ".join(f"{profile.phases[phase] * 1000:>10.1f}" for phase in PHASES)
+        lines.append(f"{nodeid:<60} {profile.total * 1000:>9.1f} {phases} {profile.requests:>8}")
+    return "\n".join(lines)
+
+
+def write_csv(path: str, profiles: List[PhaseProfile]):
+    """Write one row per test with every phase in milliseconds."""
+    with open(path, "w", newline="") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(["test", "total_ms", *(f"{phase}_ms" for phase in PHASES), "requests"])
+        for profile in profiles:
+            writer.writerow([
+                profile.nodeid,
+                round(profile.total * 1000, 3),
+                *(round(profile.phases[phase] * 1000, 3) for phase in PHASES),
+                profile.requests,
+            ])
+
+
+def _frame_name(name: str) -> str:
+    """Make a name safe for a collapsed-stack line."""
+    return name.replace(";", ":").replace(" ", "_")
+
+
+def write_folded(path: str, profiles: List[PhaseProfile]):
+    """Write each test's phases as collapsed stacks weighted in microseconds."""
+    with open(path, "w") as handle:
+        for profile in profiles:
+            for phase in PHASES:
+                microseconds = round(profile.phases[phase] * 1_000_000)
+                if microseconds:
+                    handle.write(f"{_frame_name(profile.nodeid)};{phase} {microseconds}\n")
+
+
+class APIProfiler:
+    """Per-session plugin that times the phases of every test."""
+
+    def __init__(self, config):
+        """Read the profiling options."""
+        self.config = config
+        self.directory = config.getoption("--api-profile-dir")
+        self.top = config.getoption("--api-profile-top")
+        self.sort = config.getoption("--api-profile-sort")
+        self.capture = config.getoption("--api-profile-capture")
+        self.profiles: List[PhaseProfile] = []
+        self.captures = []
+        self._current = None
+        self._lock = threading.Lock()
+
+    def _on_sample(self, sample: RequestSample):
+        """Charge a request to the running test."""
+        with self._lock:
+            if self._current is not None:
+                self._current.add_request(sample)
+
+    def _on_decode(self, seconds: float):
+        """Charge a body decode to the running test."""
+        with self._lock:
+            if self._current is not None:
+                self._current.phases["decode"] += seconds
+
+    def pytest_sessionstart(self, session):
+        """Start listening for requests and decodes."""
+        recorder.add_hook(self._on_sample)
+        add_decode_hook(self._on_decode)
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item, nextitem):
+        """Track one test from setup to teardown."""
+        profile = PhaseProfile(item.nodeid)
+        with self._lock:
+            self._current = profile
+        started = time.perf_counter()
+        yield
+        profile.total = time.perf_counter() - started
+        with self._lock:
+            self._current = None
+        self.profiles.append(profile)
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_setup(self, item):
+        """Time fixture setup."""
+        started = time.perf_counter()
+        yield
+        self._charge("setup", time.perf_counter() - started)
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_teardown(self, item):
+        """Time fixture teardown."""
+        started = time.perf_counter()
+        yield
+        self._charge("teardown", time.perf_counter() - started)
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_call(self, item):
+        """Time the test body, optionally profiling it, and charge what requests do not explain to assertions."""
+        profiler = sampler = None
+        if self.capture == "cprofile":
+            profiler = cProfile.Profile()
+        elif self.capture == "sample":
+            sampler = StackSampler(threading.get_ident())
+            sampler.start()
+        started = time.perf_counter()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            elapsed = time.perf_counter() - started
+            capture = profiler if profiler is not None else (sampler.stop() if sampler is not None else None)
+        with self._lock:
+            profile = self._current
+        if profile is None:
+            return
+        phases = profile.phases
+        explained = phases["send"] + phases["wait"] + phases["download"] + phases["decode"]
+        phases["assertions"] += max(elapsed - explained, 0.0)
+        if capture is not None:
+            self._keep(elapsed, item.nodeid, capture)
+
+    def _charge(self, phase: str, seconds: float):
+        """Add time to a phase of the running test."""
+        with self._lock:
+            if self._current is not None:
+                self._current.phases[phase] += seconds
+
+    def _keep(self, elapsed: float, nodeid: str, capture):
+        """Keep a capture if its test is among the slowest ``top``."""
+        entry = (elapsed, len(self.profiles), nodeid, capture)
+        if len(self.captures) < self.top:
+            heapq.heappush(self.captures, entry)
+        elif elapsed > self.captures[0][0]:
+            heapq.heapreplace(self.captures, entry)
+
+    def pytest_sessionfinish(self, session):
+        """Stop listening and write the report files."""
+        recorder.remove_hook(self._on_sample)
+        remove_decode_hook(self._on_decode)
+        if not self.profiles:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        write_csv(os.path.join(self.directory, "profile.csv"), self.profiles)
+        write_folded(os.path.join(self.directory, "phases.folded"), self.profiles)
+        if self.capture == "sample":
+            with open(os.path.join(self.directory, "samples.folded"), "w") as handle:
+                for _, _, nodeid, stacks in sorted(self.captures, reverse=True):
+                    for stack, count in stacks.items():
+                        handle.write(f"{_frame_name(nodeid)};{stack} {count}\n")
+        elif self.capture == "cprofile":
+            directory = os.path.join(self.directory, "cprofile")
+            os.makedirs(directory, exist_ok=True)
+            for _, _, nodeid, profiler in self.captures:
+                profiler.dump_stats(os.path.join(directory, _UNSAFE.sub("_", nodeid).strip("_") + ".prof"))
+
+    def pytest_terminal_summary(self, terminalreporter):
+        """Print the slowest tests with their phase breakdown."""
+        if not self.profiles:
+            return
+        terminalreporter.write_sep("-", f"api profile: top {self.top} tests by {self.sort} (ms)")
+        terminalreporter.write_line(format_report(self.profiles, self.sort, self.top))
+        totals = {phase: sum(profile.phases[phase] for profile in self.profiles) for phase in PHASES}
+        overall = sum(totals.values()) or 1.0
+        terminalreporter.write_line(
+            "all tests: " + ", ".join(f"{phase} {seconds:.2f}s ({seconds / overall:.0%})" for phase, seconds in totals.items())
+        )
+        terminalreporter.write_line(f"report written to {self.directory}")
+
+
+def pytest_addoption(parser):
+    """Add the profiling options."""
+    group = parser.getgroup("api-profile", "per-test hot-path profiling")
+    group.addoption("--api-profile", action="store_true", default=False, help="Split each test's time into phases")
+    group.addoption("--api-profile-dir", default="reports/profile", help="Directory for the profile report files")
+    group.addoption("--api-profile-top", type=int, default=10, help="Number of slowest tests to report and capture")
+    group.addoption(
+        "--api-profile-sort", default="total", choices=("total", *PHASES), help="Phase to sort the report by"
+    )
+    group.addoption(
+        "--api-profile-capture", default="none", choices=CAPTURES, help="Profile the slowest tests with cProfile or stack sampling"
+    )
+
+
+def pytest_configure(config):
+    """Register the profiler when ``--api-profile`` is given."""
+    if not config.getoption("--api-profile"):
+        return
+    if config.getoption("--workers", default=0):
+        raise pytest.UsageError("--api-profile times tests in one process; run it without --workers")
+    if config.getoption("--api-profile-top") < 1:
+        raise pytest.UsageError("--api-profile-top must be at least 1")
+    config.pluginmanager.register(APIProfiler(config), "api-profiler")
@@ -0,0 +1,193 @@
+"""
+Latency SLA assertions and regression gating against a stored baseline.
+
+Mark a test with ``@pytest.mark.sla(p95_ms=200)`` to fail it when the requests
+it makes are slower than the budget (scaled by ``Config.SLA_TOLERANCE``). Run
+with ``--sla-save-baseline=PATH`` to store per-endpoint latency histograms, and
+with ``--sla-baseline=PATH`` to fail the session on significant regressions.
+"""
+
+import json
+import math
+from dataclasses import dataclass
+from typing import Dict, List
+
+import pytest
+from api.histogram import LatencyHistogram
+from api.metrics import recorder
+from config import get_config
+
+SLA_LIMITS = ("p50_ms", "p95_ms", "p99_ms", "max_ms")
+
+_regressions_key = pytest.StashKey[list]()
+
+
+def check_sla(histogram: LatencyHistogram, limits: dict, tolerance: float = 1.0) -> List[str]:
+    """List the limits a histogram exceeds, with limits scaled by ``tolerance``."""
+    summary = histogram.summary()
+    violations = []
+    for name in SLA_LIMITS:
+        if name in limits:
+            budget = limits[name] * tolerance
+            if summary[name] > budget:
+                violations.append(f"{name}={summary[name]:.1f} exceeds {budget:.1f}")
+    return violations
+
+
+def mann_whitney_p_value(current: LatencyHistogram, baseline: LatencyHistogram) -> float:
+    """Get the one-sided p-value that ``current`` is slower than ``baseline``.
+
+    Uses the Mann-Whitney U test with the normal approximation, treating values
+    in the same histogram bucket as ties.
+    """
+    n_current, n_baseline = current.count, baseline.count
+    if not n_current or not n_baseline:
+        return 1.0
+    u = 0.0
+    below = 0
+    tie_term = 0
+    for index in sorted(set(current.counts) | set(baseline.counts)):
+        in_current, in_baseline = current.counts.get(index, 0), baseline.counts.get(index, 0)
+        u += in_current * (below + in_baseline / 2)
+        below += in_baseline
+        ties = in_current + in_baseline
+        tie_term += ties ** 3 - ties
+    n = n_current + n_baseline
+    mean = n_current * n_baseline / 2
+    variance = n_current * n_baseline / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (u - mean) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+@dataclass
+class Regression:
+    """An endpoint whose latency regressed against the baseline."""
+
+    endpoint: str
+    baseline_p95_ms: float
+    current_p95_ms: float
+    p_value: float
+
+    @property
+    def change(self) -> float:
+        """Get the relative p95 change."""
+        return self.current_p95_ms / self.baseline_p95_ms - 1 if self.baseline_p95_ms else math.inf
+
+
+def find_regressions(
+    current: Dict[str, LatencyHistogram],
+    baseline: Dict[str, LatencyHistogram],
+    threshold: float,
+    alpha: float,
+    min_samples: int,
+) -> List[Regression]:
+    """Find endpoints whose p95 grew by more than ``threshold`` with p-value below ``alpha``."""
+    regressions = []
+    for endpoint, histogram in sorted(current.items()):
+        previous = baseline.get(endpoint)
+        if previous is None or histogram.count < min_samples or previous.count < min_samples:
+            continue
+        regression = Regression(
+            endpoint,
+            previous.percentile(95),
+            histogram.percentile(95),
+            mann_whitney_p_value(histogram, previous),
+        )
+        if regression.change > threshold and regression.p_value < alpha:
+            regressions.append(regression)
+    return regressions
+
+
+def save_baseline(path: str, histograms: Dict[str, LatencyHistogram]):
+    """Write per-endpoint histograms to a baseline file."""
+    with open(path, "w") as handle:
+        json.dump({key: histogram.to_dict() for key, histogram in histograms.items()}, handle)
+
+
+def load_baseline(path: str) -> Dict[str, LatencyHistogram]:
+    """Read per-endpoint histograms from a baseline file."""
+    with open(path) as handle:
+        return {key: LatencyHistogram.from_dict(data) for key, data in json.load(handle).items()}
+
+
+def _env_config(config):
+    """Get the API configuration for the selected ``--env``."""
+    return get_config(config.getoption("--env", default="dev"))
+
+
+def pytest_addoption(parser):
+    """Add baseline options."""
+    group = parser.getgroup("sla", "latency SLA and regression gating")
+    group.addoption("--sla-baseline", default=None, help="Fail on latency regressions against this baseline file")
+    group.addoption("--sla-save-baseline", default=None, help="Write this run's latencies as a baseline file")
+
+
+def pytest_configure(config):
+    """Register the sla marker."""
+    config.addinivalue_line("markers", "sla(p50_ms, p95_ms, p99_ms, max_ms, endpoint): Latency budget for a test")
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    """Fail a passing test whose requests broke its ``sla`` marker budget."""
+    marker = item.get_closest_marker("sla")
+    if marker is None:
+        yield
+        return
+    limits = dict(marker.kwargs)
+    endpoint = limits.pop("endpoint", None)
+    histogram = LatencyHistogram()
+
+    def collect(sample):
+        if endpoint is None or sample.key == endpoint:
+            histogram.record(sample.total)
+
+    recorder.add_hook(collect)
+    try:
+        outcome = yield
+    finally:
+        recorder.remove_hook(collect)
+    if outcome.excinfo is not None or not histogram.count:
+        return
+    violations = check_sla(histogram, limits, _env_config(item.config).SLA_TOLERANCE)
+    if violations:
+        message = f"Latency SLA broken over {histogram.count} requests: " + "; ".join(violations)
+        outcome.force_exception(pytest.fail.Exception(message, pytrace=False))
+
+
+def pytest_sessionfinish(session):
+    """Save the baseline and fail the session on regressions against the stored one."""
+    config = session.config
+    current = recorder.histograms()
+    save_path = config.getoption("--sla-save-baseline")
+    if save_path:
+        save_baseline(save_path, current)
+    baseline_path = config.getoption("--sla-baseline")
+    if not baseline_path:
+        return
+    settings = _env_config(config)
+    regressions = find_regressions(
+        current,
+        load_baseline(baseline_path),
+        settings.REGRESSION_THRESHOLD,
+        settings.REGRESSION_ALPHA,
+        settings.REGRESSION_MIN_SAMPLES,
+    )
+    config.stash[_regressions_key] = regressions
+    if regressions:
+        session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    """Report latency regressions against the baseline."""
+    regressions = config.stash.get(_regressions_key, None)
+    if regressions is None:
+        return
+    terminalreporter.write_sep("-", f"latency regressions: {len(regressions)}")
+    for regression in regressions:
+        terminalreporter.write_line(
+            f"{regression.endpoint}: p95 {regression.baseline_p95_ms:.1f} -> "
+            f"{regression.current_p95_ms:.1f} ms ({regression.change:+.0%}, p={regression.p_value:.4f})"
+        )
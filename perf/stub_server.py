@@ -0,0 +1,400 @@
+"""
+Local asyncio stand-in for the JSONPlaceholder API, with injectable latency, errors and rate limiting.
+
+Serves ``/users``, ``/posts``, ``/comments``, ``/todos``, ``/albums`` and ``/photos`` the way the API
+clients use them: collections with field filters and ``_start``/``_end`` or
+``_page``/``_limit`` slicing, items by id, nested ``/users/1/posts`` style
+routes, and writes that echo the payload without storing it. GET responses carry
+``Cache-Control`` and ``ETag`` headers and honor ``If-None-Match``.
+
+Run it from the command line::
+
+    python -m perf.stub_server --port 8000 --latency 0.01 --error-rate 0.01
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from http import HTTPStatus
+from urllib.parse import parse_qsl, urlsplit
+
+from api.rate_limit import TokenBucket
+
+RESOURCES = ("users", "posts", "comments", "todos", "albums", "photos")
+# Nested routes: parent resource -> child resources listed under /<parent>/<id>/<child>.
+_CHILDREN = {"users": ("posts", "comments", "todos", "albums"), "posts": ("comments",), "albums": ("photos",)}
+_PARENT_FIELD = {"users": "userId", "posts": "postId", "albums": "albumId"}
+_WORDS = (
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor "
+    "incididunt ut labore et dolore magna aliqua enim ad minim veniam quis nostrud"
+).split()
+
+
+@dataclass
+class StubSettings:
+    """Dataset size and fault injection for a stub server."""
+
+    users: int = 10
+    posts_per_user: int = 10
+    comments_per_post: int = 5
+    todos_per_user: int = 20
+    albums_per_user: int = 10
+    photos_per_album: int = 10
+    # Seconds added to every response, plus up to ``jitter`` more at random.
+    latency: float = 0.0
+    jitter: float = 0.0
+    # Fraction of requests answered with 500.
+    error_rate: float = 0.0
+    # Requests per second served before answering 429; 0 disables the limit.
+    rate_limit: float = 0.0
+    rate_limit_burst: int = 10
+    max_age: int = 43200
+    seed: int = 0
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    """Make a lowercase pseudo-Latin sentence."""
+    return " ".join(rng.choice(_WORDS) for _ in range(words))
+
+
+def build_dataset(settings: StubSettings) -> dict:
+    """Generate deterministic users, posts, comments, todos, albums and photos shaped like JSONPlaceholder's."""
+    rng = random.Random(settings.seed)
+    users, posts, comments, todos = [], [], [], []
+    for user_id in range(1, settings.users + 1):
+        name = f"{rng.choice(_WORDS).title()} {rng.choice(_WORDS).title()}"
+        username = f"{name.split()[0]}.{user_id}"
+        users.append({
+            "id": user_id,
+            "name": name,
+            "username": username,
+            "email": f"{username.lower()}@example.test",
+            "address": {
+                "street": f"{rng.randint(1, 9999)} {rng.choice(_WORDS).title()} Street",
+                "suite": f"Suite {rng.randint(1, 999)}",
+                "city": rng.choice(_WORDS).title(),
+                "zipcode": f"{rng.randint(10000, 99999)}",
+                "geo": {"lat": f"{rng.uniform(-90, 90):.4f}", "lng": f"{rng.uniform(-180, 180):.4f}"},
+            },
+            "phone": f"1-{rng.randint(200, 999)}-{rng.randint(200, 999)}-{rng.randint(1000, 9999)}",
+            "website": f"{username.lower()}.example.test",
+            "company": {
+                "name": f"{rng.choice(_WORDS).title()} Group",
+                "catchPhrase": _sentence(rng, 4),
+                "bs": _sentence(rng, 3),
+            },
+        })
+        for _ in range(settings.posts_per_user):
+            posts.append({
+                "userId": user_id,
+                "id": len(posts) + 1,
+                "title": _sentence(rng, 6),
+                "body": _sentence(rng, 24),
+            })
+        for _ in range(settings.todos_per_user):
+            todos.append({
+                "userId": user_id,
+                "id": len(todos) + 1,
+                "title": _sentence(rng, 5),
+                "completed": rng.random() < 0.5,
+            })
+    for post in posts:
+        for _ in range(settings.comments_per_post):
+            comments.append({
+                "postId": post["id"],
+                "id": len(comments) + 1,
+                "name": _sentence(rng, 5),
+                "email": f"{rng.choice(_WORDS).title()}@{rng.choice(_WORDS)}.test",
+                "body": _sentence(rng, 16),
+            })
+    # Albums and photos draw from the generator last, so the other resources match older datasets.
+    albums, photos = [], []
+    for user_id in range(1, settings.users + 1):
+        for _ in range(settings.albums_per_user):
+            albums.append({"userId": user_id, "id": len(albums) + 1, "title": _sentence(rng, 4)})
+    for album in albums:
+        for _ in range(settings.photos_per_album):
+            photo_id = len(photos) + 1
+            color = f"{rng.randrange(0x1000000):06x}"
+            photos.append({
+                "albumId": album["id"],
+                "id": photo_id,
+                "title": _sentence(rng, 6),
+                "url": f"https://images.example.test/600/{color}",
+                "thumbnailUrl": f"https://images.example.test/150/{color}",
+            })
+    return {"users": users, "posts": posts, "comments": comments, "todos": todos, "albums": albums, "photos": photos}
+
+
+def _matches(item: dict, filters: list) -> bool:
+    """Check an item against ``field=value`` query filters."""
+    return all(str(item.get(field)) == value for field, value in filters)
+
+
+def _slice(items: list, query: dict) -> list:
+    """Apply ``_start``/``_end`` or ``_page``/``_limit`` slicing."""
+    if "_start" in query or "_end" in query:
+        return items[int(query.get("_start", 0)):int(query.get("_end", len(items)))]
+    if "_limit" in query:
+        limit = int(query["_limit"])
+        start = (int(query.get("_page", 1)) - 1) * limit
+        return items[start:start + limit]
+    return items
+
+
+class StubServer:
+    """Asyncio HTTP/1.1 server answering JSONPlaceholder routes from an in-memory dataset."""
+
+    def __init__(self, settings: StubSettings = None, host: str = "127.0.0.1", port: int = 0):
+        """Build the dataset; ``port=0`` picks a free port on start."""
+        self.settings = settings or StubSettings()
+        self.host = host
+        self.port = port
+        self.data = build_dataset(self.settings)
+        self.by_id = {name: {item["id"]: item for item in items} for name, items in self.data.items()}
+        self.stats = Counter()
+        self._rng = random.Random(self.settings.seed)
+        self._bucket = None
+        if self.settings.rate_limit:
+            self._bucket = TokenBucket(self.settings.rate_limit, self.settings.rate_limit_burst)
+        self._server = None
+        self._connections = {}
+        self._loop = None
+        self._stopping = None
+        self._thread = None
+        self._ready = threading.Event()
+        self._error = None
+        # The dataset never changes, so encoded GET bodies are cached per path and query.
+        self._encode_get = lru_cache(maxsize=4096)(self._encode_get)
+
+    @property
+    def url(self) -> str:
+        """Get the base URL to point ``Config.BASE_URL`` at."""
+        return f"http://{self.host}:{self.port}"
+
+    def _get(self, parts: list, query: list):
+        """Resolve a GET to a status and JSON body."""
+        resource = parts[0]
+        if len(parts) == 1:
+            filters = [(field, value) for field, value in query if not field.startswith("_")]
+            items = [item for item in self.data[resource] if _matches(item, filters)] if filters else self.data[resource]
+            return HTTPStatus.OK, _slice(items, dict(query))
+        item_id = int(parts[1]) if parts[1].lstrip("-").isdigit() else None
+        if len(parts) == 2:
+            item = self.by_id[resource].get(item_id)
+            return (HTTPStatus.OK, item) if item is not None else (HTTPStatus.NOT_FOUND, {})
+        if len(parts) == 3 and parts[2] in _CHILDREN.get(resource, ()):
+            children = self.data.get(parts[2], [])
+            field = _PARENT_FIELD[resource]
+            return HTTPStatus.OK, [item for item in children if item.get(field) == item_id]
+        return HTTPStatus.NOT_FOUND, {}
+
+    def _encode_get(self, path: str, query: str):
+        """Encode a GET response body and its ETag."""
+        parts = path.strip("/").split("/")
+        status, body = self._get(parts, parse_qsl(query, keep_blank_values=True))
+        payload = json.dumps(body, indent=2).encode("utf-8")
+        etag = f'W/"{hashlib.blake2b(payload, digest_size=8).hexdigest()}"'
+        return status, payload, etag
+
+    def _write(self, method: str, parts: list, body: bytes):
+        """Resolve a write to a status and JSON body; nothing is stored."""
+        resource = parts[0]
+        try:
+            payload = json.loads(body) if body else {}
+        except ValueError:
+            return HTTPStatus.BAD_REQUEST, {"error": "invalid JSON"}
+        if method == "POST" and len(parts) == 1:
+            return HTTPStatus.CREATED, {**payload, "id": len(self.data[resource]) + 1}
+        if len(parts) != 2 or not parts[1].lstrip("-").isdigit():
+            return HTTPStatus.NOT_FOUND, {}
+        item_id = int(parts[1])
+        existing = self.by_id[resource].get(item_id)
+        if method == "DELETE":
+            return HTTPStatus.OK, {}
+        if existing is None:
+            return HTTPStatus.NOT_FOUND, {}
+        if method == "PUT":
+            return HTTPStatus.OK, {**payload, "id": item_id}
+        return HTTPStatus.OK, {**existing, **payload, "id": item_id}
+
+    async def respond(self, method: str, target: str, headers: dict, body: bytes):
+        """Build the status, headers and body for one request, applying injected faults."""
+        settings = self.settings
+        if settings.latency or settings.jitter:
+            await asyncio.sleep(settings.latency + self._rng.random() * settings.jitter)
+        if self._bucket is not None:
+            wait = self._bucket.try_acquire()
+            if wait:
+                return HTTPStatus.TOO_MANY_REQUESTS, {"Retry-After": str(max(1, round(wait)))}, b"{}"
+        if settings.error_rate and self._rng.random() < settings.error_rate:
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {}, b'{"error": "injected failure"}'
+        url = urlsplit(target)
+        parts = url.path.strip("/").split("/")
+        if parts[0] not in RESOURCES:
+            return HTTPStatus.NOT_FOUND, {}, b"{}"
+        if method == "GET":
+            status, payload, etag = self._encode_get(url.path, url.query)
+            if status != HTTPStatus.OK:
+                return status, {}, payload
+            response_headers = {"Cache-Control": f"max-age={settings.max_age}", "ETag": etag}
+            if headers.get("if-none-match") == etag:
+                return HTTPStatus.NOT_MODIFIED, response_headers, b""
+            return status, response_headers, payload
+        if method in ("POST", "PUT", "PATCH", "DELETE"):
+            status, result = self._write(method, parts, body)
+            return status, {}, json.dumps(result).encode("utf-8")
+        return HTTPStatus.METHOD_NOT_ALLOWED, {}, b"{}"
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve requests on one keep-alive connection."""
+        self._connections[asyncio.current_task()] = writer
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, version = request_line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0))
+                body = await reader.readexactly(length) if length else b""
+                status, response_headers, payload = await self.respond(method, target, headers, body)
+                self.stats[status] += 1
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                head = [f"HTTP/1.1 {status.value} {status.phrase}"]
+                if status != HTTPStatus.NOT_MODIFIED:
+                    head.append("Content-Type: application/json; charset=utf-8")
+                head.append(f"Content-Length: {len(payload)}")
+                head.extend(f"{name}: {value}" for name, value in response_headers.items())
+                if not keep_alive:
+                    head.append("Connection: close")
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + payload)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            self._connections.pop(asyncio.current_task(), None)
+            writer.close()
+
+    async def start_async(self):
+        """Start listening on the running event loop."""
+        self._server = await asyncio.start_server(self._handle, self.host, self.port, backlog=1024)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        """Listen until cancelled."""
+        if self._server is None:
+            await self.start_async()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def _serve_until_stopped(self):
+        """Listen until ``stop`` is called from another thread."""
+        self._loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        await self.start_async()
+        self._ready.set()
+        await self._stopping.wait()
+        self._server.close()
+        # Closing idle keep-alive connections lets their handlers finish instead of being cancelled.
+        handlers = list(self._connections)
+        for writer in self._connections.values():
+            writer.close()
+        await asyncio.gather(*handlers, return_exceptions=True)
+
+    def _run(self):
+        """Run the server on its own event loop, handing a startup failure back to ``start``."""
+        try:
+            asyncio.run(self._serve_until_stopped())
+        except BaseException as error:
+            if self._ready.is_set():
+                raise
+            self._error = error
+            self._ready.set()
+
+    def start(self, timeout: float = 10.0) -> "StubServer":
+        """Start serving on a background thread, raising if the server cannot listen within ``timeout`` seconds."""
+        self._ready.clear()
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name="stub-server", daemon=True)
+        self._thread.start()
+        if not self._ready.wait(timeout):
+            raise TimeoutError(f"Stub server did not start on {self.host}:{self.port} within {timeout}s")
+        if self._error is not None:
+            self._thread.join()
+            self._thread = None
+            raise self._error
+        return self
+
+    def stop(self):
+        """Stop the background server."""
+        if self._thread is not None:
+            self._loop.call_soon_threadsafe(self._stopping.set)
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "StubServer":
+        """Start serving."""
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        """Stop serving."""
+        self.stop()
+
+
+def main(argv=None):
+    """Serve the stub API until interrupted."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--users", type=int, default=10, help="Number of users in the dataset")
+    parser.add_argument("--posts-per-user", type=int, default=10)
+    parser.add_argument("--comments-per-post", type=int, default=5)
+    parser.add_argument("--todos-per-user", type=int, default=20)
+    parser.add_argument("--albums-per-user", type=int, default=10)
+    parser.add_argument("--photos-per-album", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Up to this many extra seconds at random")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 500")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Requests per second before answering 429")
+    parser.add_argument("--rate-limit-burst", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    settings = StubSettings(
+        users=args.users,
+        posts_per_user=args.posts_per_user,
+        comments_per_post=args.comments_per_post,
+        todos_per_user=args.todos_per_user,
+        albums_per_user=args.albums_per_user,
+        photos_per_album=args.photos_per_album,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        rate_limit_burst=args.rate_limit_burst,
+        seed=args.seed,
+    )
+    server = StubServer(settings, args.host, args.port)
+    print(f"Serving stub API on {server.url}")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+"""
+Declarative response schemas compiled into fast validators.
+"""
+
+from schemas.engine import Array, Bool, Field, Float, Int, Object, Schema, SchemaError, Str, Violation
+from schemas.jsonplaceholder import ALBUM, COMMENT, PHOTO, POST, TODO, USER
+
+__all__ = [
+    "Schema",
+    "Field",
+    "Int",
+    "Float",
+    "Str",
+    "Bool",
+    "Object",
+    "Array",
+    "Violation",
+    "SchemaError",
+    "USER",
+    "POST",
+    "COMMENT",
+    "TODO",
+    "ALBUM",
+    "PHOTO",
+]
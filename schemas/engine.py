@@ -0,0 +1,410 @@
+"""
+Declarative response schemas compiled into fast validators.
+
+A ``Schema`` compiles once into a generated Python function that checks an
+object with one inlined expression. Lists are first checked column by column
+with builtins that loop in C (``map``, ``set``, ``min``, ``max``), or with NumPy
+arrays for numeric columns when it is installed. Only when that pass fails are
+the rows scanned with the compiled expression, and only failing rows are walked
+again to report every violation with its path.
+"""
+
+import re
+from dataclasses import dataclass
+from itertools import chain
+from functools import lru_cache
+from operator import itemgetter
+from typing import Any, Dict, List, Optional, Pattern, Sequence, Tuple
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+_UNSET = object()
+
+# Numeric columns shorter than this are compared with builtins even with NumPy.
+NUMPY_MIN_ROWS = 1024
+
+
+@dataclass(frozen=True)
+class Violation:
+    """One way a payload does not match its schema."""
+
+    path: str
+    message: str
+
+    def __str__(self):
+        """Format the violation as ``path: message``."""
+        return f"{self.path or '<root>'}: {self.message}"
+
+
+class SchemaError(AssertionError):
+    """Raised by ``assert_valid`` with every violation found."""
+
+    def __init__(self, schema_name: str, violations: List[Violation], limit: int = 20):
+        """Describe up to ``limit`` violations."""
+        lines = [str(violation) for violation in violations[:limit]]
+        if len(violations) > limit:
+            lines.append(f"... and {len(violations) - limit} more")
+        super().__init__(f"{len(violations)} {schema_name} schema violation(s):\n  " + "\n  ".join(lines))
+        self.violations = violations
+
+
+class Field:
+    """Type and constraints of one value."""
+
+    def __init__(
+        self,
+        types: Tuple[type, ...],
+        required: bool = True,
+        nullable: bool = False,
+        minimum: float = None,
+        maximum: float = None,
+        min_length: int = None,
+        max_length: int = None,
+        pattern: str = None,
+        choices: Sequence = None,
+        equals: Any = _UNSET,
+        schema: "Schema" = None,
+        items: "Field" = None,
+    ):
+        """Describe a value of one of ``types``; ``schema`` and ``items`` describe nested objects and lists."""
+        self.types = types
+        self.type_set = frozenset(types)
+        self.required = required
+        self.nullable = nullable
+        self.minimum = minimum
+        self.maximum = maximum
+        self.min_length = min_length
+        self.max_length = max_length
+        self.pattern: Optional[Pattern] = re.compile(pattern) if pattern else None
+        self.choices = frozenset(choices) if choices is not None else None
+        self.equals = equals
+        self.schema = schema
+        self.items = items
+
+    @property
+    def numeric(self) -> bool:
+        """Check whether the field holds numbers that can be compared as a column."""
+        return bool(self.types) and all(kind in (int, float) for kind in self.types)
+
+    @property
+    def has_value_checks(self) -> bool:
+        """Check whether the field has bounds or an expected value."""
+        return self.minimum is not None or self.maximum is not None or self.equals is not _UNSET
+
+    def replace(self, **changes) -> "Field":
+        """Copy the field with some attributes changed."""
+        field = object.__new__(Field)
+        field.__dict__.update(self.__dict__, **changes)
+        return field
+
+    def violations(self, value, path: str) -> List[Violation]:
+        """Get every violation of ``value``, which sits at ``path``."""
+        if value is None and self.nullable:
+            return []
+        if type(value) not in self.types:
+            expected = " or ".join(kind.__name__ for kind in self.types)
+            return [Violation(path, f"expected {expected}, got {type(value).__name__}")]
+        found = []
+        if self.minimum is not None and value < self.minimum:
+            found.append(Violation(path, f"{value!r} is less than {self.minimum!r}"))
+        if self.maximum is not None and value > self.maximum:
+            found.append(Violation(path, f"{value!r} is greater than {self.maximum!r}"))
+        if self.min_length is not None and len(value) < self.min_length:
+            found.append(Violation(path, f"length {len(value)} is less than {self.min_length}"))
+        if self.max_length is not None and len(value) > self.max_length:
+            found.append(Violation(path, f"length {len(value)} is greater than {self.max_length}"))
+        if self.pattern is not None and self.pattern.fullmatch(value) is None:
+            found.append(Violation(path, f"{value!r} does not match {self.pattern.pattern!r}"))
+        if self.choices is not None and value not in self.choices:
+            found.append(Violation(path, f"{value!r} is not one of {sorted(self.choices, key=repr)!r}"))
+        if self.equals is not _UNSET and value != self.equals:
+            found.append(Violation(path, f"expected {self.equals!r}, got {value!r}"))
+        if self.schema is not None:
+            found.extend(self.schema.violations(value, path))
+        if self.items is not None:
+            for index, item in enumerate(value):
+                found.extend(self.items.violations(item, f"{path}[{index}]"))
+        return found
+
+
+def Int(**constraints) -> Field:
+    """Describe an integer (``bool`` is rejected)."""
+    return Field((int,), **constraints)
+
+
+def Float(**constraints) -> Field:
+    """Describe a number, integer or float."""
+    return Field((int, float), **constraints)
+
+
+def Str(**constraints) -> Field:
+    """Describe a string."""
+    return Field((str,), **constraints)
+
+
+def Bool(**constraints) -> Field:
+    """Describe a boolean."""
+    return Field((bool,), **constraints)
+
+
+def Object(schema: "Schema", **constraints) -> Field:
+    """Describe a nested object."""
+    return Field((dict,), schema=schema, **constraints)
+
+
+def Array(items: Field, **constraints) -> Field:
+    """Describe a list whose elements all match ``items``."""
+    return Field((list,), items=items, **constraints)
+
+
+class _Compiler:
+    """Generate the source of one inlined check expression for a schema."""
+
+    def __init__(self):
+        """Start with no bound constants."""
+        self.constants = {}
+        self.counter = 0
+
+    def constant(self, value) -> str:
+        """Bind a value to a name the generated code can use."""
+        name = f"_c{len(self.constants)}"
+        self.constants[name] = value
+        return name
+
+    def variable(self) -> str:
+        """Get a fresh local name."""
+        self.counter += 1
+        return f"_v{self.counter}"
+
+    def schema(self, schema: "Schema", value: str) -> str:
+        """Get an expression checking that ``value`` matches ``schema``."""
+        terms = [f"type({value}) is dict"]
+        if not schema.extra:
+            terms.append(f"{value}.keys() <= {self.constant(frozenset(schema.fields))}")
+        for name, field in schema.fields.items():
+            variable = self.variable()
+            check = self.field(field, variable)
+            lookup = f"({variable} := {value}[{name!r}])"
+            check = check.replace(variable, lookup, 1)
+            if field.required:
+                terms.append(f"{name!r} in {value} and {check}")
+            else:
+                terms.append(f"({name!r} not in {value} or {check})")
+        return "(" + " and ".join(terms) + ")"
+
+    def field(self, field: Field, value: str) -> str:
+        """Get an expression checking one value, which must be referenced first in the result."""
+        if len(field.types) == 1:
+            terms = [f"type({value}) is {self.constant(field.types[0])}"]
+        else:
+            terms = [f"type({value}) in {self.constant(frozenset(field.types))}"]
+        if field.minimum is not None:
+            terms.append(f"{value} >= {field.minimum!r}")
+        if field.maximum is not None:
+            terms.append(f"{value} <= {field.maximum!r}")
+        if field.equals is not _UNSET:
+            terms.append(f"{value} == {self.constant(field.equals)}")
+        if field.min_length is not None:
+            terms.append(f"len({value}) >= {field.min_length}")
+        if field.max_length is not None:
+            terms.append(f"len({value}) <= {field.max_length}")
+        if field.pattern is not None:
+            terms.append(f"{self.constant(field.pattern.fullmatch)}({value}) is not None")
+        if field.choices is not None:
+            terms.append(f"{value} in {self.constant(field.choices)}")
+        if field.schema is not None:
+            terms.append(self.schema(field.schema, value))
+        if field.items is not None:
+            terms.append(f"all(map({self.constant(compile_check(field.items))}, {value}))")
+        check = "(" + " and ".join(terms) + ")"
+        if field.nullable:
+            # The first reference must stay first, so test the type before None.
+            check = f"({check} or {value} is None)"
+        return check
+
+
+_DICT = frozenset({dict})
+
+
+def _numeric_column_valid(field: Field, column: list) -> bool:
+    """Compare a numeric column with the field's bounds and expected value as a NumPy array."""
+    dtype = numpy.int64 if field.types == (int,) else numpy.float64
+    try:
+        array = numpy.fromiter(column, dtype=dtype, count=len(column))
+    except OverflowError:
+        return False
+    return (
+        (field.minimum is None or array.min() >= field.minimum)
+        and (field.maximum is None or array.max() <= field.maximum)
+        and (field.equals is _UNSET or bool((array == field.equals).all()))
+    )
+
+
+def _column_valid(field: Field, column: list) -> bool:
+    """Check every value of a column against a field with builtins that loop in C."""
+    if field.nullable:
+        column = [value for value in column if value is not None]
+    if not column:
+        return True
+    if not set(map(type, column)) <= field.type_set:
+        return False
+    if field.has_value_checks and field.numeric and numpy is not None and len(column) >= NUMPY_MIN_ROWS:
+        if not _numeric_column_valid(field, column):
+            return False
+    else:
+        if field.minimum is not None and min(column) < field.minimum:
+            return False
+        if field.maximum is not None and max(column) > field.maximum:
+            return False
+        if field.equals is not _UNSET and column.count(field.equals) != len(column):
+            return False
+    if field.min_length is not None and min(map(len, column)) < field.min_length:
+        return False
+    if field.max_length is not None and max(map(len, column)) > field.max_length:
+        return False
+    if field.pattern is not None and not all(map(field.pattern.fullmatch, column)):
+        return False
+    if field.choices is not None and not set(column) <= field.choices:
+        return False
+    if field.schema is not None and not field.schema.columns_valid(column):
+        return False
+    if field.items is not None and not _column_valid(field.items, list(chain.from_iterable(column))):
+        return False
+    return True
+
+
+def _build(source: str, constants: dict, name: str):
+    """Compile generated source and return the function it defines."""
+    namespace = dict(constants)
+    exec(compile(source, f"<schema {name}>", "exec"), namespace)
+    return namespace[name]
+
+
+def compile_check(field: Field):
+    """Compile a ``check(value) -> bool`` function for a single field."""
+    compiler = _Compiler()
+    expression = compiler.field(field, "value")
+    return _build(f"def check(value):\n    return {expression}\n", compiler.constants, "check")
+
+
+class Schema:
+    """Named set of fields an object payload must have.
+
+    Extra keys are allowed unless ``extra=False``. ``where(field=value)`` derives a
+    schema that also pins field values, e.g. ``POST.where(userId=1)``.
+    """
+
+    def __init__(self, name: str, fields: Dict[str, Field], extra: bool = True):
+        """Declare the schema; it is compiled on first use."""
+        self.name = name
+        self.fields = fields
+        self.extra = extra
+        self._check = None
+        self._invalid_rows = None
+
+    def __repr__(self):
+        """Represent the schema by its name and fields."""
+        return f"<Schema {self.name} {list(self.fields)}>"
+
+    def violations(self, value, path: str = "") -> List[Violation]:
+        """Get every violation of an object at ``path``, walking it field by field."""
+        if type(value) is not dict:
+            return [Violation(path, f"expected object, got {type(value).__name__}")]
+        found = []
+        for name, field in self.fields.items():
+            child = f"{path}.{name}" if path else name
+            if name not in value:
+                if field.required:
+                    found.append(Violation(child, "missing required field"))
+                continue
+            found.extend(field.violations(value[name], child))
+        if not self.extra:
+            for name in value.keys() - self.fields.keys():
+                found.append(Violation(f"{path}.{name}" if path else name, "unexpected field"))
+        return found
+
+    def check(self, value) -> bool:
+        """Check an object with the compiled validator."""
+        if self._check is None:
+            compiler = _Compiler()
+            expression = compiler.schema(self, "value")
+            self._check = _build(f"def check(value):\n    return {expression}\n", compiler.constants, "check")
+        return self._check(value)
+
+    def invalid_rows(self, items: Sequence) -> List[int]:
+        """Get the indices of the items that fail the compiled validator, in one pass."""
+        if self._invalid_rows is None:
+            compiler = _Compiler()
+            expression = compiler.schema(self, "value")
+            source = (
+                "def invalid_rows(items):\n"
+                f"    return [index for index, value in enumerate(items) if not {expression}]\n"
+            )
+            self._invalid_rows = _build(source, compiler.constants, "invalid_rows")
+        return self._invalid_rows(items)
+
+    def columns_valid(self, objects: Sequence) -> bool:
+        """Check a list of objects column by column, without reporting where it fails."""
+        if not set(map(type, objects)) <= _DICT:
+            return False
+        if not self.extra and not set().union(*map(dict.keys, objects)) <= self.fields.keys():
+            return False
+        for name, field in self.fields.items():
+            if field.required:
+                try:
+                    column = list(map(itemgetter(name), objects))
+                except KeyError:
+                    return False
+            else:
+                column = [value[name] for value in objects if name in value]
+            if not _column_valid(field, column):
+                return False
+        return True
+
+    def validate(self, value) -> List[Violation]:
+        """Get every violation of one object, or an empty list if it is valid."""
+        if self.check(value):
+            return []
+        return self.violations(value)
+
+    def validate_many(self, items: Sequence) -> List[Violation]:
+        """Get every violation in a list of objects, with paths like ``[3].address.city``."""
+        if type(items) is not list:
+            return [Violation("", f"expected array, got {type(items).__name__}")]
+        if self.columns_valid(items):
+            return []
+        found = []
+        for index in self.invalid_rows(items):
+            found.extend(self.violations(items[index], f"[{index}]"))
+        return found
+
+    def assert_valid(self, value):
+        """Raise ``SchemaError`` listing every violation of one object."""
+        violations = self.validate(value)
+        if violations:
+            raise SchemaError(self.name, violations)
+
+    def assert_valid_many(self, items: Sequence):
+        """Raise ``SchemaError`` listing every violation in a list of objects."""
+        violations = self.validate_many(items)
+        if violations:
+            raise SchemaError(self.name, violations)
+
+    def where(self, **values) -> "Schema":
+        """Get a schema that also requires the given field values."""
+        return _derive(self, tuple(sorted(values.items(), key=itemgetter(0))))
+
+
+@lru_cache(maxsize=256)
+def _derive(schema: Schema, values: tuple) -> Schema:
+    """Build (once per schema and values) a schema with pinned field values."""
+    fields = dict(schema.fields)
+    for name, value in values:
+        if name not in fields:
+            raise KeyError(f"{schema.name} has no field {name!r}")
+        fields[name] = fields[name].replace(equals=value)
+    pinned = ", ".join(f"{name}={value!r}" for name, value in values)
+    return Schema(f"{schema.name}({pinned})", fields, schema.extra)
@@ -0,0 +1,73 @@
+"""
+Schemas of the JSONPlaceholder resources.
+"""
+
+from schemas.engine import Bool, Int, Object, Schema, Str
+
+EMAIL = r"[^@\s]+@[^@\s]+\.[^@\s]+"
+
+GEO = Schema("Geo", {
+    "lat": Str(pattern=r"-?\d+(\.\d+)?"),
+    "lng": Str(pattern=r"-?\d+(\.\d+)?"),
+})
+
+ADDRESS = Schema("Address", {
+    "street": Str(),
+    "suite": Str(),
+    "city": Str(),
+    "zipcode": Str(),
+    "geo": Object(GEO),
+})
+
+COMPANY = Schema("Company", {
+    "name": Str(),
+    "catchPhrase": Str(),
+    "bs": Str(),
+})
+
+USER = Schema("User", {
+    "id": Int(minimum=1),
+    "name": Str(min_length=1),
+    "username": Str(min_length=1),
+    "email": Str(pattern=EMAIL),
+    "address": Object(ADDRESS),
+    "phone": Str(),
+    "website": Str(),
+    "company": Object(COMPANY),
+})
+
+POST = Schema("Post", {
+    "id": Int(minimum=1),
+    "userId": Int(minimum=1),
+    "title": Str(),
+    "body": Str(),
+})
+
+COMMENT = Schema("Comment", {
+    "id": Int(minimum=1),
+    "postId": Int(minimum=1),
+    "name": Str(),
+    "email": Str(pattern=EMAIL),
+    "body": Str(),
+})
+
+TODO = Schema("Todo", {
+    "id": Int(minimum=1),
+    "userId": Int(minimum=1),
+    "title": Str(),
+    "completed": Bool(),
+})
+
+ALBUM = Schema("Album", {
+    "id": Int(minimum=1),
+    "userId": Int(minimum=1),
+    "title": Str(),
+})
+
+PHOTO = Schema("Photo", {
+    "id": Int(minimum=1),
+    "albumId": Int(minimum=1),
+    "title": Str(),
+    "url": Str(pattern=r"https?://\S+"),
+    "thumbnailUrl": Str(pattern=r"https?://\S+"),
+})
@@ -0,0 +1,15 @@
+"""
+Seeded test-data generation and lazily read data files for data-driven suites.
+"""
+
+from testdata.files import DataFile, open_data_file
+from testdata.generator import MALFORMED_EMAILS, TITLE_LENGTHS, Case, PayloadGenerator
+
+__all__ = [
+    "PayloadGenerator",
+    "Case",
+    "DataFile",
+    "open_data_file",
+    "MALFORMED_EMAILS",
+    "TITLE_LENGTHS",
+]
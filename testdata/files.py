@@ -0,0 +1,190 @@
+"""
+Memory-mapped CSV and JSONL data files with a line-offset index.
+
+A ``DataFile`` maps the file into memory and keeps only the start offset of
+every row (8 bytes per row), so opening a file with millions of rows costs one
+pass over its bytes and rows are decoded only when read. The index is saved
+next to the file as ``<name>.idx`` and reused while the file's size and
+modification time are unchanged, so later runs and workers skip the pass.
+Rows are one per line; CSV fields must not contain newlines.
+"""
+
+import csv
+import mmap
+import os
+import struct
+from array import array
+from functools import lru_cache
+from typing import Callable, Dict, Iterator, List
+
+from api.response import json_loads
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+_INDEX_HEADER = struct.Struct("<8sqq")
+_INDEX_MAGIC = b"rowidx01"
+_FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+
+
+def _line_starts(data) -> array:
+    """Get the start offset of every line, plus the offset just past the last one."""
+    if numpy is not None and len(data):
+        newlines = numpy.flatnonzero(numpy.frombuffer(data, dtype=numpy.uint8) == 10)
+        starts = array("q", [0])
+        starts.frombytes((newlines + 1).astype(numpy.int64).tobytes())
+    else:
+        starts = array("q", [0])
+        find, append = data.find, starts.append
+        position = find(b"\n")
+        while position != -1:
+            append(position + 1)
+            position = find(b"\n", position + 1)
+    if starts[-1] != len(data):
+        starts.append(len(data) + 1)
+    return starts
+
+
+def parse_shard(spec: str) -> tuple:
+    """Parse a ``K/N`` shard spec (1-based) into ``(K, N)``."""
+    try:
+        shard, shards = (int(part) for part in spec.split("/"))
+    except ValueError:
+        raise ValueError(f"Invalid shard {spec!r}, expected K/N such as 2/8") from None
+    if not 1 <= shard <= shards:
+        raise ValueError(f"Invalid shard {spec!r}, K must be between 1 and N")
+    return shard, shards
+
+
+def shard_range(total: int, shard: int, shards: int) -> range:
+    """Get the contiguous block of ``range(total)`` owned by 1-based ``shard`` of ``shards``."""
+    return range(total * (shard - 1) // shards, total * shard // shards)
+
+
+def chunk_range(rows: range, size: int) -> List[range]:
+    """Split a range of rows into consecutive ranges of at most ``size`` rows."""
+    return [range(start, min(start + size, rows.stop)) for start in range(rows.start, rows.stop, size)]
+
+
+class DataFile:
+    """Random-access, lazily decoded view of a CSV (with a header row) or JSONL file."""
+
+    def __init__(self, path: str, format: str = None, converters: Dict[str, Callable] = None, cache_index: bool = True):
+        """Map ``path`` and load or build its row index; ``converters`` map CSV columns to types."""
+        self.path = str(path)
+        self.format = format or _FORMATS.get(os.path.splitext(self.path)[1].lower())
+        if self.format not in ("csv", "jsonl"):
+            raise ValueError(f"Cannot tell the format of {self.path}, pass format='csv' or 'jsonl'")
+        self.converters = converters or {}
+        with open(self.path, "rb") as file:
+            stat = os.fstat(file.fileno())
+            self._data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if stat.st_size else b""
+        self._stamp = (stat.st_size, stat.st_mtime_ns)
+        self._offsets = self._load_index() if cache_index else None
+        if self._offsets is None:
+            self._offsets = _line_starts(self._data)
+            if cache_index:
+                self._save_index()
+        self.header = None
+        self._first = 0
+        if self.format == "csv" and len(self._offsets) > 1:
+            self.header = next(csv.reader([self._line(0)]))
+            self._first = 1
+
+    @property
+    def index_path(self) -> str:
+        """Get the path of the saved row index."""
+        return self.path + ".idx"
+
+    def _load_index(self):
+        """Load the saved index if it matches the file, else None."""
+        try:
+            with open(self.index_path, "rb") as file:
+                magic, size, mtime = _INDEX_HEADER.unpack(file.read(_INDEX_HEADER.size))
+                if magic != _INDEX_MAGIC or (size, mtime) != self._stamp:
+                    return None
+                offsets = array("q")
+                offsets.frombytes(file.read())
+                return offsets
+        except (OSError, struct.error):
+            return None
+
+    def _save_index(self):
+        """Save the index next to the file, skipping read-only locations."""
+        temporary = f"{self.index_path}.{os.getpid()}"
+        try:
+            with open(temporary, "wb") as file:
+                file.write(_INDEX_HEADER.pack(_INDEX_MAGIC, *self._stamp))
+                self._offsets.tofile(file)
+            os.replace(temporary, self.index_path)
+        except OSError:
+            try:
+                os.remove(temporary)
+            except OSError:
+                pass
+
+    def _line(self, line: int) -> str:
+        """Get one line without its line ending."""
+        start, end = self._offsets[line], self._offsets[line + 1] - 1
+        return self._data[start:end].rstrip(b"\r").decode("utf-8")
+
+    def __len__(self):
+        """Get the number of rows, not counting a CSV header."""
+        return len(self._offsets) - 1 - self._first
+
+    def __getitem__(self, row: int) -> dict:
+        """Decode one row."""
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError(f"Row {row} out of range for {self.path} ({len(self)} rows)")
+        line = self._line(row + self._first)
+        if self.format == "jsonl":
+            return json_loads(line)
+        record = dict(zip(self.header, next(csv.reader([line]))))
+        for name, convert in self.converters.items():
+            if name in record:
+                record[name] = convert(record[name])
+        return record
+
+    def rows(self, start: int = 0, stop: int = None) -> Iterator[dict]:
+        """Lazily decode the rows from ``start`` up to ``stop``."""
+        return map(self.__getitem__, range(start, len(self) if stop is None else min(stop, len(self))))
+
+    def __iter__(self):
+        """Lazily decode every row."""
+        return self.rows()
+
+    def shard(self, shard: int = 1, shards: int = 1) -> range:
+        """Get the rows owned by 1-based ``shard`` of ``shards``."""
+        return shard_range(len(self), shard, shards)
+
+    def close(self):
+        """Unmap the file."""
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+
+    def __enter__(self):
+        """Enter the context manager."""
+        return self
+
+    def __exit__(self, *args):
+        """Unmap the file."""
+        self.close()
+
+    def __repr__(self):
+        """Represent the file by its path and size."""
+        return f"<DataFile {self.path} {len(self)} rows>"
+
+
+@lru_cache(maxsize=None)
+def _open(path: str, format: str, converters: tuple) -> DataFile:
+    """Open a data file once per process."""
+    return DataFile(path, format, dict(converters))
+
+
+def open_data_file(path: str, format: str = None, converters: Dict[str, Callable] = None) -> DataFile:
+    """Get the process-wide ``DataFile`` for ``path``."""
+    return _open(os.path.abspath(path), format, tuple(sorted((converters or {}).items())))
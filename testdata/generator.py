@@ -0,0 +1,256 @@
+"""
+Seeded generator of valid and invalid User, Post and Comment payloads.
+
+Every payload is a pure function of ``(seed, kind, index)``: case ``i`` is built
+from its own ``random.Random`` seeded with that triple, so any case can be rebuilt
+on its own (``generator.case("post", 41_337)``), the same seed always yields the
+same cases on every machine and ``--workers`` process, and ``cases()`` streams an
+arbitrarily long run without holding more than one payload at a time.
+"""
+
+import random
+from hashlib import blake2b
+from dataclasses import dataclass
+from itertools import count, islice
+from typing import Iterator, Sequence
+
+_WORDS = (
+    "lorem", "ipsum", "dolor", "sit", "amet", "consectetur", "adipiscing", "elit",
+    "sed", "do", "eiusmod", "tempor", "incididunt", "labore", "dolore", "magna",
+    "aliqua", "enim", "minim", "veniam", "quis", "nostrud", "ullamco", "laboris",
+)
+
+# Malformed emails that must never match ``schemas.jsonplaceholder.EMAIL``.
+MALFORMED_EMAILS = (
+    "invalid",
+    "invalid@",
+    "@example.com",
+    "user@",
+    "",
+    "user@@example.com",
+    "user@example",
+    "user @example.com",
+    "user@exam ple.com",
+    "user@.com",
+    "user.example.com",
+)
+
+# Title lengths around the usual column and form limits.
+TITLE_LENGTHS = (0, 1, 2, 63, 64, 65, 127, 128, 255, 256, 1024, 65535)
+
+
+@dataclass(frozen=True)
+class Case:
+    """One generated payload; invalid cases carry the reason they are invalid."""
+
+    kind: str
+    index: int
+    payload: dict
+    valid: bool = True
+    reason: str = ""
+
+    @property
+    def id(self) -> str:
+        """Get a stable test id, e.g. ``post-17`` or ``user-3-malformed-email``."""
+        suffix = f"-{self.reason}" if self.reason else ""
+        return f"{self.kind}-{self.index}{suffix}"
+
+    def __str__(self):
+        """Use the test id, so ``ids=str`` names parametrized cases."""
+        return self.id
+
+
+def _words(rng: random.Random, low: int, high: int) -> str:
+    """Make a lowercase pseudo-Latin sentence of ``low`` to ``high`` words."""
+    return " ".join(rng.choices(_WORDS, k=rng.randint(low, high)))
+
+
+def _text(rng: random.Random, length: int) -> str:
+    """Make pseudo-Latin text of exactly ``length`` characters."""
+    text = ""
+    while len(text) < length:
+        text += rng.choice(_WORDS) + " "
+    return text[:length]
+
+
+def _corrupt_email(rng: random.Random, email: str) -> str:
+    """Break a valid email in one of several ways."""
+    local, domain = email.split("@")
+    return rng.choice((
+        local + domain,
+        f"{local}@@{domain}",
+        f"{local}@{domain.replace('.', '')}",
+        f"{local} @{domain}",
+        f"@{domain}",
+        f"{local}@",
+    ))
+
+
+class PayloadGenerator:
+    """Deterministic source of create payloads for the data-driven suites."""
+
+    KINDS = ("user", "post", "comment")
+
+    def __init__(self, seed: int = 0, users: int = 10, posts: int = 100):
+        """Generate with ``seed``; foreign keys stay within ``users`` and ``posts``."""
+        self.seed = seed
+        self.users = users
+        self.posts = posts
+
+    def _rng(self, kind: str, index: int) -> random.Random:
+        """Get the random source of one case."""
+        return random.Random(f"{self.seed}:{kind}:{index}")
+
+    def _draw(self, label: str, index: int) -> float:
+        """Get a uniform number in [0, 1) for one case, cheaper than seeding a ``Random``."""
+        digest = blake2b(f"{self.seed}:{label}:{index}".encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "big") / 2 ** 64
+
+    def user(self, index: int) -> dict:
+        """Build a valid user payload shaped like JSONPlaceholder's."""
+        return self._user(self._rng("user", index), index)
+
+    def _user(self, rng: random.Random, index: int) -> dict:
+        """Build a valid user payload from ``rng``."""
+        first, last = rng.choice(_WORDS).title(), rng.choice(_WORDS).title()
+        username = f"{first}.{last}{index}"
+        return {
+            "name": f"{first} {last}",
+            "username": username,
+            "email": f"{username.lower()}@{rng.choice(_WORDS)}.test",
+            "address": {
+                "street": f"{rng.randint(1, 9999)} {rng.choice(_WORDS).title()} Street",
+                "suite": f"Suite {rng.randint(1, 999)}",
+                "city": rng.choice(_WORDS).title(),
+                "zipcode": f"{rng.randint(10000, 99999)}",
+                "geo": {"lat": f"{rng.uniform(-90, 90):.4f}", "lng": f"{rng.uniform(-180, 180):.4f}"},
+            },
+            "phone": f"1-{rng.randint(200, 999)}-{rng.randint(200, 999)}-{rng.randint(1000, 9999)}",
+            "website": f"{username.lower()}.example.test",
+            "company": {
+                "name": f"{rng.choice(_WORDS).title()} Group",
+                "catchPhrase": _words(rng, 3, 5),
+                "bs": _words(rng, 2, 4),
+            },
+        }
+
+    def post(self, index: int) -> dict:
+        """Build a valid post payload."""
+        return self._post(self._rng("post", index))
+
+    def _post(self, rng: random.Random) -> dict:
+        """Build a valid post payload from ``rng``."""
+        return {"userId": rng.randint(1, self.users), "title": _words(rng, 3, 8), "body": _words(rng, 10, 40)}
+
+    def comment(self, index: int) -> dict:
+        """Build a valid comment payload."""
+        return self._comment(self._rng("comment", index))
+
+    def _comment(self, rng: random.Random) -> dict:
+        """Build a valid comment payload from ``rng``."""
+        return {
+            "postId": rng.randint(1, self.posts),
+            "name": _words(rng, 3, 6),
+            "email": f"{rng.choice(_WORDS)}@{rng.choice(_WORDS)}.test",
+            "body": _words(rng, 8, 24),
+        }
+
+    def invalid(self, kind: str, index: int) -> Case:
+        """Build an invalid payload; the kind of defect cycles with ``index`` so every one is covered."""
+        rng = self._rng(f"invalid-{kind}", index)
+        if kind == "user":
+            payload, mutations = self._user(rng, index), _USER_MUTATIONS
+        elif kind == "post":
+            payload, mutations = self._post(rng), _POST_MUTATIONS
+        elif kind == "comment":
+            payload, mutations = self._comment(rng), _COMMENT_MUTATIONS
+        else:
+            raise ValueError(f"Unknown payload kind {kind!r}, expected one of {self.KINDS}")
+        reason, mutate = mutations[index % len(mutations)]
+        mutate(rng, payload)
+        return Case(kind, index, payload, valid=False, reason=reason)
+
+    def case(self, kind: str, index: int, invalid_ratio: float = 0.0) -> Case:
+        """Build case ``index``, invalid with probability ``invalid_ratio``."""
+        if invalid_ratio and self._draw(f"ratio-{kind}", index) < invalid_ratio:
+            return self.invalid(kind, index)
+        build = getattr(self, kind, None) if kind in self.KINDS else None
+        if build is None:
+            raise ValueError(f"Unknown payload kind {kind!r}, expected one of {self.KINDS}")
+        return Case(kind, index, build(index))
+
+    def cases(self, kind: str, limit: int = None, invalid_ratio: float = 0.0, start: int = 0) -> Iterator[Case]:
+        """Lazily yield ``limit`` cases from ``start`` (endlessly when ``limit`` is None)."""
+        cases = (self.case(kind, index, invalid_ratio) for index in count(start))
+        return cases if limit is None else islice(cases, limit)
+
+    def payloads(self, kind: str, limit: int = None, start: int = 0) -> Iterator[dict]:
+        """Lazily yield valid payloads, e.g. for ``client.iter_batch``."""
+        return (case.payload for case in self.cases(kind, limit, start=start))
+
+    def title_lengths(self, lengths: Sequence[int] = TITLE_LENGTHS) -> Iterator[Case]:
+        """Yield post payloads whose titles have boundary lengths."""
+        for length in lengths:
+            payload = self.post(length)
+            payload["title"] = _text(self._rng("title", length), length)
+            yield Case("post", length, payload, reason=f"title-length-{length}")
+
+    def malformed_emails(self, extra: int = 0) -> Iterator[Case]:
+        """Yield user payloads with each known malformed email, then ``extra`` generated ones."""
+        for index, email in enumerate(MALFORMED_EMAILS):
+            yield Case("user", index, {**self.user(index), "email": email}, valid=False, reason="malformed-email")
+        for index in range(len(MALFORMED_EMAILS), len(MALFORMED_EMAILS) + extra):
+            payload = self.user(index)
+            payload["email"] = _corrupt_email(self._rng("email", index), payload["email"])
+            yield Case("user", index, payload, valid=False, reason="malformed-email")
+
+
+def _set(key: str, choices: tuple):
+    """Make a mutation that sets ``key`` to one of ``choices``."""
+    def mutate(rng: random.Random, payload: dict):
+        payload[key] = rng.choice(choices)
+    return mutate
+
+
+def _drop(keys: tuple):
+    """Make a mutation that removes one of ``keys``."""
+    def mutate(rng: random.Random, payload: dict):
+        del payload[rng.choice(keys)]
+    return mutate
+
+
+def _break_email(rng: random.Random, payload: dict):
+    """Replace the email with a known or generated malformed one."""
+    if rng.random() < 0.5:
+        payload["email"] = rng.choice(MALFORMED_EMAILS)
+    else:
+        payload["email"] = _corrupt_email(rng, payload["email"])
+
+
+def _break_geo(rng: random.Random, payload: dict):
+    """Make a coordinate non-numeric."""
+    payload["address"]["geo"][rng.choice(("lat", "lng"))] = rng.choice(("north", "", "12,5", "1e"))
+
+
+_USER_MUTATIONS = (
+    ("malformed-email", _break_email),
+    ("empty-name", _set("name", ("",))),
+    ("empty-username", _set("username", ("",))),
+    ("wrong-type-name", _set("name", (None, 42, ["name"]))),
+    ("missing-field", _drop(("name", "username", "email", "address", "company"))),
+    ("malformed-geo", _break_geo),
+)
+
+_POST_MUTATIONS = (
+    ("wrong-type-user-id", _set("userId", ("1", None, True, 1.5))),
+    ("non-positive-user-id", _set("userId", (0, -1, -(2 ** 31)))),
+    ("wrong-type-title", _set("title", (None, 7, ["title"]))),
+    ("missing-field", _drop(("userId", "title", "body"))),
+)
+
+_COMMENT_MUTATIONS = (
+    ("malformed-email", _break_email),
+    ("wrong-type-post-id", _set("postId", ("1", None, False))),
+    ("non-positive-post-id", _set("postId", (0, -5))),
+    ("missing-field", _drop(("postId", "name", "email", "body"))),
+)
@@ -0,0 +1,88 @@
+"""
+Pytest plugin that parametrizes tests lazily from CSV and JSONL data files.
+
+Mark a test with ``@pytest.mark.data_file(path)`` and take a ``data_row``
+argument, or ``@pytest.mark.data_file(path, batch=500)`` and take ``data_rows``.
+Each test item carries only a row range; the rows themselves are read from the
+memory-mapped file when the test runs. ``--data-shard=K/N`` keeps only the K-th
+of N contiguous row blocks, so CI jobs split a large file by index range and
+each one collects only its own rows.
+
+A ``data_row`` test still collects one item per row of its shard, and pytest
+holds every item in memory for the whole session. Above ``ROW_ITEMS_WARNING``
+rows a collection warning points to ``batch=N`` or ``--data-shard``; files with
+millions of rows should use one of them.
+"""
+
+import os
+
+import pytest
+from testdata.files import chunk_range, open_data_file, parse_shard
+
+# Rows of a ``data_row`` test above which collection warns about the item count.
+ROW_ITEMS_WARNING = 10_000
+
+
+def _resolve(path: str, metafunc) -> str:
+    """Resolve a relative data path against the rootdir."""
+    return path if os.path.isabs(path) else os.path.join(str(metafunc.config.rootpath), path)
+
+
+def pytest_addoption(parser):
+    """Add the shard option."""
+    group = parser.getgroup("data", "data-file parametrization")
+    group.addoption(
+        "--data-shard",
+        default=os.getenv("DATA_SHARD", "1/1"),
+        help="Run only the K-th of N row blocks of every data file, e.g. 2/8",
+    )
+
+
+def pytest_configure(config):
+    """Register the data_file marker and check the shard option."""
+    config.addinivalue_line(
+        "markers", "data_file(path, batch=1, format=None, converters=None): Parametrize from a CSV or JSONL file"
+    )
+    parse_shard(config.getoption("--data-shard"))
+
+
+def pytest_generate_tests(metafunc):
+    """Parametrize ``data_row``/``data_rows`` with row ranges of the marked data file."""
+    marker = metafunc.definition.get_closest_marker("data_file")
+    if marker is None:
+        return
+    path = _resolve(marker.args[0] if marker.args else marker.kwargs["path"], metafunc)
+    batch = marker.kwargs.get("batch", 1)
+    data = open_data_file(path, marker.kwargs.get("format"), marker.kwargs.get("converters"))
+    rows = data.shard(*parse_shard(metafunc.config.getoption("--data-shard")))
+    source = (path, marker.kwargs.get("format"), marker.kwargs.get("converters"))
+    if "data_rows" in metafunc.fixturenames:
+        chunks = chunk_range(rows, batch)
+        metafunc.parametrize(
+            "data_rows",
+            [(source, chunk) for chunk in chunks],
+            indirect=True,
+            ids=[f"rows{chunk.start}-{chunk.stop - 1}" for chunk in chunks],
+        )
+    elif "data_row" in metafunc.fixturenames:
+        if len(rows) > ROW_ITEMS_WARNING:
+            metafunc.definition.warn(pytest.PytestWarning(
+                f"data_row collects {len(rows)} items from {path}; take data_rows with batch=N or use --data-shard"
+            ))
+        metafunc.parametrize("data_row", [(source, row) for row in rows], indirect=True, ids=[f"row{row}" for row in rows])
+    else:
+        raise pytest.UsageError(f"{metafunc.definition.nodeid} is marked data_file but takes neither data_row nor data_rows")
+
+
+@pytest.fixture
+def data_row(request) -> dict:
+    """Provide one decoded row of the test's data file."""
+    (path, format, converters), row = request.param
+    return open_data_file(path, format, converters)[row]
+
+
+@pytest.fixture
+def data_rows(request) -> list:
+    """Provide a batch of decoded rows of the test's data file."""
+    (path, format, converters), rows = request.param
+    return list(open_data_file(path, format, converters).rows(rows.start, rows.stop))
@@ -0,0 +1,46 @@
+"""
+Test helpers shared by the unit test modules: canned responses, a fake session and config copies.
+"""
+
+import copy
+import io
+import json
+
+import requests
+
+
+def make_response(body=b'{"id": 1}', status_code: int = 200, headers: dict = None, stream: bool = False):
+    """Build a response around ``body`` (bytes or a JSON value), readable from ``raw`` when ``stream`` is set."""
+    if not isinstance(body, bytes):
+        body = json.dumps(body).encode()
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers.update(headers or {})
+    response.url = "https://example.test/posts/1"
+    response.encoding = "utf-8"
+    if stream:
+        response.raw = io.BytesIO(body)
+    else:
+        response._content = body
+    return response
+
+
+class FakeSession:
+    """Session stand-in returning queued responses, or a fresh default one when none are queued."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def request(self, method, url, headers=None, **kwargs):
+        self.calls.append((method, url, headers))
+        return self.responses.pop(0) if self.responses else make_response()
+
+
+def config_for(config, target, **settings):
+    """Copy the config pointed at ``target`` (a stub server or a base URL) with settings overridden."""
+    config = copy.copy(config)
+    config.BASE_URL = getattr(target, "url", target)
+    for name, value in settings.items():
+        setattr(config, name, value)
+    return config
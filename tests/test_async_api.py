@@ -0,0 +1,80 @@
+"""
+Tests for the async API clients.
+"""
+
+import asyncio
+
+import pytest
+from api import AsyncUserAPI, AsyncPostAPI, AsyncCommentAPI
+
+
+class TestAsyncAPI:
+    """Test suite for async API clients."""
+
+    @pytest.mark.smoke
+    def test_get_user(self, config):
+        """Test retrieving a user with the async client."""
+        async def run():
+            async with AsyncUserAPI(config) as api:
+                return await api.get_user(1)
+
+        response = asyncio.run(run())
+        assert response.status_code == 200
+        assert response.json()["id"] == 1
+
+    @pytest.mark.regression
+    def test_concurrent_get_posts(self, config):
+        """Test retrieving many posts concurrently."""
+        async def run():
+            async with AsyncPostAPI(config) as api:
+                return await asyncio.gather(*(api.get_post(post_id) for post_id in range(1, 21)))
+
+        responses = asyncio.run(run())
+        assert [response.status_code for response in responses] == [200] * 20
+        assert [response.json()["id"] for response in responses] == list(range(1, 21))
+
+    @pytest.mark.positive
+    def test_create_comment(self, config):
+        """Test creating a comment with the async client."""
+        comment_data = {
+            "postId": 1,
+            "name": "Async Comment",
+            "email": "async@example.com",
+            "body": "Created concurrently.",
+        }
+
+        async def run():
+            async with AsyncCommentAPI(config) as api:
+                return await api.create_comment(comment_data)
+
+        response = asyncio.run(run())
+        assert response.status_code == 201
+        assert response.json()["name"] == "Async Comment"
+
+
+class TestAsyncConnectionPool:
+    """Test suite for the shared async connection pool."""
+
+    def test_clients_share_pool_per_base_url(self, config):
+        """Test that clients for the same base URL share one pool."""
+        async def run():
+            user_api, post_api = AsyncUserAPI(config), AsyncPostAPI(config)
+            shared = user_api.pool is post_api.pool
+            await user_api.close()
+            still_open = not post_api.pool.client.is_closed
+            pool = post_api.pool
+            await post_api.close()
+            return shared, still_open, pool.client.is_closed
+
+        shared, still_open, closed = asyncio.run(run())
+        assert shared
+        assert still_open
+        assert closed
+
+    def test_in_flight_limit_from_config(self, config):
+        """Test that the in-flight limit comes from configuration."""
+        async def run():
+            async with AsyncUserAPI(config) as api:
+                return api.pool.semaphore._value
+
+        assert asyncio.run(run()) == config.MAX_IN_FLIGHT
@@ -0,0 +1,68 @@
+"""
+Tests for concurrent batch requests.
+"""
+
+import itertools
+import threading
+import time
+
+import pytest
+from api import UserAPI
+
+
+class TestBatch:
+    """Test suite for the batch fan-out machinery."""
+
+    def test_results_keep_input_order(self, user_api: UserAPI):
+        """Test that results come back in input order regardless of finish order."""
+        results = user_api.batch(lambda delay: time.sleep(delay) or delay, [0.03, 0.0, 0.02, 0.01])
+        assert [result.response for result in results] == [0.03, 0.0, 0.02, 0.01]
+
+    @pytest.mark.negative
+    def test_errors_are_captured_per_item(self, user_api: UserAPI):
+        """Test that a failing item does not abort the rest of the batch."""
+        def call(item):
+            if item == 2:
+                raise ValueError("boom")
+            return item
+
+        results = user_api.batch(call, [1, 2, 3])
+        assert [result.ok for result in results] == [True, False, True]
+        assert isinstance(results[1].error, ValueError)
+        assert results[1].status_code is None
+
+    def test_concurrency_is_bounded(self, user_api: UserAPI):
+        """Test that no more than the requested number of calls run at once."""
+        lock = threading.Lock()
+        active = peak = 0
+
+        def call(item):
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.01)
+            with lock:
+                active -= 1
+
+        user_api.batch(call, range(20), concurrency=4)
+        assert peak <= 4
+
+    def test_empty_batch(self, user_api: UserAPI):
+        """Test that an empty batch returns no results."""
+        assert user_api.batch(lambda item: item, []) == []
+
+    def test_iter_batch_pulls_items_lazily(self, user_api: UserAPI):
+        """Test that streamed batches keep order and read only a window of the input ahead."""
+        pulled = []
+
+        def items():
+            for item in itertools.count():
+                pulled.append(item)
+                yield item
+
+        results = user_api.iter_batch(lambda item: item * 2, items(), concurrency=4)
+        first = [result.response for result in itertools.islice(results, 10)]
+        assert first == [item * 2 for item in range(10)]
+        assert len(pulled) <= 10 + 4
+        results.close()
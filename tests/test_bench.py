@@ -0,0 +1,128 @@
+"""
+Tests for the client-layer benchmark suite.
+"""
+
+import json
+
+import pytest
+from api.models import Post
+from perf.bench import (
+    BENCHMARKS,
+    Result,
+    compare_runs,
+    find_run,
+    load_history,
+    main,
+    retained_size,
+    run_benchmarks,
+    save_run,
+)
+
+
+def make_run(commit: str, **medians) -> dict:
+    """Build a history entry with three samples around each median."""
+    return {
+        "commit": commit,
+        "dirty": False,
+        "time": "2026-01-01T00:00:00+00:00",
+        "python": "3.11",
+        "results": {
+            name: Result(name, [value * 0.95, value, value * 1.05]).to_dict() for name, value in medians.items()
+        },
+    }
+
+
+class TestBenchRun:
+    """Test suite for running benchmarks against the stub server."""
+
+    def test_quick_run(self, config):
+        """Test that a scaled-down run reports every sample of the selected benchmarks."""
+        results = run_benchmarks(["dispatch", "cache", "memory"], repeat=2, scale=0.01, config=config)
+        names = {result.name for result in results}
+        assert {"dispatch.get_post", "cache.fresh_hit", "memory.post_record"} <= names
+        assert not any(name.startswith("request.") for name in names)
+        timed = [result for result in results if result.unit == "us/op"]
+        assert all(len(result.samples) == 2 and result.median > 0 for result in timed)
+
+    def test_records_are_smaller(self, config):
+        """Test that records hold less memory than the dicts they were built from."""
+        results = {result.name: result.median for result in run_benchmarks(["memory"], config=config)}
+        assert results["memory.post_record"] < results["memory.post_dict"]
+        assert results["memory.comment_record"] < results["memory.comment_dict"]
+
+    def test_retained_size_counts_shared_objects_once(self):
+        """Test that a value shared between records is only counted once."""
+        body = "x" * 1000
+        one = retained_size([Post(1, 1, "t", body)])
+        two = retained_size([Post(1, 1, "t", body), Post(1, 2, "t", body)])
+        assert two - one < 1000
+
+    def test_registry(self):
+        """Test that every measured area has a benchmark."""
+        assert set(BENCHMARKS) == {"request", "dispatch", "decode", "cache", "batch", "async", "memory"}
+
+
+class TestBenchHistory:
+    """Test suite for the run history and regression comparison."""
+
+    def test_save_and_find(self, tmp_path):
+        """Test that runs are appended and found by index or commit prefix."""
+        path = str(tmp_path / "bench" / "history.jsonl")
+        save_run(path, [Result("dispatch.get_post", [10.0, 11.0])], commit="aaaa111")
+        save_run(path, [Result("dispatch.get_post", [12.0])], commit="bbbb222", dirty=True)
+        history = load_history(path)
+        assert [entry["commit"] for entry in history] == ["aaaa111", "bbbb222"]
+        assert find_run(history, "-1")["dirty"] is True
+        assert find_run(history, "aaaa")["results"]["dispatch.get_post"]["samples"] == [10.0, 11.0]
+        with pytest.raises(LookupError):
+            find_run(history, "cccc")
+
+    def test_numeric_commit_before_index(self, tmp_path):
+        """Test that an all-digit ref is matched as a commit prefix before it is read as an index."""
+        path = str(tmp_path / "history.jsonl")
+        for commit in ("1234567", "aaaa111", "bbbb222"):
+            save_run(path, [Result("dispatch.get_post", [10.0])], commit=commit)
+        history = load_history(path)
+        assert find_run(history, "1234567")["commit"] == "1234567"
+        assert find_run(history, "#1")["commit"] == "aaaa111"
+        assert find_run(history, "1")["commit"] == "aaaa111"
+        assert find_run(history, "#-1")["commit"] == "bbbb222"
+        with pytest.raises(LookupError):
+            find_run(history, "7654321")
+        with pytest.raises(LookupError):
+            find_run(history, "#5")
+
+    def test_compare_flags_regressions(self):
+        """Test that only a slowdown beyond the threshold and the noise is a regression."""
+        base = make_run("aaaa111", **{"decode.posts_json": 100.0, "cache.fresh_hit": 10.0, "batch.get_posts_100": 50.0})
+        head = make_run("bbbb222", **{"decode.posts_json": 150.0, "cache.fresh_hit": 11.0, "dispatch.get_post": 5.0})
+        comparisons = {item.name: item for item in compare_runs(base, head, threshold=0.2)}
+        assert set(comparisons) == {"decode.posts_json", "cache.fresh_hit"}
+        assert comparisons["decode.posts_json"].regressed
+        assert comparisons["decode.posts_json"].change == pytest.approx(0.5)
+        assert not comparisons["cache.fresh_hit"].regressed
+
+    def test_compare_overlapping_samples(self):
+        """Test that a slower median is not a regression while the best new sample beats the old median."""
+        base = make_run("aaaa111", **{"decode.posts_json": 100.0})
+        head = make_run("bbbb222", **{"decode.posts_json": 100.0})
+        head["results"]["decode.posts_json"]["samples"] = [90.0, 130.0, 140.0]
+        assert not compare_runs(base, head, threshold=0.2)[0].regressed
+
+    def test_compare_higher_is_better(self):
+        """Test that a drop is the regression for higher-is-better results."""
+        base = make_run("aaaa111", throughput=100.0)
+        head = make_run("bbbb222", throughput=50.0)
+        for run in (base, head):
+            run["results"]["throughput"]["higher_is_better"] = True
+        assert compare_runs(base, head, threshold=0.2)[0].regressed
+
+    def test_compare_command_exit_status(self, tmp_path, capsys):
+        """Test that the compare command exits non-zero on regressions."""
+        path = tmp_path / "history.jsonl"
+        runs = [make_run("aaaa111", **{"decode.posts_json": 100.0}), make_run("bbbb222", **{"decode.posts_json": 200.0})]
+        path.write_text("".join(json.dumps(run) + "\n" for run in runs))
+        assert main(["--history", str(path), "compare"]) == 1
+        assert "REGRESSION" in capsys.readouterr().out
+        assert main(["--history", str(path), "compare", "aaaa", "aaaa"]) == 0
+        assert main(["--history", str(path), "compare", "--threshold", "1.5"]) == 0
@@ -0,0 +1,166 @@
+"""
+Tests for the GET response cache.
+"""
+
+import time
+
+import pytest
+from api import PostAPI
+from api.cache import CacheEntry, DiskCache, MemoryCache, cache_key
+from api.metrics import MetricsRecorder
+from tests.conftest import FakeSession, make_response
+
+
+def make_client(config, session, cache=None) -> PostAPI:
+    """Build a PostAPI on a fake session, an in-memory cache and a private recorder."""
+    return PostAPI(config, session=session, cache=cache or MemoryCache(), metrics=MetricsRecorder())
+
+
+class TestResponseCache:
+    """Test suite for cached GET requests."""
+
+    def test_fresh_response_served_locally(self, config):
+        """Test that a fresh cached response needs no network call."""
+        session = FakeSession(make_response(headers={"Cache-Control": "max-age=60"}))
+        api = make_client(config, session)
+        first, second = api.get_post(1), api.get_post(1)
+        assert len(session.calls) == 1
+        assert not first.from_cache
+        assert second.from_cache
+        assert second.json() == {"id": 1}
+
+    def test_stale_response_revalidated(self, config):
+        """Test that a stale entry is revalidated with its ETag and reused on 304."""
+        session = FakeSession(
+            make_response(headers={"Cache-Control": "no-cache", "ETag": '"v1"'}),
+            make_response(status_code=304, body=b"", headers={"ETag": '"v1"'}),
+        )
+        api = make_client(config, session)
+        api.get_post(1)
+        response = api.get_post(1)
+        assert session.calls[1][2]["If-None-Match"] == '"v1"'
+        assert response.from_cache
+        assert response.status_code == 200
+        assert response.json() == {"id": 1}
+
+    def test_params_are_part_of_the_key(self, config):
+        """Test that param order does not matter but values do."""
+        assert cache_key("GET", "/posts", {"a": 1, "b": 2}) == cache_key("GET", "/posts", {"b": 2, "a": 1})
+        assert cache_key("GET", "/posts", {"a": 1}) != cache_key("GET", "/posts", {"a": 2})
+
+    @pytest.mark.negative
+    def test_no_store_not_cached(self, config):
+        """Test that no-store responses are never cached."""
+        session = FakeSession(
+            make_response(headers={"Cache-Control": "no-store, max-age=60"}),
+            make_response(headers={"Cache-Control": "no-store, max-age=60"}),
+        )
+        api = make_client(config, session)
+        api.get_post(1)
+        api.get_post(1)
+        assert len(session.calls) == 2
+
+    def test_write_invalidates_cached_get(self, config):
+        """Test that a write to a URL drops its cached GET."""
+        session = FakeSession(
+            make_response(headers={"Cache-Control": "max-age=60"}),
+            make_response(),
+            make_response(headers={"Cache-Control": "max-age=60"}),
+        )
+        api = make_client(config, session)
+        api.get_post(1)
+        api.delete_post(1)
+        assert not api.get_post(1).from_cache
+        assert len(session.calls) == 3
+
+    def test_clients_with_different_headers_do_not_share(self, config):
+        """Test that a response fetched with one client's headers is not served to a client with others."""
+        cache = MemoryCache()
+        session = FakeSession(
+            make_response(headers={"Cache-Control": "max-age=60", "Vary": "Authorization"}),
+            make_response(body=b'{"id": 2}', headers={"Cache-Control": "max-age=60", "Vary": "Authorization"}),
+        )
+        alice, bob = make_client(config, session, cache), make_client(config, session, cache)
+        alice.headers["Authorization"] = "Bearer alice"
+        bob.headers["Authorization"] = "Bearer bob"
+        assert alice.get_post(1).json() == {"id": 1}
+        assert not bob.get_post(1).from_cache
+        assert alice.get_post(1).from_cache
+        assert bob.get_post(1).json() == {"id": 2}
+        assert len(session.calls) == 2
+        assert cache_key("GET", "/posts", None, {"Accept": "a"}) != cache_key("GET", "/posts", None, {"Accept": "b"})
+        assert cache_key("GET", "/posts", headers={"Cache-Control": "no-cache"}) == cache_key("GET", "/posts")
+
+    def test_age_shortens_freshness(self, config):
+        """Test that time spent in upstream caches is subtracted from max-age."""
+        session = FakeSession(
+            make_response(headers={"Cache-Control": "max-age=60", "Age": "60", "ETag": '"v1"'}),
+            make_response(headers={"Cache-Control": "max-age=60"}),
+        )
+        api = make_client(config, session)
+        api.get_post(1)
+        assert not api.get_post(1).from_cache
+        assert len(session.calls) == 2
+
+    @pytest.mark.negative
+    def test_vary_star_not_cached(self, config):
+        """Test that a response varying on everything is not stored."""
+        session = FakeSession(
+            make_response(headers={"Cache-Control": "max-age=60", "Vary": "*"}),
+            make_response(headers={"Cache-Control": "max-age=60", "Vary": "*"}),
+        )
+        api = make_client(config, session)
+        api.get_post(1)
+        api.get_post(1)
+        assert len(session.calls) == 2
+
+
+class TestCacheBackends:
+    """Test suite for the cache storage backends."""
+
+    def make_entry(self, url: str = "https://example.test/posts/1") -> CacheEntry:
+        """Build a fresh entry with an ETag."""
+        return CacheEntry(url, 200, {"ETag": '"v1"'}, b"{}", "utf-8", fresh_until=time.time() + 60)
+
+    def test_memory_lru_eviction(self):
+        """Test that the least recently used entry is evicted first."""
+        cache = MemoryCache(maxsize=2)
+        cache.set("a", self.make_entry())
+        cache.set("b", self.make_entry())
+        cache.get("a")
+        cache.set("c", self.make_entry())
+        assert cache.get("a") is not None
+        assert cache.get("b") is None
+
+    def test_memory_ttl_eviction(self):
+        """Test that entries older than the TTL are dropped."""
+        cache = MemoryCache(ttl=10)
+        entry = self.make_entry()
+        entry.stored_at -= 11
+        cache.set("a", entry)
+        assert cache.get("a") is None
+
+    def test_disk_cache_shared_between_instances(self, tmp_path):
+        """Test that two disk caches on one file see each other's entries."""
+        path = str(tmp_path / "cache.sqlite")
+        DiskCache(path).set("a", self.make_entry())
+        entry = DiskCache(path).get("a")
+        assert entry.status_code == 200
+        assert entry.validators() == {"If-None-Match": '"v1"'}
+
+    def test_disk_cache_invalidate(self, tmp_path):
+        """Test that invalidating a URL drops its entries for every query string."""
+        cache = DiskCache(str(tmp_path / "cache.sqlite"))
+        cache.set(cache_key("GET", "https://example.test/posts", {"userId": 1}), self.make_entry())
+        cache.set(cache_key("GET", "https://example.test/posts/1"), self.make_entry())
+        cache.invalidate("https://example.test/posts")
+        assert cache.get(cache_key("GET", "https://example.test/posts", {"userId": 1})) is None
+        assert cache.get(cache_key("GET", "https://example.test/posts/1")) is not None
+
+    def test_disk_cache_lru_eviction(self, tmp_path):
+        """Test that the disk cache keeps at most ``maxsize`` entries."""
+        cache = DiskCache(str(tmp_path / "cache.sqlite"), maxsize=1)
+        cache.set("a", self.make_entry())
+        cache.set("b", self.make_entry())
+        assert cache.get("a") is None
+        assert cache.get("b") is not None
@@ -0,0 +1,190 @@
+"""
+Tests for per-host circuit breakers and adaptive concurrency limits.
+"""
+
+import asyncio
+import time
+
+import pytest
+import requests
+from api import AsyncPostAPI, PostAPI
+from api.circuit_breaker import CircuitBreaker, CircuitOpenError, get_circuit_breaker
+from api.concurrency import AdaptiveLimiter, get_concurrency_limiter
+from api.metrics import MetricsRecorder
+from perf.stub_server import StubServer, StubSettings
+from tests.conftest import config_for
+
+
+class TestCircuitBreaker:
+    """Test suite for the breaker state machine."""
+
+    def test_opens_after_consecutive_failures(self):
+        """Test that only consecutive failures trip the breaker."""
+        breaker = CircuitBreaker("http://x.test", failures=3, reset_timeout=60, statuses={503})
+        for status_code in (None, 503, 200, None, 503):
+            breaker.allow()
+            breaker.record(status_code)
+        assert breaker.state == CircuitBreaker.CLOSED
+        breaker.record(None)
+        assert breaker.state == CircuitBreaker.OPEN
+        with pytest.raises(CircuitOpenError) as error:
+            breaker.allow()
+        assert 59 < error.value.retry_in <= 60
+
+    def test_half_open_probe(self):
+        """Test that one probe is let through after the reset timeout."""
+        breaker = CircuitBreaker("http://x.test", failures=1, reset_timeout=0.05)
+        breaker.record(None)
+        time.sleep(0.06)
+        breaker.allow()
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.allow()
+        breaker.record(None)
+        assert breaker.state == CircuitBreaker.OPEN
+        time.sleep(0.06)
+        breaker.allow()
+        breaker.record(200)
+        assert breaker.state == CircuitBreaker.CLOSED
+        breaker.allow()
+
+    @pytest.mark.negative
+    def test_dead_host_fails_fast(self, config):
+        """Test that requests to a dead host stop waiting on connections once the circuit opens."""
+        with StubServer(StubSettings()) as server:
+            url = server.url
+        settings = config_for(config, url, CIRCUIT_FAILURES=3, CIRCUIT_RESET_TIMEOUT=60)
+        posts = PostAPI(settings, metrics=MetricsRecorder())
+        for _ in range(3):
+            with pytest.raises(requests.exceptions.ConnectionError):
+                posts.get_post(1)
+        with pytest.raises(CircuitOpenError):
+            posts.get_post(1)
+        with pytest.raises(CircuitOpenError):
+            asyncio.run(AsyncPostAPI(settings, metrics=MetricsRecorder()).get_post(1))
+
+    @pytest.mark.negative
+    def test_error_statuses_trip_and_recover(self, config):
+        """Test that configured statuses trip the breaker and a healthy probe closes it."""
+        with StubServer(StubSettings(error_rate=1.0)) as server:
+            settings = config_for(
+                config, server.url, CIRCUIT_FAILURES=2, CIRCUIT_RESET_TIMEOUT=0.05, CIRCUIT_STATUSES=[500]
+            )
+            posts = PostAPI(settings, metrics=MetricsRecorder())
+            assert [posts.get_post(1).status_code for _ in range(2)] == [500, 500]
+            with pytest.raises(CircuitOpenError):
+                posts.get_post(1)
+            server.settings.error_rate = 0.0
+            time.sleep(0.06)
+            assert posts.get_post(1).status_code == 200
+            assert get_circuit_breaker(settings, server.url).state == CircuitBreaker.CLOSED
+
+    @pytest.mark.negative
+    def test_cancelled_probe_is_released(self, config):
+        """Test that an async probe cancelled while waiting on the rate limiter does not leave the breaker half open."""
+        settings = config_for(
+            config, "http://probe.test", CIRCUIT_FAILURES=1, CIRCUIT_RESET_TIMEOUT=0.05, RATE_LIMIT=0.5, RATE_LIMIT_BURST=1
+        )
+        posts = AsyncPostAPI(settings, metrics=MetricsRecorder())
+        posts.rate_limiter.try_acquire()
+        posts.circuit_breaker.record(None)
+        time.sleep(0.06)
+        with pytest.raises(asyncio.TimeoutError):
+            asyncio.run(asyncio.wait_for(posts.get_post(1), 0.05))
+        assert posts.circuit_breaker.state == CircuitBreaker.OPEN
+        posts.circuit_breaker.allow()
+        assert posts.circuit_breaker.state == CircuitBreaker.HALF_OPEN
+
+    def test_off_when_disabled_or_replaying(self, config):
+        """Test that no breaker is used when disabled or in replay mode."""
+        disabled = config_for(config, "http://x.test", CIRCUIT_FAILURES=0)
+        replaying = config_for(config, "http://x.test", TRANSPORT_MODE="replay")
+        assert get_circuit_breaker(disabled, "http://x.test") is None
+        assert get_circuit_breaker(replaying, "http://x.test") is None
+
+
+class TestAdaptiveLimiter:
+    """Test suite for AIMD concurrency limits."""
+
+    def test_additive_increase_when_busy(self):
+        """Test that the limit grows up to its maximum while fully used."""
+        limiter = AdaptiveLimiter(initial=4, minimum=1, maximum=6)
+        for _ in range(20):
+            for _ in range(int(limiter.limit)):
+                assert limiter.try_acquire()
+            assert not limiter.try_acquire()
+            for _ in range(limiter.in_flight):
+                limiter.release(0.01, ok=True)
+        assert limiter.limit == 6
+
+    def test_no_increase_when_idle(self):
+        """Test that a mostly idle limiter does not grow."""
+        limiter = AdaptiveLimiter(initial=8, minimum=1, maximum=100)
+        for _ in range(100):
+            limiter.acquire()
+            limiter.release(0.01, ok=True)
+        assert limiter.limit == 8
+
+    def test_multiplicative_decrease_once_per_wave(self):
+        """Test that failures of one wave of requests cut the limit once."""
+        limiter = AdaptiveLimiter(initial=16, minimum=2, maximum=100)
+        for _ in range(16):
+            limiter.acquire()
+        time.sleep(0.02)
+        for _ in range(16):
+            limiter.release(0.02, ok=False)
+        assert limiter.limit == 8
+        for _ in range(5):
+            limiter.acquire()
+            time.sleep(0.002)
+            limiter.release(0.001, ok=False)
+        assert limiter.limit == 2
+
+    def test_slow_responses_are_congestion(self):
+        """Test that latency above the tolerance cuts the limit."""
+        limiter = AdaptiveLimiter(initial=10, minimum=1, maximum=100, tolerance=2.0)
+        limiter.acquire()
+        limiter.release(0.01, ok=True)
+        limiter.acquire()
+        limiter.release(0.015, ok=True)
+        assert limiter.limit == 10
+        limiter.acquire()
+        limiter.release(0.05, ok=True)
+        assert limiter.limit == 5
+
+    def test_batch_respects_limit(self, config):
+        """Test that batch calls through the client never exceed the host's limit."""
+        with StubServer(StubSettings(latency=0.01)) as server:
+            settings = config_for(
+                config, server.url, ADAPTIVE_CONCURRENCY=True, CONCURRENCY_INITIAL=4, CONCURRENCY_MAX=4
+            )
+            limiter = get_concurrency_limiter(settings, server.url)
+            peak = []
+            posts = PostAPI(settings, metrics=MetricsRecorder())
+            original = posts.session.request
+
+            def request(*args, **kwargs):
+                peak.append(limiter.in_flight)
+                return original(*args, **kwargs)
+
+            posts.session.request = request
+            results = posts.batch(posts.get_post, range(1, 41), concurrency=16)
+        assert all(result.status_code == 200 for result in results)
+        assert max(peak) <= 4
+        assert limiter.in_flight == 0
+
+    def test_async_clients_share_limit(self, config):
+        """Test that async requests wait for slots of the same limiter."""
+        with StubServer(StubSettings(latency=0.01)) as server:
+            settings = config_for(
+                config, server.url, ADAPTIVE_CONCURRENCY=True, CONCURRENCY_INITIAL=3, CONCURRENCY_MAX=3
+            )
+            limiter = get_concurrency_limiter(settings, server.url)
+
+            async def run():
+                async with AsyncPostAPI(settings, metrics=MetricsRecorder()) as api:
+                    return await asyncio.gather(*(api.get_post(post_id) for post_id in range(1, 21)))
+
+            responses = asyncio.run(run())
+        assert [response.status_code for response in responses] == [200] * 20
+        assert limiter.in_flight == 0
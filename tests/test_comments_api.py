@@ -3,7 +3,9 @@ Tests for Comment API endpoints.
 """
 
 import pytest
-from api import CommentAPI
+from api import CommentAPI, PostAPI, UserAPI
+from api.table import Table
+from schemas import COMMENT
 
 
 class TestCommentsAPI:
@@ -17,6 +19,12 @@ class TestCommentsAPI:
         assert isinstance(response.json(), list)
         assert len(response.json()) > 0
 
+    @pytest.mark.regression
+    def test_iter_comments_incremental(self, comment_api: CommentAPI):
+        """Test streaming all comments with incremental parsing."""
+        count = sum(1 for comment in comment_api.iter_comments(page_size=100, incremental=True))
+        assert count == len(comment_api.get_all_comments().json())
+
     @pytest.mark.smoke
     def test_get_comment_by_id(self, comment_api: CommentAPI):
         """Test retrieving a comment by ID."""
@@ -24,10 +32,7 @@ class TestCommentsAPI:
         assert response.status_code == 200
         comment = response.json()
         assert comment["id"] == 1
-        assert "postId" in comment
-        assert "name" in comment
-        assert "email" in comment
-        assert "body" in comment
+        COMMENT.assert_valid(comment)
 
     @pytest.mark.positive
     def test_create_comment(self, comment_api: CommentAPI):
@@ -75,11 +80,17 @@ class TestCommentsAPI:
         """Test retrieving comments for a specific post."""
         response = comment_api.get_comments_by_post(1)
         assert response.status_code == 200
-        comments = response.json()
-        assert isinstance(comments, list)
-        # All comments should belong to post 1
-        for comment in comments:
-            assert comment["postId"] == 1
+        COMMENT.where(postId=1).assert_valid_many(response.json())
+
+    @pytest.mark.regression
+    def test_referential_integrity(self, comment_api: CommentAPI, post_api: PostAPI, user_api: UserAPI):
+        """Test that every comment belongs to an existing post and every post to an existing user."""
+        comments = Table.from_response(comment_api.get_all_comments(), ["id", "postId"])
+        posts = Table.from_response(post_api.get_all_posts(), ["id", "userId"])
+        users = Table.from_response(user_api.get_all_users(), ["id"])
+        comments.assert_unique("id")
+        comments.assert_references("postId", posts)
+        posts.assert_references("userId", users)
 
     @pytest.mark.regression
     def test_get_comments_by_email(self, comment_api: CommentAPI):
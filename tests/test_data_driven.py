@@ -4,6 +4,23 @@ Data-driven test examples using Pytest parametrize.
 
 import pytest
 from api import UserAPI, PostAPI
+from config import get_config
+from schemas import POST
+from testdata import PayloadGenerator, TITLE_LENGTHS
+
+
+def pytest_generate_tests(metafunc):
+    """Parametrize the generated suites from the configuration of the selected ``--env``."""
+    settings = get_config(metafunc.config.getoption("--env"))
+    generator = PayloadGenerator(settings.TEST_DATA_SEED)
+    # Generated suites are parametrized by case index only; each test builds its own
+    # payload, so TEST_DATA_CASES can be raised to 100k without holding the payloads.
+    if "index" in metafunc.fixturenames:
+        metafunc.parametrize("index", range(settings.TEST_DATA_CASES))
+    elif "title_case" in metafunc.fixturenames:
+        metafunc.parametrize("title_case", generator.title_lengths(TITLE_LENGTHS), ids=str)
+    elif "email_case" in metafunc.fixturenames:
+        metafunc.parametrize("email_case", generator.malformed_emails(extra=5), ids=str)
 
 
 class TestDataDrivenUsers:
@@ -23,6 +40,14 @@ class TestDataDrivenUsers:
         response = user_api.get_user(user_id)
         assert response.status_code == expected_status
 
+    @pytest.mark.data_driven
+    def test_get_users_batch(self, user_api: UserAPI):
+        """Test retrieving many users in one concurrent batch."""
+        user_ids = [1, 2, 5, 10, 99999, 0]
+        results = user_api.get_users(user_ids)
+        assert [result.item for result in results] == user_ids
+        assert [result.status_code for result in results] == [200, 200, 200, 200, 404, 404]
+
     @pytest.mark.data_driven
     @pytest.mark.parametrize("user_data", [
         {
@@ -67,6 +92,13 @@ class TestDataDrivenPosts:
         response = post_api.get_post(post_id)
         assert response.status_code == expected_status
 
+    @pytest.mark.data_driven
+    def test_get_posts_batch(self, post_api: PostAPI):
+        """Test retrieving many posts in one concurrent batch."""
+        results = post_api.get_posts(range(1, 101))
+        assert all(result.ok for result in results)
+        assert [result.response.json()["id"] for result in results] == list(range(1, 101))
+
     @pytest.mark.data_driven
     @pytest.mark.parametrize("post_data", [
         {
@@ -93,6 +125,19 @@ class TestDataDrivenPosts:
         assert created_post["title"] == post_data["title"]
         assert created_post["userId"] == post_data["userId"]
 
+    @pytest.mark.data_driven
+    def test_create_posts_batch(self, post_api: PostAPI):
+        """Test creating many posts in one concurrent batch."""
+        posts_data = [
+            {"title": f"Batch Post {index}", "body": "Created in a batch.", "userId": 1}
+            for index in range(10)
+        ]
+        results = post_api.create_posts(posts_data)
+        assert [result.status_code for result in results] == [201] * 10
+        assert [result.response.json()["title"] for result in results] == [
+            post["title"] for post in posts_data
+        ]
+
     @pytest.mark.data_driven
     @pytest.mark.parametrize("user_id,expected_post_count", [
         (1, 10),
@@ -106,8 +151,7 @@ class TestDataDrivenPosts:
         assert response.status_code == 200
         posts = response.json()
         assert len(posts) == expected_post_count
-        for post in posts:
-            assert post["userId"] == user_id
+        POST.where(userId=user_id).assert_valid_many(posts)
 
 
 class TestDataDrivenValidation:
@@ -145,3 +189,66 @@ class TestDataDrivenValidation:
         assert response.status_code == 201
         created_post = response.json()
         assert len(created_post["title"]) == title_length
+
+
+class TestGeneratedPayloads:
+    """Data-driven tests over seeded, generated payloads."""
+
+    @pytest.mark.data_driven
+    def test_create_generated_users(self, config, user_api: UserAPI, payload_generator: PayloadGenerator, index: int):
+        """Test creating generated valid and invalid users."""
+        case = payload_generator.case("user", index, config.TEST_DATA_INVALID_RATIO)
+        response = user_api.create_user(case.payload)
+        if case.valid:
+            assert response.status_code == 201, case.id
+            assert response.json()["email"] == case.payload["email"]
+        else:
+            # API may accept or reject, but we validate response is valid
+            assert response.status_code in [201, 400], case.id
+
+    @pytest.mark.data_driven
+    def test_create_generated_posts(self, config, post_api: PostAPI, payload_generator: PayloadGenerator, index: int):
+        """Test creating generated valid and invalid posts."""
+        case = payload_generator.case("post", index, config.TEST_DATA_INVALID_RATIO)
+        response = post_api.create_post(case.payload)
+        assert response.status_code in ([201] if case.valid else [201, 400]), case.id
+
+    @pytest.mark.data_driven
+    def test_create_post_generated_title_lengths(self, post_api: PostAPI, title_case):
+        """Test creating posts with boundary title lengths."""
+        response = post_api.create_post(title_case.payload)
+        assert response.status_code == 201
+        assert response.json()["title"] == title_case.payload["title"]
+
+    @pytest.mark.data_driven
+    def test_create_user_generated_invalid_emails(self, user_api: UserAPI, email_case):
+        """Test creating users with known and generated malformed emails."""
+        response = user_api.create_user(email_case.payload)
+        assert response.status_code in [201, 400]
+
+    @pytest.mark.data_driven
+    def test_create_posts_streamed(self, config, post_api: PostAPI, payload_generator: PayloadGenerator):
+        """Test streaming generated posts through the batch client."""
+        payloads = payload_generator.payloads("post", config.TEST_DATA_CASES * 10)
+        statuses = [result.status_code for result in post_api.iter_batch(post_api.create_post, payloads)]
+        assert statuses == [201] * (config.TEST_DATA_CASES * 10)
+
+
+class TestDataFileDriven:
+    """Data-driven tests read lazily from data files."""
+
+    @pytest.mark.data_driven
+    @pytest.mark.data_file("fixtures/users.csv")
+    def test_create_users_from_csv(self, user_api: UserAPI, data_row: dict):
+        """Test creating one user per CSV row."""
+        response = user_api.create_user(data_row)
+        assert response.status_code == 201
+        assert response.json()["username"] == data_row["username"]
+
+    @pytest.mark.data_driven
+    @pytest.mark.data_file("fixtures/posts.jsonl", batch=25)
+    def test_create_posts_from_jsonl(self, post_api: PostAPI, data_rows: list):
+        """Test creating a batch of JSONL rows per test through the batch client."""
+        results = post_api.create_posts(data_rows)
+        assert [result.status_code for result in results] == [201] * len(data_rows)
+        assert [result.response.json()["title"] for result in results] == [row["title"] for row in data_rows]
@@ -0,0 +1,126 @@
+"""
+Tests for memory-mapped data files and data-file parametrization.
+"""
+
+import json
+import os
+import time
+
+import pytest
+from testdata.files import DataFile, chunk_range, parse_shard, shard_range
+
+pytest_plugins = ["pytester"]
+
+
+@pytest.fixture
+def jsonl_file(tmp_path):
+    """Write a JSONL file of 200k rows."""
+    path = tmp_path / "posts.jsonl"
+    with open(path, "w") as file:
+        file.writelines(json.dumps({"id": index, "title": f"post {index}"}) + "\n" for index in range(200_000))
+    return path
+
+
+class TestDataFile:
+    """Test suite for DataFile."""
+
+    def test_jsonl_random_access(self, jsonl_file):
+        """Test that rows decode on demand by index."""
+        with DataFile(jsonl_file) as data:
+            assert len(data) == 200_000
+            assert data[0] == {"id": 0, "title": "post 0"}
+            assert data[123_456]["id"] == 123_456
+            assert data[-1]["id"] == 199_999
+            assert [row["id"] for row in data.rows(10, 13)] == [10, 11, 12]
+            with pytest.raises(IndexError):
+                data[200_000]
+
+    def test_index_is_saved_and_reused(self, jsonl_file):
+        """Test that the offset index is cached next to the file and rebuilt when the file changes."""
+        DataFile(jsonl_file).close()
+        assert os.path.exists(f"{jsonl_file}.idx")
+        started = time.perf_counter()
+        with DataFile(jsonl_file) as data:
+            assert len(data) == 200_000
+        assert time.perf_counter() - started < 0.1
+        with open(jsonl_file, "a") as file:
+            file.write('{"id": "last"}')
+        os.utime(jsonl_file, ns=(0, 0))
+        with DataFile(jsonl_file) as data:
+            assert len(data) == 200_001
+            assert data[-1] == {"id": "last"}
+
+    def test_csv_rows(self, tmp_path):
+        """Test CSV headers, quoting, CRLF endings and converters."""
+        path = tmp_path / "users.csv"
+        path.write_bytes(b'id,name,email\n1,"Smith, Ann",ann@example.com\r\n2,Bob,bob@example.com')
+        with DataFile(path, converters={"id": int}, cache_index=False) as data:
+            assert data.header == ["id", "name", "email"]
+            assert list(data) == [
+                {"id": 1, "name": "Smith, Ann", "email": "ann@example.com"},
+                {"id": 2, "name": "Bob", "email": "bob@example.com"},
+            ]
+        empty = tmp_path / "empty.jsonl"
+        empty.write_bytes(b"")
+        assert len(DataFile(empty)) == 0
+
+    @pytest.mark.negative
+    def test_unknown_format(self, tmp_path):
+        """Test that files of unknown format are refused."""
+        path = tmp_path / "data.txt"
+        path.write_text("x\n")
+        with pytest.raises(ValueError):
+            DataFile(path)
+
+    def test_shards_and_chunks(self):
+        """Test that shards are contiguous, disjoint and cover every row."""
+        shards = [shard_range(10, shard, 3) for shard in (1, 2, 3)]
+        assert shards == [range(0, 3), range(3, 6), range(6, 10)]
+        assert chunk_range(range(3, 10), 3) == [range(3, 6), range(6, 9), range(9, 10)]
+        assert parse_shard("2/8") == (2, 8)
+        with pytest.raises(ValueError):
+            parse_shard("9/8")
+
+
+class TestDataFilePlugin:
+    """Test suite for the data_file marker."""
+
+    @pytest.fixture
+    def suite(self, pytester):
+        """Write a JSONL file and a test module parametrized from it."""
+        with open(pytester.path / "rows.jsonl", "w") as file:
+            file.writelines(json.dumps({"n": index}) + "\n" for index in range(10))
+        pytester.makeconftest('pytest_plugins = ["testdata.plugin"]')
+        pytester.makepyfile(
+            """
+            import pytest
+
+            @pytest.mark.data_file("rows.jsonl")
+            def test_row(data_row):
+                assert data_row["n"] < 10
+
+            @pytest.mark.data_file("rows.jsonl", batch=4)
+            def test_rows(data_rows):
+                assert 1 <= len(data_rows) <= 4
+            """
+        )
+        return pytester
+
+    def test_rows_and_batches(self, suite):
+        """Test one item per row and one per batch."""
+        result = suite.runpytest("-p", "no:cacheprovider", "-q")
+        result.assert_outcomes(passed=10 + 3)
+        assert "test_row[row9]" in "\n".join(suite.runpytest("--collect-only", "-q").outlines)
+
+    def test_sharding(self, suite):
+        """Test that a shard collects only its block of rows."""
+        collected = suite.runpytest("--collect-only", "-q", "--data-shard=2/2").outlines
+        ids = [line for line in collected if "::" in line]
+        assert [line.split("[")[1] for line in ids if "test_row[" in line] == [f"row{n}]" for n in range(5, 10)]
+        assert [line.split("[")[1] for line in ids if "test_rows[" in line] == ["rows5-8]", "rows9-9]"]
+
+    def test_many_rows_warn(self, suite, monkeypatch):
+        """Test that a data_row test over many rows warns at collection."""
+        monkeypatch.setattr("testdata.plugin.ROW_ITEMS_WARNING", 5)
+        result = suite.runpytest("--collect-only", "-q")
+        result.stdout.fnmatch_lines(["*data_row collects 10 items*batch=N*"])
@@ -0,0 +1,136 @@
+"""
+Tests for the declarative endpoint registry and the generated client methods.
+"""
+
+import asyncio
+import copy
+import inspect
+
+import pytest
+from api import AsyncCommentAPI, BaseAPIClient, CommentAPI, PostAPI, UserAPI
+from api.async_resource_api import async_client_class
+from api.endpoints import RESOURCES, Endpoint, Resource, register
+from api.metrics import MetricsRecorder
+from api.resource_api import client_class
+from perf.stub_server import StubServer, StubSettings
+
+
+@pytest.fixture
+def scratch_resource():
+    """Register a read-only variant of the todos resource, restoring the original afterwards."""
+    original = RESOURCES["todos"]
+    yield register(Resource(
+        "todos", "task", methods=("list", "get"), headers=(("X-Resource", "task"),),
+        extra=(Endpoint("get_first_todos", "GET", "/todos", query=(("limit", "_limit"),), doc="Get the first todos."),),
+    ))
+    register(original)
+
+
+class TestEndpointRegistry:
+    """Test suite for expanding resources into endpoints."""
+
+    def test_standard_endpoints(self):
+        """Test that a resource expands into CRUD, nested and filtered endpoints."""
+        endpoints = {endpoint.name: endpoint for endpoint in RESOURCES["posts"].endpoints()}
+        assert endpoints["get_post"].path == "/posts/{post_id}"
+        assert endpoints["get_post"].template == "/posts/{id}"
+        assert endpoints["update_post"].arguments == ("post_id", "post_data")
+        assert endpoints["get_post_comments"].template == "/posts/{id}/comments"
+        assert endpoints["get_posts_by_user"].query == (("user_id", "userId"),)
+        assert endpoints["get_posts_by_user"].fetch_name == "fetch_posts_by_user"
+        assert endpoints["get_all_posts"].fetch_name == "fetch_posts"
+        assert endpoints["create_post"].fetch_name is None
+
+    def test_methods_limit_endpoints(self):
+        """Test that only the listed methods are generated."""
+        assert not hasattr(CommentAPI, "patch_comment")
+        assert not hasattr(AsyncCommentAPI, "patch_comment")
+        assert hasattr(CommentAPI, "update_comment")
+
+    def test_generated_signatures_and_docs(self):
+        """Test that generated methods have named arguments, docstrings and qualified names."""
+        assert list(inspect.signature(PostAPI.update_post).parameters) == ["self", "post_id", "post_data"]
+        assert list(inspect.signature(UserAPI.get_users).parameters) == ["self", "user_ids", "concurrency"]
+        assert PostAPI.get_post.__doc__ == "Get a post by ID."
+        assert PostAPI.fetch_post.__doc__ == "Get a post by ID as a ``Post`` record."
+        assert PostAPI.get_post.__qualname__ == "PostAPI.get_post"
+        assert inspect.iscoroutinefunction(AsyncCommentAPI.get_comments_by_email)
+
+    def test_class_methods_take_precedence(self):
+        """Test that a method written on the class is not replaced by a generated one."""
+
+        class CustomPostAPI(BaseAPIClient):
+            resource = "posts"
+
+            def get_post(self, post_id: int):
+                """Get a post through a custom route."""
+                return post_id
+
+        assert CustomPostAPI.get_post.__doc__ == "Get a post through a custom route."
+        assert CustomPostAPI.fetch_post.__qualname__.endswith("CustomPostAPI.fetch_post")
+
+    def test_unknown_resource(self):
+        """Test that naming an unregistered resource fails when the class is defined."""
+        with pytest.raises(ValueError, match="Unknown resource"):
+            type("MissingAPI", (BaseAPIClient,), {"resource": "missing"})
+
+
+class TestGeneratedClients:
+    """Test suite for generated methods sharing the client machinery."""
+
+    @pytest.fixture(scope="class")
+    def server(self):
+        """Run a small stub server."""
+        with StubServer(StubSettings(users=3, posts_per_user=4)) as server:
+            yield server
+
+    @pytest.fixture
+    def stub(self, config, server):
+        """Point a copy of the config at the stub server."""
+        settings = copy.copy(config)
+        settings.BASE_URL = server.url
+        return settings
+
+    def test_metrics_use_precompiled_templates(self, stub):
+        """Test that generated calls are recorded under their endpoint templates."""
+        metrics = MetricsRecorder()
+        client = UserAPI(stub, metrics=metrics)
+        client.get_user(2)
+        client.get_user_todos(3)
+        client.update_user(1, {"name": "x"})
+        assert set(metrics.endpoints) == {"GET /users/{id}", "GET /users/{id}/todos", "PUT /users/{id}"}
+
+    def test_cache_serves_generated_gets(self, stub):
+        """Test that generated GETs go through the response cache."""
+        from api.cache import MemoryCache
+
+        client = PostAPI(stub, cache=MemoryCache(16, 60), metrics=MetricsRecorder())
+        assert client.get_post(1).from_cache is False
+        assert client.get_post(1).from_cache is True
+        assert client.fetch_post(1).id == 1
+
+    def test_registered_resource_client(self, stub, server, scratch_resource):
+        """Test a client generated on demand, with the resource's default headers."""
+        cls = client_class("todos")
+        assert cls is client_class("todos") and cls.__name__ == "TaskAPI"
+        client = cls(stub, metrics=MetricsRecorder())
+        seen = []
+        request = client.session.request
+        client.session.request = lambda method, url, headers=None, **kwargs: seen.append(headers) or request(
+            method, url, headers=headers, **kwargs
+        )
+        assert client.get_task(2).json()["id"] == 2
+        assert len(client.get_first_todos(3).json()) == 3
+        assert seen == [{"X-Resource": "task"}, {"X-Resource": "task"}]
+        assert not hasattr(cls, "create_task") and not hasattr(cls, "fetch_todos")
+
+    def test_async_batch(self, stub):
+        """Test that async clients get batch methods that keep input order."""
+
+        async def run():
+            async with async_client_class("todos")(stub, metrics=MetricsRecorder()) as client:
+                return await client.get_todos([5, 2, 9], concurrency=2)
+
+        results = asyncio.run(run())
+        assert [result.response.json()["id"] for result in results] == [5, 2, 9]
+        assert all(result.ok for result in results)
@@ -0,0 +1,130 @@
+"""
+Tests for the load runner.
+"""
+
+import asyncio
+import time
+
+import pytest
+from perf.load_runner import LoadRunner, Scenario, percentile
+
+
+class FakeResponse:
+    """Response stand-in with a status code."""
+
+    def __init__(self, status_code: int):
+        self.status_code = status_code
+
+
+def sleep_then(status_code: int, delay: float = 0.005):
+    """Build a blocking call that sleeps and returns a status code."""
+    def call():
+        time.sleep(delay)
+        return FakeResponse(status_code)
+    return call
+
+
+def async_sleep_then(status_code: int, delay: float = 0.005):
+    """Build an async call that sleeps and returns a status code."""
+    async def call():
+        await asyncio.sleep(delay)
+        return FakeResponse(status_code)
+    return call
+
+
+class TestLoadRunner:
+    """Test suite for closed and open workloads."""
+
+    def test_closed_model_threads(self):
+        """Test that virtual users run scenarios until the duration ends."""
+        report = LoadRunner([Scenario("ok", sleep_then(200))], users=4, duration=0.2).run()
+        assert report.requests > 20
+        assert report.error_rate == 0
+        assert report.summary("ok")["p50_ms"] >= 5
+
+    def test_open_model_threads(self):
+        """Test that the open model issues requests at the configured rate."""
+        report = LoadRunner([Scenario("ok", sleep_then(200))], rate=100, duration=0.5).run()
+        assert 40 <= report.requests <= 60
+
+    def test_open_model_ramps_up_gradually(self):
+        """Test that arrivals during the ramp-up are spread over it and get denser over time."""
+        runner = LoadRunner([], rate=100, duration=5, ramp_up=2)
+        arrivals = [runner._arrival(0.0, index) for index in range(102)]
+        gaps = [later - earlier for earlier, later in zip(arrivals, arrivals[1:])]
+        assert arrivals[1] < 0.25
+        assert sum(1 for arrival in arrivals if arrival < 1.0) == pytest.approx(25, abs=1)
+        assert all(later <= earlier for earlier, later in zip(gaps, gaps[1:]))
+        assert arrivals[100] == pytest.approx(2.0)
+        assert gaps[100] == pytest.approx(0.01)
+
+    def test_seed_repeats_scenario_arguments(self):
+        """Test that a seed makes the scenarios' random arguments repeatable."""
+        def drawn(mode):
+            seen = []
+
+            def record(rng):
+                seen.append(rng.randint(1, 1000))
+                return FakeResponse(200) if mode == "thread" else asyncio.sleep(0, FakeResponse(200))
+
+            LoadRunner([Scenario("draw", record)], users=1, duration=0.05, think_time=0.01, mode=mode, seed=3).run()
+            return seen
+
+        first, second = drawn("thread"), drawn("thread")
+        assert first[:3] == second[:3]
+        assert drawn("async")[:3] == first[:3]
+
+    def test_closed_model_async(self):
+        """Test that async scenarios run concurrently on one event loop."""
+        report = LoadRunner(
+            [Scenario("ok", async_sleep_then(200, delay=0.05))], users=50, duration=0.2, mode="async"
+        ).run()
+        assert report.requests >= 150
+
+    def test_open_model_async(self):
+        """Test that the async open model issues requests at the configured rate."""
+        report = LoadRunner(
+            [Scenario("ok", async_sleep_then(200))], rate=100, duration=0.5, mode="async"
+        ).run()
+        assert 40 <= report.requests <= 60
+
+    def test_weighted_scenarios_and_errors(self):
+        """Test that weights pick scenarios and failures count as errors."""
+        def boom():
+            raise ConnectionError("down")
+
+        scenarios = [
+            Scenario("ok", sleep_then(200, delay=0.001), weight=8),
+            Scenario("not_found", sleep_then(404, delay=0.001), weight=1),
+            Scenario("boom", boom, weight=1),
+        ]
+        report = LoadRunner(scenarios, users=2, duration=0.3, seed=7).run()
+        assert report.latencies["ok"] and report.latencies["not_found"] and report.latencies["boom"]
+        assert len(report.latencies["ok"]) > len(report.latencies["not_found"])
+        assert report.errors["not_found"] == len(report.latencies["not_found"])
+        assert report.errors["boom"] == len(report.latencies["boom"])
+        assert "ok" not in report.errors
+
+    def test_report_format(self):
+        """Test that the report renders a row per scenario and a total."""
+        report = LoadRunner([Scenario("ok", sleep_then(200))], users=1, duration=0.05).run()
+        text = report.format()
+        assert "ok" in text
+        assert "TOTAL" in text
+        assert report.to_dict()["total"]["requests"] == report.requests
+
+    @pytest.mark.negative
+    def test_requires_one_workload_model(self):
+        """Test that exactly one of users or rate must be given."""
+        with pytest.raises(ValueError):
+            LoadRunner([], users=1, rate=1)
+        with pytest.raises(ValueError):
+            LoadRunner([])
+
+    def test_percentile(self):
+        """Test nearest-rank percentiles."""
+        values = list(range(1, 101))
+        assert percentile(values, 50) == 50
+        assert percentile(values, 99) == 99
+        assert percentile(values, 100) == 100
+        assert percentile([], 50) == 0.0
@@ -0,0 +1,140 @@
+"""
+Tests for request latency instrumentation.
+"""
+
+import json
+import random
+import socket
+
+import pytest
+from api import PostAPI
+from api.histogram import LatencyHistogram
+from api.metrics import MetricsRecorder, RequestSample, TimedHTTPConnection, endpoint_template, start_phases
+from perf.stub_server import StubServer
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+from tests.conftest import FakeSession
+
+
+class TestLatencyHistogram:
+    """Test suite for the compact latency histogram."""
+
+    def test_percentiles_within_precision(self):
+        """Test that percentiles stay within the histogram's relative error."""
+        rng = random.Random(1)
+        values = sorted(rng.uniform(0.001, 2.0) for _ in range(10000))
+        histogram = LatencyHistogram()
+        for value in values:
+            histogram.record(value)
+        for percent in (50, 95, 99):
+            exact = values[int(percent / 100 * len(values)) - 1] * 1000
+            assert histogram.percentile(percent) == pytest.approx(exact, rel=0.02)
+        assert histogram.percentile(100) == pytest.approx(values[-1] * 1000, rel=0.001)
+
+    def test_memory_bounded_by_buckets(self):
+        """Test that storage grows with distinct buckets, not samples."""
+        histogram = LatencyHistogram()
+        for _ in range(50000):
+            histogram.record(0.0123)
+        assert len(histogram.counts) == 1
+        assert histogram.count == 50000
+
+    def test_merge_and_round_trip(self):
+        """Test merging histograms and rebuilding one from a dict."""
+        first, second = LatencyHistogram(), LatencyHistogram()
+        first.record(0.010)
+        second.record(0.200)
+        first.merge(second)
+        restored = LatencyHistogram.from_dict(json.loads(json.dumps(first.to_dict())))
+        assert restored.count == 2
+        assert restored.percentile(100) == first.percentile(100)
+
+    def test_empty_histogram(self):
+        """Test that an empty histogram reports zeros."""
+        assert LatencyHistogram().summary()["p99_ms"] == 0.0
+
+
+class TestMetricsRecorder:
+    """Test suite for per-endpoint metrics."""
+
+    @pytest.mark.parametrize("endpoint,template", [
+        ("/posts/17", "/posts/{id}"),
+        ("/posts/17/comments", "/posts/{id}/comments"),
+        ("/posts/-1", "/posts/{id}"),
+        ("/comments", "/comments"),
+    ])
+    def test_endpoint_template(self, endpoint: str, template: str):
+        """Test that numeric path segments collapse into a template."""
+        assert endpoint_template(endpoint) == template
+
+    def test_client_records_per_template(self, config):
+        """Test that client calls are aggregated per endpoint template."""
+        metrics = MetricsRecorder()
+        api = PostAPI(config, session=FakeSession(), metrics=metrics)
+        for post_id in (1, 2, 3):
+            api.get_post(post_id)
+        summary = metrics.summary()
+        assert list(summary) == ["GET /posts/{id}"]
+        assert summary["GET /posts/{id}"]["count"] == 3
+        assert summary["GET /posts/{id}"]["response_bytes"] == 27
+        assert summary["GET /posts/{id}"]["statuses"] == {"200": 3}
+
+    def test_hooks_receive_samples(self):
+        """Test that hooks see every recorded sample."""
+        metrics = MetricsRecorder()
+        seen = []
+        metrics.add_hook(seen.append)
+        metrics.record(RequestSample("GET", "/users/{id}", 200, 0.01))
+        assert [sample.key for sample in seen] == ["GET /users/{id}"]
+
+    def test_dump_json(self, tmp_path):
+        """Test that metrics are written as JSON."""
+        metrics = MetricsRecorder()
+        metrics.record(RequestSample("GET", "/users", 200, 0.05, ttfb=0.04))
+        path = tmp_path / "metrics.json"
+        metrics.dump_json(str(path))
+        data = json.loads(path.read_text())
+        assert data["GET /users"]["total"]["p50_ms"] == pytest.approx(50, rel=0.02)
+        assert "ttfb" in data["GET /users"]
+
+
+class TestConnectionTiming:
+    """Test suite for the timed urllib3 connections."""
+
+    def test_phases_recorded(self):
+        """Test that a connection times DNS resolution and the TCP connect."""
+        with StubServer() as server:
+            phases = start_phases()
+            connection = TimedHTTPConnection("localhost", server.port)
+            connection.connect()
+            connection.close()
+        assert phases["dns"] >= 0 and phases["connect"] >= 0
+
+    @pytest.mark.negative
+    def test_refused_connect_resolves_once(self, monkeypatch):
+        """Test that a refused connection is not retried with a second lookup."""
+        with StubServer() as server:
+            port = server.port
+        lookups = []
+        resolve = socket.getaddrinfo
+        monkeypatch.setattr(
+            socket, "getaddrinfo", lambda *args, **kwargs: lookups.append(args) or resolve(*args, **kwargs)
+        )
+        phases = start_phases()
+        with pytest.raises(NewConnectionError):
+            TimedHTTPConnection("localhost", port).connect()
+        assert len(lookups) == 1
+        assert "dns" in phases and "connect" in phases
+
+    @pytest.mark.negative
+    def test_connect_timeout_attempted_once(self, monkeypatch):
+        """Test that a connect timeout is raised after a single attempt."""
+        attempts = []
+
+        def time_out(self, addresses):
+            attempts.append(addresses)
+            raise socket.timeout("timed out")
+
+        monkeypatch.setattr(TimedHTTPConnection, "_connect_first", time_out)
+        with pytest.raises(ConnectTimeoutError):
+            TimedHTTPConnection("localhost", 9, timeout=0.1).connect()
+        assert len(attempts) == 1
@@ -0,0 +1,114 @@
+"""
+Tests for the slotted resource records.
+"""
+
+import copy
+import json
+import tracemalloc
+
+import pytest
+import requests
+from api import CommentAPI, PostAPI, UserAPI
+from api.models import Address, Album, Comment, Photo, Post, Todo, User
+from perf.stub_server import StubServer, StubSettings, build_dataset
+
+
+@pytest.fixture(scope="module")
+def dataset():
+    """Build a stub dataset shaped like JSONPlaceholder's."""
+    return build_dataset(StubSettings(users=5, posts_per_user=4, comments_per_post=3))
+
+
+def traced_size(build) -> int:
+    """Measure the memory held by the object ``build`` returns."""
+    tracemalloc.start()
+    try:
+        kept = build()
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del kept
+    return size
+
+
+class TestRecords:
+    """Test suite for building and reading records."""
+
+    def test_round_trip(self, dataset):
+        """Test that every resource converts back to the same dict."""
+        resources = [(User, "users"), (Post, "posts"), (Comment, "comments"), (Todo, "todos"), (Album, "albums"), (Photo, "photos")]
+        for model, name in resources:
+            records = model.from_list(dataset[name])
+            assert [record.to_dict() for record in records] == dataset[name]
+            assert records[0] == model.from_dict(dataset[name][0])
+
+    def test_json_keys_and_attributes(self, dataset):
+        """Test that records answer both JSON keys and snake_case attributes."""
+        post = Post.from_dict(dataset["posts"][5])
+        assert post.user_id == post["userId"] == 2
+        assert "userId" in post and "user_id" not in post
+        with pytest.raises(KeyError):
+            post["missing"]
+        with pytest.raises(AttributeError):
+            post.extra = 1
+
+    def test_missing_keys_become_none(self):
+        """Test that partial objects still build."""
+        posts = Post.from_list([{"id": 1, "userId": 1, "title": "t", "body": "b"}, {"id": 2}])
+        assert posts[1].title is None and posts[1].id == 2
+
+    def test_nested_objects_decode_lazily(self, dataset):
+        """Test that address and company stay packed until first read."""
+        user = User.from_dict(dataset["users"][0])
+        assert type(user._address) is tuple and type(user._company) is tuple
+        assert isinstance(user.address, Address)
+        assert user.address is user.address
+        assert user["address"]["geo"]["lat"] == dataset["users"][0]["address"]["geo"]["lat"]
+        assert user.company.catch_phrase == dataset["users"][0]["company"]["catchPhrase"]
+
+    def test_repeated_strings_are_interned(self):
+        """Test that equal emails share one string object."""
+        first, second = Comment.from_list([
+            {"postId": 1, "id": 1, "name": "a", "email": "".join(["x@", "example.test"]), "body": ""},
+            {"postId": 1, "id": 2, "name": "b", "email": "".join(["x@", "example.test"]), "body": ""},
+        ])
+        assert first.email is second.email
+
+    def test_records_use_less_memory_than_dicts(self):
+        """Test that records of a large response take clearly less memory than the dicts."""
+        data = build_dataset(StubSettings(users=10, posts_per_user=20, comments_per_post=25))
+        payload = json.dumps(data["comments"])
+        dicts = traced_size(lambda: json.loads(payload))
+        records = traced_size(lambda: Comment.from_list(json.loads(payload)))
+        assert records < dicts * 0.8
+
+
+class TestClientRecords:
+    """Test suite for the clients' record-returning methods."""
+
+    @pytest.fixture
+    def clients(self, config):
+        """Point user, post and comment clients at a stub server."""
+        with StubServer(StubSettings(users=3, posts_per_user=2, comments_per_post=2)) as server:
+            config = copy.copy(config)
+            config.BASE_URL = server.url
+            yield UserAPI(config=config), PostAPI(config=config), CommentAPI(config=config)
+
+    def test_fetch_methods(self, clients):
+        """Test that the fetch methods return records of the right type."""
+        user_api, post_api, comment_api = clients
+        users = user_api.fetch_users()
+        assert len(users) == 3 and all(type(user) is User for user in users)
+        assert user_api.fetch_user(2).id == 2
+        assert all(todo.user_id == 2 for todo in user_api.fetch_user_todos(2))
+        assert len(post_api.fetch_posts()) == 6
+        assert post_api.fetch_post(3).id == 3
+        assert [post.user_id for post in post_api.fetch_posts_by_user(1)] == [1, 1]
+        assert len(comment_api.fetch_comments()) == 12
+        assert {comment.post_id for comment in comment_api.fetch_comments_by_post(4)} == {4}
+
+    @pytest.mark.negative
+    def test_fetch_raises_on_error_status(self, clients):
+        """Test that a missing resource raises instead of building a record."""
+        with pytest.raises(requests.exceptions.HTTPError):
+            clients[1].fetch_post(9999)
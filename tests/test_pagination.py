@@ -0,0 +1,108 @@
+"""
+Tests for paginated and streaming collection iteration.
+"""
+
+import pytest
+from api.pagination import iter_collection, iter_json_array, page_params
+from tests.conftest import make_response
+
+
+class FakeCollectionClient:
+    """Client stand-in serving a list in ``_page``/``_limit`` or ``_start``/``_end`` pages."""
+
+    def __init__(self, records):
+        self.records = records
+        self.calls = []
+
+    def _request(self, method, endpoint, params=None, stream=False):
+        self.calls.append(params)
+        if "_page" in params:
+            start = (params["_page"] - 1) * params["_limit"]
+            end = start + params["_limit"]
+        else:
+            start, end = params.get("_start", 0), params.get("_end", len(self.records))
+        return make_response(self.records[start:end], stream=True)
+
+
+class UnpagedCollectionClient(FakeCollectionClient):
+    """Client stand-in for a backend that ignores the paging params and always returns everything."""
+
+    def _request(self, method, endpoint, params=None, stream=False):
+        self.calls.append(params)
+        return make_response(self.records, stream=True)
+
+
+class TestJSONArrayStreaming:
+    """Test suite for incremental JSON array parsing."""
+
+    def test_parses_elements_across_chunks(self):
+        """Test that elements split across chunk boundaries are decoded."""
+        payload = [{"id": index, "title": "x" * index} for index in range(50)]
+        items = list(iter_json_array(make_response(payload, stream=True), chunk_size=7))
+        assert items == payload
+
+    def test_numbers_at_chunk_boundaries(self):
+        """Test that numbers are not truncated at chunk boundaries."""
+        payload = [123456, 7, 89012, -3.5]
+        assert list(iter_json_array(make_response(payload, stream=True), chunk_size=2)) == payload
+
+    def test_empty_array(self):
+        """Test that an empty array yields nothing."""
+        assert list(iter_json_array(make_response([], stream=True))) == []
+
+    @pytest.mark.negative
+    def test_rejects_non_array(self):
+        """Test that an object body is rejected."""
+        with pytest.raises(ValueError):
+            list(iter_json_array(make_response({"id": 1}, stream=True)))
+
+
+class TestCollectionIteration:
+    """Test suite for paginated collection iteration."""
+
+    @pytest.mark.parametrize("paging", ["page", "range"])
+    @pytest.mark.parametrize("prefetch", [True, False])
+    @pytest.mark.parametrize("incremental", [True, False])
+    def test_yields_every_record_in_order(self, paging, prefetch, incremental):
+        """Test that every record is yielded once, in order."""
+        records = [{"id": index} for index in range(1, 26)]
+        client = FakeCollectionClient(records)
+        items = list(iter_collection(
+            client, "/posts", page_size=10, paging=paging,
+            prefetch=prefetch, incremental=incremental,
+        ))
+        assert items == records
+
+    def test_unpaginated_stream(self):
+        """Test that a page size of None streams one request."""
+        records = [{"id": index} for index in range(1, 6)]
+        client = FakeCollectionClient(records)
+        assert list(iter_collection(client, "/posts", page_size=None, incremental=True)) == records
+        assert len(client.calls) == 1
+
+    def test_extra_params_are_kept(self):
+        """Test that filter params are sent with every page."""
+        client = FakeCollectionClient([{"id": 1}])
+        list(iter_collection(client, "/posts", params={"userId": 1}, prefetch=False))
+        assert client.calls == [{"userId": 1, "_page": 1, "_limit": 100}]
+
+    @pytest.mark.parametrize("prefetch", [True, False])
+    @pytest.mark.parametrize("count", [25, 10])
+    def test_backend_ignoring_paging_params(self, prefetch, count):
+        """Test that a backend returning the whole collection for every page is read once."""
+        records = [{"id": index} for index in range(1, count + 1)]
+        client = UnpagedCollectionClient(records)
+        assert list(iter_collection(client, "/posts", page_size=10, prefetch=prefetch, incremental=True)) == records
+
+    @pytest.mark.negative
+    def test_max_pages_guard(self):
+        """Test that paging stops with an error after ``max_pages`` full pages."""
+        client = FakeCollectionClient([{"id": index} for index in range(1, 101)])
+        with pytest.raises(RuntimeError, match="after 3 pages"):
+            list(iter_collection(client, "/posts", page_size=10, max_pages=3))
+
+    @pytest.mark.negative
+    def test_unknown_paging_style(self):
+        """Test that an unknown paging style is rejected."""
+        with pytest.raises(ValueError):
+            page_params("cursor", 0, 10)
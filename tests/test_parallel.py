@@ -0,0 +1,160 @@
+"""
+Tests for shared rate limiting and parallel test execution.
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+from api.metrics import MetricsRecorder, RequestSample, recorder
+from api.rate_limit import FileTokenBucket, TokenBucket
+from perf.parallel import schedule, update_durations, worker_args
+
+pytest_plugins = ["pytester"]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestRateLimit:
+    """Test suite for token buckets."""
+
+    def test_burst_then_wait(self):
+        """Test that a bucket allows its burst and then asks callers to wait."""
+        bucket = TokenBucket(rate=10, burst=3)
+        assert [bucket.try_acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+        assert bucket.try_acquire() == pytest.approx(0.1, abs=0.02)
+
+    def test_acquire_paces_requests(self):
+        """Test that acquire blocks to keep to the rate."""
+        bucket = TokenBucket(rate=50, burst=1)
+        started = time.monotonic()
+        for _ in range(6):
+            bucket.acquire()
+        assert time.monotonic() - started >= 0.09
+
+    def test_file_bucket_is_shared(self, tmp_path):
+        """Test that buckets opened on the same file draw from one budget."""
+        path = str(tmp_path / "bucket")
+        first, second = FileTokenBucket(path, rate=1, burst=2), FileTokenBucket(path, rate=1, burst=2)
+        try:
+            assert first.try_acquire() == 0.0
+            assert second.try_acquire() == 0.0
+            assert first.try_acquire() > 0
+            assert second.try_acquire() > 0
+        finally:
+            first.close()
+            second.close()
+
+    def test_importable_without_fcntl(self):
+        """Test that rate limiting imports where ``fcntl`` is unavailable, as on Windows."""
+        code = (
+            # Standard library modules that probe for msvcrt are loaded before it is faked.
+            "import asyncio, sys; sys.modules['fcntl'] = None; sys.modules['msvcrt'] = type(sys)('msvcrt');"
+            "import api.rate_limit, api.file_lock; assert api.file_lock.fcntl is None"
+        )
+        result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+        assert result.returncode == 0, result.stderr
+
+
+class TestScheduling:
+    """Test suite for duration-based ordering."""
+
+    def test_longest_first_with_unknown_leading(self):
+        """Test that unknown tests run first, then the rest longest first."""
+        durations = {"a": 1.0, "b": 5.0, "c": 0.1}
+        assert schedule(["a", "b", "new", "c"], durations) == ["new", "b", "a", "c"]
+
+    def test_update_durations_averages(self):
+        """Test that new durations are blended into the history."""
+        assert update_durations({"a": 1.0}, {"a": 3.0, "b": 2.0}) == {"a": 2.0, "b": 2.0}
+
+    def test_worker_args_drop_controller_options(self):
+        """Test that controller-only options are stripped with their values."""
+        args = ["tests", "--workers", "4", "--metrics-json=m.json", "-m", "smoke", "--sla-baseline", "b.json"]
+        assert worker_args(args) == ["tests", "-m", "smoke"]
+
+    def test_metrics_merge(self):
+        """Test that a worker's exported metrics merge into another recorder."""
+        worker = MetricsRecorder()
+        worker.record(RequestSample("GET", "/posts/{id}", 200, 0.1, request_bytes=5))
+        worker.record(RequestSample("GET", "/posts/{id}", None, 0.3))
+        merged = MetricsRecorder()
+        merged.record(RequestSample("GET", "/posts/{id}", 200, 0.2))
+        merged.merge(worker.export())
+        summary = merged.summary()["GET /posts/{id}"]
+        assert summary["count"] == 3
+        assert summary["failures"] == 1
+        assert summary["statuses"] == {"200": 2}
+        assert summary["total"]["count"] == 3
+
+
+class TestParallelPlugin:
+    """Test suite for running a session on worker processes."""
+
+    @pytest.fixture(autouse=True)
+    def isolated_recorder(self, monkeypatch):
+        """Keep the inner runs' samples out of this session's metrics and let workers import the repo."""
+        monkeypatch.setenv("PYTHONPATH", ROOT)
+        saved = dict(recorder.endpoints)
+        recorder.reset()
+        yield
+        recorder.reset()
+        recorder.endpoints.update(saved)
+
+    def test_workers_report_to_controller(self, pytester):
+        """Test that outcomes and metrics from every worker reach the controller."""
+        pytester.makepyfile("""
+            import os
+            import pytest
+            from api.metrics import recorder, RequestSample
+
+            @pytest.mark.parametrize("index", range(6))
+            def test_request(index):
+                recorder.record(RequestSample("GET", "/parallel/{id}", 200, 0.01))
+
+            def test_failure():
+                assert os.environ.get("PARALLEL_AUTHKEY") is None
+        """)
+        result = pytester.runpytest_inprocess("-p", "perf.parallel", "--workers=2")
+        result.assert_outcomes(passed=6, failed=1)
+        assert recorder.summary()["GET /parallel/{id}"]["count"] == 6
+        assert result.ret == pytest.ExitCode.TESTS_FAILED
+
+    @pytest.mark.negative
+    def test_crashed_worker_fails_its_test(self, pytester):
+        """Test that a worker dying mid-test fails that test and the others still run."""
+        pytester.makepyfile("""
+            import os
+
+            def test_crash():
+                os._exit(1)
+
+            def test_one():
+                pass
+
+            def test_two():
+                pass
+        """)
+        result = pytester.runpytest_inprocess("-p", "perf.parallel", "--workers=2")
+        result.assert_outcomes(passed=2)
+        assert result.ret == pytest.ExitCode.TESTS_FAILED
+        result.stdout.fnmatch_lines(["*test_crash: worker exited before finishing*"])
+
+    @pytest.mark.negative
+    def test_stop_returns_prefetched_test(self, pytester):
+        """Test that a worker stopping on -x hands back its fetched-ahead test instead of failing it."""
+        pytester.makepyfile("""
+            def test_fails():
+                assert False
+
+            def test_fetched_ahead():
+                pass
+
+            def test_never_run():
+                pass
+        """)
+        result = pytester.runpytest_inprocess("-p", "perf.parallel", "--workers=1", "-x")
+        result.assert_outcomes(failed=1)
+        assert "worker exited before finishing" not in result.stdout.str()
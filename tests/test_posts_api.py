@@ -4,6 +4,7 @@ Tests for Post API endpoints.
 
 import pytest
 from api import PostAPI
+from schemas import POST
 
 
 class TestPostsAPI:
@@ -17,6 +18,13 @@ class TestPostsAPI:
         assert isinstance(response.json(), list)
         assert len(response.json()) > 0
 
+    @pytest.mark.regression
+    def test_iter_posts(self, post_api: PostAPI):
+        """Test iterating over all posts page by page."""
+        post_ids = [post["id"] for post in post_api.iter_posts(page_size=25)]
+        assert post_ids == list(range(1, len(post_ids) + 1))
+        assert len(post_ids) > 0
+
     @pytest.mark.smoke
     def test_get_post_by_id(self, post_api: PostAPI):
         """Test retrieving a post by ID."""
@@ -24,9 +32,7 @@ class TestPostsAPI:
         assert response.status_code == 200
         post = response.json()
         assert post["id"] == 1
-        assert "title" in post
-        assert "body" in post
-        assert "userId" in post
+        POST.assert_valid(post)
 
     @pytest.mark.positive
     def test_create_post(self, post_api: PostAPI):
@@ -80,11 +86,7 @@ class TestPostsAPI:
         """Test retrieving posts by a specific user."""
         response = post_api.get_posts_by_user(1)
         assert response.status_code == 200
-        posts = response.json()
-        assert isinstance(posts, list)
-        # All posts should belong to user 1
-        for post in posts:
-            assert post["userId"] == 1
+        POST.where(userId=1).assert_valid_many(response.json())
 
     @pytest.mark.regression
     def test_patch_post(self, post_api: PostAPI):
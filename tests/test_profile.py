@@ -0,0 +1,115 @@
+"""
+Tests for the per-test hot-path profiler.
+"""
+
+import csv
+import threading
+import time
+
+import pytest
+from api.metrics import RequestSample
+from perf.profile import PHASES, PhaseProfile, StackSampler, format_report
+
+pytest_plugins = ["pytester"]
+
+
+class TestPhaseProfile:
+    """Test suite for splitting request time into phases."""
+
+    def test_request_phases(self):
+        """Test that a request is split into send, wait and download."""
+        profile = PhaseProfile("test_x")
+        profile.add_request(RequestSample("GET", "/posts", 200, 0.100, ttfb=0.060, dns=0.001, connect=0.004, tls=0.005))
+        profile.add_request(RequestSample("GET", "/posts", None, 0.020))
+        assert profile.requests == 2
+        assert profile.phases["send"] == pytest.approx(0.010)
+        assert profile.phases["wait"] == pytest.approx(0.050 + 0.020)
+        assert profile.phases["download"] == pytest.approx(0.040)
+
+    def test_report_sorts_by_phase(self):
+        """Test that the report lists the top tests by the chosen phase."""
+        slow_setup = PhaseProfile("test_setup", total=0.5)
+        slow_setup.phases["setup"] = 0.4
+        slow_wait = PhaseProfile("test_wait", total=0.9)
+        slow_wait.phases["wait"] = 0.8
+        report = format_report([slow_setup, slow_wait], sort="setup", top=1).splitlines()
+        assert report[0].split()[2:2 + len(PHASES)] == list(PHASES)
+        assert len(report) == 2 and report[1].startswith("test_setup")
+
+    def test_sampler_records_stacks(self):
+        """Test that the sampler collects stacks of the sampled thread."""
+        sampler = StackSampler(threading.get_ident(), interval=0.001)
+        sampler.start()
+        deadline = time.perf_counter() + 0.1
+        while time.perf_counter() < deadline:
+            time.sleep(0.001)
+        stacks = sampler.stop()
+        assert sum(stacks.values()) >= 3
+        assert any("test_sampler_records_stacks" in stack for stack in stacks)
+
+
+class TestProfilePlugin:
+    """Test suite for the --api-profile option."""
+
+    @pytest.fixture
+    def suite(self, pytester):
+        """Write a suite with a slow fixture and a slow decode."""
+        pytester.makeconftest('pytest_plugins = ["perf.profile"]')
+        pytester.makepyfile(
+            """
+            import time
+            import pytest
+            import requests
+            from api.response import APIResponse
+
+            @pytest.fixture
+            def slow():
+                time.sleep(0.05)
+
+            def test_setup_heavy(slow):
+                pass
+
+            def test_decode_and_assert():
+                response = requests.Response()
+                response._content = b"[" + b",".join([b'{"id": 1}'] * 20000) + b"]"
+                assert len(APIResponse(response).json()) == 20000
+                time.sleep(0.03)
+            """
+        )
+        return pytester
+
+    def test_report_files(self, suite):
+        """Test the terminal report, the CSV and the folded stacks."""
+        result = suite.runpytest("-p", "no:cacheprovider", "--api-profile", "--api-profile-dir=profile", "--api-profile-sort=setup")
+        result.assert_outcomes(passed=2)
+        result.stdout.fnmatch_lines(["*api profile: top 10 tests by setup*", "*test_setup_heavy*"])
+        with open(suite.path / "profile" / "profile.csv") as handle:
+            rows = {row["test"].split("::")[1]: row for row in csv.DictReader(handle)}
+        assert float(rows["test_setup_heavy"]["setup_ms"]) >= 45
+        assert float(rows["test_decode_and_assert"]["decode_ms"]) > 0
+        assert float(rows["test_decode_and_assert"]["assertions_ms"]) >= 25
+        folded = (suite.path / "profile" / "phases.folded").read_text().splitlines()
+        assert all(line.rsplit(" ", 1)[1].isdigit() and ";" in line for line in folded)
+
+    @pytest.mark.parametrize("capture, output", [("cprofile", "cprofile"), ("sample", "samples.folded")])
+    def test_captures_slowest_tests(self, suite, capture, output):
+        """Test that only the slowest tests are captured."""
+        result = suite.runpytest(
+            "-p", "no:cacheprovider", "--api-profile", "--api-profile-dir=profile",
+            f"--api-profile-capture={capture}", "--api-profile-top=1",
+        )
+        result.assert_outcomes(passed=2)
+        path = suite.path / "profile" / output
+        if capture == "cprofile":
+            assert [item.name for item in path.iterdir()] == ["test_captures_slowest_tests.py_test_decode_and_assert.prof"]
+        else:
+            assert {line.split(";", 1)[0] for line in path.read_text().splitlines()} == {
+                "test_captures_slowest_tests.py::test_decode_and_assert"
+            }
+
+    @pytest.mark.negative
+    def test_top_must_be_positive(self, suite):
+        """Test that a top of zero is rejected up front instead of failing mid-run."""
+        result = suite.runpytest("-p", "no:cacheprovider", "--api-profile", "--api-profile-capture=cprofile", "--api-profile-top=0")
+        assert result.ret == pytest.ExitCode.USAGE_ERROR
+        result.stderr.fnmatch_lines(["*--api-profile-top must be at least 1*"])
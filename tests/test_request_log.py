@@ -0,0 +1,129 @@
+"""
+Tests for structured request-event logging.
+"""
+
+import copy
+import json
+import logging
+import threading
+import time
+
+import pytest
+from api import PostAPI
+from api.metrics import RequestSample
+from api.request_log import RequestLog, close_request_logs, get_request_log
+from perf.stub_server import StubServer, StubSettings
+
+
+def sample(status_code=200, total=0.01) -> RequestSample:
+    """Build a request sample."""
+    return RequestSample("GET", "/posts/{id}", status_code, total, request_bytes=0, response_bytes=120)
+
+
+def read_events(path) -> list:
+    """Read the JSONL events written to ``path``."""
+    with open(path) as file:
+        return [json.loads(line) for line in file]
+
+
+class TestRequestLog:
+    """Test suite for the request-event pipeline."""
+
+    def test_disabled_by_log_level(self, config):
+        """Test that no log exists when nothing would be written."""
+        config = copy.copy(config)
+        config.LOG_LEVEL, config.REQUEST_LOG_PATH = "ERROR", ""
+        assert get_request_log(config) is None
+        config.REQUEST_LOG_SAMPLE_RATE = 0
+        config.LOG_LEVEL = "INFO"
+        assert get_request_log(config) is None
+
+    def test_client_writes_jsonl_events(self, config, tmp_path):
+        """Test that every request becomes one JSONL event with its template, status, latency and size."""
+        path = tmp_path / "requests.jsonl"
+        with StubServer(StubSettings(users=2, posts_per_user=2)) as server:
+            config = copy.copy(config)
+            config.BASE_URL, config.REQUEST_LOG_PATH = server.url, str(path)
+            api = PostAPI(config=config)
+            api.get_post(1)
+            api.get_post(99)
+            api.create_post({"title": "t", "body": "b", "userId": 1})
+            close_request_logs()
+        events = read_events(path)
+        assert [(event["method"], event["template"], event["status"]) for event in events] == [
+            ("GET", "/posts/{id}", 200), ("GET", "/posts/{id}", 404), ("POST", "/posts", 201),
+        ]
+        assert all(event["latency_ms"] > 0 for event in events)
+        assert events[0]["response_bytes"] > 0 and events[2]["request_bytes"] > 0
+
+    def test_log_lines_are_formatted_off_thread(self, caplog):
+        """Test that events reach the ``api.requests`` logger, failures as warnings."""
+        log = RequestLog(logging.INFO)
+        with caplog.at_level(logging.INFO, logger="api.requests"):
+            log.record(sample(200))
+            log.record(sample(None))
+            log.close()
+        assert [(record.levelname, record.getMessage()) for record in caplog.records] == [
+            ("INFO", "GET /posts/{id} -> 200 in 10.0 ms"),
+            ("WARNING", "GET /posts/{id} -> None in 10.0 ms"),
+        ]
+
+    def test_records_carry_caller_and_respect_logger_filters(self, caplog):
+        """Test that records name the calling code and pass through the logger's filters."""
+        log = RequestLog(logging.INFO)
+        only_failures = logging.Filter()
+        only_failures.filter = lambda record: record.levelno >= logging.WARNING
+        with caplog.at_level(logging.INFO, logger="api.requests"):
+            logging.getLogger("api.requests").addFilter(only_failures)
+            try:
+                log.record(sample(200))
+                log.record(sample(None))
+                log.close()
+            finally:
+                logging.getLogger("api.requests").removeFilter(only_failures)
+        assert [record.levelname for record in caplog.records] == ["WARNING"]
+        assert caplog.records[0].pathname == __file__
+        assert caplog.records[0].funcName == "test_records_carry_caller_and_respect_logger_filters"
+        assert caplog.records[0].lineno > 0
+
+    def test_warning_level_keeps_failures_only(self, caplog):
+        """Test that LOG_LEVEL=WARNING drops successful requests."""
+        log = RequestLog(logging.WARNING)
+        with caplog.at_level(logging.INFO, logger="api.requests"):
+            for status in (200, 503, 201):
+                log.record(sample(status))
+            log.close()
+        assert [record.event.status_code for record in caplog.records] == [503]
+
+    def test_sampling_keeps_failures(self, tmp_path):
+        """Test that sampling thins successful requests but keeps every failure."""
+        path = tmp_path / "sampled.jsonl"
+        log = RequestLog(logging.ERROR, sample_rate=0.25, path=str(path))
+        for index in range(2000):
+            log.record(sample(500 if index % 100 == 0 else 200))
+        log.close()
+        statuses = [event["status"] for event in read_events(path)]
+        assert statuses.count(500) == 20
+        assert 350 < statuses.count(200) < 650
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        """Test that a stalled writer never blocks the request path."""
+        release = threading.Event()
+
+        class Stalled(logging.Handler):
+            def emit(self, record):
+                release.wait(5)
+
+        handler = Stalled()
+        logging.getLogger("api.requests").addHandler(handler)
+        try:
+            log = RequestLog(logging.INFO, queue_size=10)
+            started = time.perf_counter()
+            for _ in range(1000):
+                log.record(sample())
+            assert time.perf_counter() - started < 0.5
+            assert log.dropped >= 1000 - 11
+        finally:
+            release.set()
+            log.close()
+            logging.getLogger("api.requests").removeHandler(handler)
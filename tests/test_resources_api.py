@@ -0,0 +1,96 @@
+"""
+Tests for Todo, Album and Photo API endpoints.
+"""
+
+import pytest
+from api import AlbumAPI, PhotoAPI, TodoAPI
+from api.models import Album, Photo, Todo
+from schemas import ALBUM, PHOTO, TODO
+
+
+class TestTodosAPI:
+    """Test suite for Todo API endpoints."""
+
+    @pytest.mark.smoke
+    def test_get_todo(self, todo_api: TodoAPI):
+        """Test retrieving a todo by ID."""
+        response = todo_api.get_todo(1)
+        assert response.status_code == 200
+        TODO.assert_valid(response.json())
+
+    @pytest.mark.regression
+    def test_get_todos_by_user(self, todo_api: TodoAPI):
+        """Test retrieving the todos of one user as records."""
+        todos = todo_api.fetch_todos_by_user(1)
+        assert todos and all(type(todo) is Todo and todo.user_id == 1 for todo in todos)
+
+    @pytest.mark.positive
+    def test_create_todo(self, todo_api: TodoAPI):
+        """Test creating a new todo."""
+        response = todo_api.create_todo({"userId": 1, "title": "Test Todo", "completed": False})
+        assert response.status_code == 201
+        assert response.json()["title"] == "Test Todo"
+
+    @pytest.mark.negative
+    def test_get_nonexistent_todo(self, todo_api: TodoAPI):
+        """Test retrieving a non-existent todo."""
+        assert todo_api.get_todo(99999).status_code == 404
+
+
+class TestAlbumsAPI:
+    """Test suite for Album API endpoints."""
+
+    @pytest.mark.smoke
+    def test_get_all_albums(self, album_api: AlbumAPI):
+        """Test retrieving all albums."""
+        response = album_api.get_all_albums()
+        assert response.status_code == 200
+        ALBUM.assert_valid_many(response.json())
+
+    @pytest.mark.regression
+    def test_get_album_photos(self, album_api: AlbumAPI):
+        """Test retrieving the photos of an album as records."""
+        photos = album_api.fetch_album_photos(1)
+        assert photos and all(type(photo) is Photo and photo.album_id == 1 for photo in photos)
+
+    @pytest.mark.regression
+    def test_get_albums_batch(self, album_api: AlbumAPI):
+        """Test retrieving many albums concurrently, in input order."""
+        results = album_api.get_albums([3, 1, 2])
+        assert [result.response.json()["id"] for result in results] == [3, 1, 2]
+
+    @pytest.mark.positive
+    def test_patch_album(self, album_api: AlbumAPI):
+        """Test partially updating an album."""
+        response = album_api.patch_album(1, {"title": "Patched Album"})
+        assert response.status_code == 200
+        assert response.json()["title"] == "Patched Album"
+
+
+class TestPhotosAPI:
+    """Test suite for Photo API endpoints."""
+
+    @pytest.mark.smoke
+    def test_get_photo(self, photo_api: PhotoAPI):
+        """Test retrieving a photo as a record."""
+        photo = photo_api.fetch_photo(1)
+        assert type(photo) is Photo and photo.id == 1
+        PHOTO.assert_valid(photo.to_dict())
+
+    @pytest.mark.regression
+    def test_get_photos_by_album(self, photo_api: PhotoAPI):
+        """Test filtering photos by album."""
+        response = photo_api.get_photos_by_album(2)
+        assert response.status_code == 200
+        assert {photo["albumId"] for photo in response.json()} == {2}
+
+    @pytest.mark.positive
+    def test_delete_photo(self, photo_api: PhotoAPI):
+        """Test deleting a photo."""
+        assert photo_api.delete_photo(1).status_code == 200
+
+    @pytest.mark.regression
+    def test_album_records(self, album_api: AlbumAPI):
+        """Test that album records keep the JSON keys."""
+        album = album_api.fetch_album(1)
+        assert type(album) is Album and album["userId"] == album.user_id
@@ -0,0 +1,46 @@
+"""
+Tests for the lazily decoded response wrapper.
+"""
+
+import pytest
+import requests
+from api import response as response_module
+from api.response import APIResponse
+from tests.conftest import make_response
+
+
+class TestAPIResponse:
+    """Test suite for APIResponse."""
+
+    def test_json_decoded_once(self, monkeypatch):
+        """Test that the body is decoded only on first access."""
+        calls = []
+        loads = response_module.json_loads
+        monkeypatch.setattr(response_module, "json_loads", lambda body: calls.append(body) or loads(body))
+        response = APIResponse(make_response(b'[{"id": 1}, {"id": 2}]'))
+        assert response.json() is response.json()
+        assert len(calls) == 1
+
+    def test_delegates_to_wrapped_response(self):
+        """Test that response attributes are read from the wrapped response."""
+        response = APIResponse(make_response(b"{}", status_code=404))
+        assert response.status_code == 404
+        assert response.text == "{}"
+        assert not response
+
+    def test_typed_accessors(self):
+        """Test the list and dict accessors."""
+        assert APIResponse(make_response(b"[1, 2]")).json_list() == [1, 2]
+        assert APIResponse(make_response(b'{"id": 1}')).json_dict() == {"id": 1}
+
+    @pytest.mark.negative
+    def test_typed_accessor_rejects_wrong_shape(self):
+        """Test that a typed accessor rejects the wrong JSON type."""
+        with pytest.raises(TypeError):
+            APIResponse(make_response(b'{"id": 1}')).json_list()
+
+    @pytest.mark.negative
+    def test_invalid_json_raises_requests_error(self):
+        """Test that invalid JSON raises the same error as requests."""
+        with pytest.raises(requests.exceptions.JSONDecodeError):
+            APIResponse(make_response(b"not json")).json()
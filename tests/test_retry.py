@@ -0,0 +1,174 @@
+"""
+Tests for request retries with backoff and hedged GETs.
+"""
+
+import copy
+import threading
+import time
+from email.utils import formatdate
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+from api import PostAPI
+from api.metrics import MetricsRecorder, RequestSample
+from api.retry import RetryPolicy, get_hedger, parse_retry_after
+from perf.stub_server import StubServer, StubSettings
+
+
+def retrying(config, server: StubServer = None, **settings):
+    """Copy the config with retry and hedge settings, pointed at ``server``."""
+    config = copy.copy(config)
+    if server is not None:
+        config.BASE_URL = server.url
+    for name, value in settings.items():
+        setattr(config, name, value)
+    return config
+
+
+class SlowFirstAdapter(BaseAdapter):
+    """Adapter stand-in whose first request is slow and every later one fast."""
+
+    def __init__(self, slow: float):
+        super().__init__()
+        self.slow = slow
+        self.sent = 0
+        self._lock = threading.Lock()
+
+    def send(self, request, **kwargs):
+        with self._lock:
+            self.sent += 1
+            first = self.sent == 1
+        if first:
+            time.sleep(self.slow)
+        response = requests.Response()
+        response.request = request
+        response.url = request.url
+        response.status_code = 200
+        response._content = b'{"id": 1}'
+        return response
+
+    def close(self):
+        pass
+
+
+class TestRetryPolicy:
+    """Test suite for backoff and Retry-After handling."""
+
+    def test_backoff_is_capped_full_jitter(self):
+        """Test that backoff stays between zero and the capped exponential delay."""
+        policy = RetryPolicy(total=10, backoff_factor=0.1, backoff_max=1.0)
+        for attempt, cap in [(0, 0.1), (2, 0.4), (8, 1.0)]:
+            delays = [policy.backoff(attempt) for _ in range(200)]
+            assert 0 <= min(delays) and max(delays) <= cap
+            assert max(delays) > cap / 2
+
+    def test_only_idempotent_methods(self):
+        """Test that POST and PATCH are never retried."""
+        policy = RetryPolicy(total=3)
+        assert policy.retry_status("GET", 503, 0)
+        assert policy.retry_status("delete", 429, 2)
+        assert not policy.retry_status("GET", 503, 3)
+        assert not policy.retry_status("GET", 404, 0)
+        assert not policy.retry_status("POST", 503, 0)
+        assert not policy.retry_status("PATCH", 503, 0)
+
+    def test_parse_retry_after(self):
+        """Test both Retry-After forms."""
+        assert parse_retry_after("3") == 3.0
+        assert 8 <= parse_retry_after(formatdate(time.time() + 10, usegmt=True)) <= 10
+        assert parse_retry_after(formatdate(time.time() - 10, usegmt=True)) == 0.0
+        assert parse_retry_after("soon") is None
+        assert parse_retry_after(None) is None
+
+
+class TestRetries:
+    """Test suite for retries against the stub server."""
+
+    def test_retries_server_errors(self, config):
+        """Test that transient 500s are retried until a success."""
+        with StubServer(StubSettings(error_rate=0.5, seed=3)) as server:
+            settings = retrying(config, server, RETRY_TOTAL=10, RETRY_BACKOFF_FACTOR=0.001)
+            posts = PostAPI(settings, metrics=MetricsRecorder())
+            statuses = [posts.get_post(1).status_code for _ in range(50)]
+            assert server.stats[500] > 0
+        assert set(statuses) == {200}
+
+    @pytest.mark.negative
+    def test_post_is_not_retried(self, config):
+        """Test that a failed POST is returned as is."""
+        with StubServer(StubSettings(error_rate=1.0)) as server:
+            settings = retrying(config, server, RETRY_TOTAL=3, RETRY_BACKOFF_FACTOR=0.001)
+            response = PostAPI(settings, metrics=MetricsRecorder()).create_post({"title": "t", "userId": 1})
+            assert response.status_code == 500
+            assert server.stats[500] == 1
+
+    @pytest.mark.negative
+    def test_gives_up_after_total(self, config):
+        """Test that the last failed response is returned once retries run out."""
+        with StubServer(StubSettings(error_rate=1.0)) as server:
+            settings = retrying(config, server, RETRY_TOTAL=2, RETRY_BACKOFF_FACTOR=0.001)
+            assert PostAPI(settings, metrics=MetricsRecorder()).get_post(1).status_code == 500
+            assert server.stats[500] == 3
+
+    def test_honors_retry_after(self, config):
+        """Test that a 429 waits for the server's Retry-After before retrying."""
+        with StubServer(StubSettings(rate_limit=1, rate_limit_burst=1)) as server:
+            settings = retrying(config, server, RETRY_TOTAL=1, RETRY_BACKOFF_FACTOR=0.001)
+            posts = PostAPI(settings, metrics=MetricsRecorder())
+            posts.get_post(1)
+            started = time.perf_counter()
+            response = posts.get_post(1)
+            assert server.stats[429] == 1
+        assert response.status_code == 200
+        assert time.perf_counter() - started >= 0.9
+
+    @pytest.mark.negative
+    def test_retries_connection_errors(self, config):
+        """Test that connection errors are retried and re-raised when retries run out."""
+        with StubServer(StubSettings()) as server:
+            url = server.url
+        settings = retrying(config, RETRY_TOTAL=2, RETRY_BACKOFF_FACTOR=0.001, BASE_URL=url)
+        started = time.perf_counter()
+        with pytest.raises(requests.exceptions.ConnectionError):
+            PostAPI(settings, metrics=MetricsRecorder()).get_post(1)
+        assert time.perf_counter() - started < 1
+
+
+class TestHedging:
+    """Test suite for hedged GETs."""
+
+    @staticmethod
+    def warmed_recorder(count: int = 20, total: float = 0.002) -> MetricsRecorder:
+        """Build a recorder that has already seen fast ``GET /posts/{id}`` requests."""
+        recorder = MetricsRecorder()
+        for _ in range(count):
+            recorder.record(RequestSample("GET", "/posts/{id}", 200, total))
+        return recorder
+
+    def test_slow_get_is_hedged(self, config):
+        """Test that a GET slower than the observed p95 is answered by its hedge."""
+        settings = retrying(config, HEDGE_ENABLED=True, HEDGE_MIN_SAMPLES=20, HEDGE_MIN_DELAY=0.01)
+        adapter = SlowFirstAdapter(slow=1.0)
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        posts = PostAPI(settings, session=session, metrics=self.warmed_recorder())
+        hedged = get_hedger(settings).hedged
+        started = time.perf_counter()
+        assert posts.get_post(1).json() == {"id": 1}
+        assert time.perf_counter() - started < 0.5
+        assert adapter.sent == 2
+        assert get_hedger(settings).hedged == hedged + 1
+
+    def test_not_hedged_until_enough_samples(self, config):
+        """Test that GETs are sent once until the endpoint has enough latency samples."""
+        settings = retrying(config, HEDGE_ENABLED=True, HEDGE_MIN_SAMPLES=20, HEDGE_MIN_DELAY=0.0)
+        adapter = SlowFirstAdapter(slow=0.05)
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        posts = PostAPI(settings, session=session, metrics=self.warmed_recorder(count=5))
+        posts.get_post(1)
+        posts.create_post({"title": "t", "userId": 1})
+        assert adapter.sent == 2
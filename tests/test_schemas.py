@@ -0,0 +1,119 @@
+"""
+Tests for the compiled response schemas.
+"""
+
+import time
+
+import pytest
+from perf.stub_server import StubSettings, build_dataset
+from schemas import COMMENT, POST, TODO, USER, Array, Int, Object, Schema, SchemaError, Str
+from schemas import engine
+
+
+@pytest.fixture(scope="module")
+def dataset():
+    """Build a stub dataset shaped like JSONPlaceholder's."""
+    return build_dataset(StubSettings())
+
+
+class TestSchemaValidation:
+    """Test suite for single-object validation."""
+
+    def test_dataset_is_valid(self, dataset):
+        """Test that every generated resource matches its schema."""
+        for schema, name in [(USER, "users"), (POST, "posts"), (COMMENT, "comments"), (TODO, "todos")]:
+            assert schema.validate_many(dataset[name]) == []
+            assert all(schema.check(item) for item in dataset[name])
+
+    @pytest.mark.negative
+    def test_reports_every_violation_with_path(self, dataset):
+        """Test that nested violations are all reported with their paths."""
+        user = {**dataset["users"][0], "id": "1", "email": "nope"}
+        user["address"] = {**user["address"], "geo": {"lat": "north"}}
+        del user["company"]
+        assert sorted(str(violation) for violation in USER.validate(user)) == [
+            "address.geo.lat: 'north' does not match '-?\\\\d+(\\\\.\\\\d+)?'",
+            "address.geo.lng: missing required field",
+            "company: missing required field",
+            "email: 'nope' does not match '[^@\\\\s]+@[^@\\\\s]+\\\\.[^@\\\\s]+'",
+            "id: expected int, got str",
+        ]
+
+    @pytest.mark.negative
+    def test_bool_is_not_int(self):
+        """Test that booleans are rejected where integers are expected."""
+        assert [str(v) for v in POST.validate({"id": True, "userId": 1, "title": "", "body": ""})] == [
+            "id: expected int, got bool"
+        ]
+
+    def test_optional_nullable_and_strict(self):
+        """Test optional, nullable and closed schemas and nested arrays."""
+        schema = Schema("Tagged", {
+            "id": Int(),
+            "note": Str(required=False, nullable=True),
+            "tags": Array(Str(min_length=1)),
+        }, extra=False)
+        assert schema.validate({"id": 1, "tags": ["a"]}) == []
+        assert schema.validate({"id": 1, "note": None, "tags": []}) == []
+        assert [str(v) for v in schema.validate({"id": 1, "tags": ["a", ""], "x": 1})] == [
+            "tags[1]: length 0 is less than 1",
+            "x: unexpected field",
+        ]
+        assert schema.validate_many([{"id": 1, "tags": ["a"]}, {"id": 2, "tags": [""]}]) != []
+
+    def test_nested_objects_compiled_into_parent(self):
+        """Test that a nested object schema is checked by the parent's compiled check."""
+        outer = Schema("Outer", {"inner": Object(Schema("Inner", {"n": Int(maximum=3)}))})
+        assert outer.check({"inner": {"n": 3}})
+        assert not outer.check({"inner": {"n": 4}})
+        assert [str(v) for v in outer.validate({"inner": {"n": 4}})] == ["inner.n: 4 is greater than 3"]
+
+    @pytest.mark.negative
+    def test_assert_valid_raises_assertion(self):
+        """Test that failures surface as assertion errors listing the violations."""
+        with pytest.raises(AssertionError) as error:
+            POST.assert_valid({"id": 0})
+        assert isinstance(error.value, SchemaError)
+        assert len(error.value.violations) == 4
+        assert "id: 0 is less than 1" in str(error.value)
+
+
+class TestBatchValidation:
+    """Test suite for list validation."""
+
+    def test_where_pins_values(self, dataset):
+        """Test that derived schemas check pinned values and are cached."""
+        posts = [post for post in dataset["posts"] if post["userId"] == 2]
+        assert POST.where(userId=2).validate_many(posts) == []
+        assert POST.where(userId=2) is POST.where(userId=2)
+        violations = POST.where(userId=3).validate_many(posts[:2])
+        assert [str(v) for v in violations] == ["[0].userId: expected 3, got 2", "[1].userId: expected 3, got 2"]
+        with pytest.raises(KeyError):
+            POST.where(missing=1)
+
+    @pytest.mark.negative
+    def test_reports_only_failing_rows(self, dataset):
+        """Test that a bad row in a large list is found by index."""
+        posts = [dict(post) for post in dataset["posts"]] * 50
+        posts[777] = {**posts[777], "title": None}
+        posts[901] = "post"
+        assert [str(v) for v in POST.validate_many(posts)] == [
+            "[777].title: expected str, got NoneType",
+            "[901]: expected object, got str",
+        ]
+        assert POST.validate_many({"id": 1}) == [engine.Violation("", "expected array, got dict")]
+
+    def test_large_collection_is_fast(self, dataset):
+        """Test that 100k posts validate in a fraction of a second."""
+        posts = dataset["posts"] * 1000
+        started = time.perf_counter()
+        assert POST.validate_many(posts) == []
+        assert time.perf_counter() - started < 0.5
+
+    @pytest.mark.skipif(engine.numpy is None, reason="NumPy is not installed")
+    def test_numpy_columns(self, dataset):
+        """Test that NumPy column checks agree with the builtin ones."""
+        posts = dataset["posts"] * 20
+        assert len(posts) >= engine.NUMPY_MIN_ROWS
+        assert POST.validate_many(posts) == []
+        assert len(POST.where(userId=1).validate_many(posts)) == sum(1 for post in posts if post["userId"] != 1)
@@ -0,0 +1,38 @@
+"""
+Tests for the shared, pooled session layer.
+"""
+
+import pytest
+from api import UserAPI, PostAPI
+from api.session_pool import PooledHTTPAdapter, get_session
+
+
+class TestSessionPool:
+    """Test suite for pooled sessions."""
+
+    def test_session_shared_per_host(self, config):
+        """Test that the same host always gets the same session."""
+        assert get_session(config) is get_session(config)
+
+    def test_adapter_tuned_from_config(self, config):
+        """Test that the host adapter uses the configured pool sizes."""
+        adapter = get_session(config).get_adapter(f"{config.BASE_URL}/users")
+        assert isinstance(adapter, PooledHTTPAdapter)
+        assert adapter._pool_connections == config.POOL_CONNECTIONS
+        assert adapter._pool_maxsize == config.POOL_MAXSIZE
+
+    def test_fixtures_share_session(self, user_api: UserAPI, post_api: PostAPI):
+        """Test that client fixtures reuse the worker's session."""
+        assert user_api.session is post_api.session
+
+    def test_client_headers_do_not_leak(self, user_api: UserAPI, http_session):
+        """Test that per-client headers stay off the shared session."""
+        user_api.headers["X-Test-Case"] = "isolated"
+        assert "X-Test-Case" not in http_session.headers
+
+    @pytest.mark.negative
+    def test_close_keeps_shared_session_open(self, config, http_session):
+        """Test that closing a client does not close a shared session."""
+        api = UserAPI(config, session=http_session)
+        api.close()
+        assert get_session(config) is http_session
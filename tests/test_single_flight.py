@@ -0,0 +1,111 @@
+"""
+Tests for single-flight deduplication of concurrent identical GETs.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from api import AsyncPostAPI, PostAPI, UserAPI
+from api.metrics import MetricsRecorder
+from api.single_flight import SingleFlight, flight_key
+from perf.stub_server import StubServer, StubSettings
+from tests.conftest import config_for
+
+
+class TestSingleFlight:
+    """Test suite for the single-flight table."""
+
+    def test_concurrent_callers_share_one_call(self):
+        """Test that callers arriving while a call runs get its result."""
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def slow():
+            calls.append(1)
+            release.wait(5)
+            return "result"
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            futures = [executor.submit(flight.do, "key", slow) for _ in range(8)]
+            while flight.shared < 7:
+                time.sleep(0.001)
+            release.set()
+            results = [future.result() for future in futures]
+        assert results == ["result"] * 8
+        assert len(calls) == 1
+        assert flight.do("key", lambda: "next") == "next"
+
+    @pytest.mark.negative
+    def test_errors_reach_every_caller(self):
+        """Test that the leader's exception is raised to every waiting caller."""
+        flight = SingleFlight()
+        release = threading.Event()
+
+        def failing():
+            release.wait(5)
+            raise ValueError("boom")
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(flight.do, "key", failing) for _ in range(4)]
+            while flight.shared < 3:
+                time.sleep(0.001)
+            release.set()
+            for future in futures:
+                with pytest.raises(ValueError):
+                    future.result()
+
+    def test_key_includes_params_and_headers(self):
+        """Test that params and headers distinguish requests, in any order."""
+        url = "https://x.test/posts"
+        assert flight_key(url, {"a": 1, "b": 2}) == flight_key(url, {"b": 2, "a": 1})
+        assert flight_key(url, {"a": 1}) != flight_key(url, {"a": 2})
+        assert flight_key(url, headers={"Authorization": "a"}) != flight_key(url, headers={"Authorization": "b"})
+
+
+class TestClientDeduplication:
+    """Test suite for deduplication in the API clients."""
+
+    def test_threaded_gets_share_a_call(self, config):
+        """Test that concurrent identical GETs from threads reach the server about once."""
+        with StubServer(StubSettings(latency=0.1)) as server:
+            users = UserAPI(config_for(config, server), metrics=MetricsRecorder())
+            results = users.batch(lambda _: users.get_user(1), range(16), concurrency=16)
+            assert server.stats[200] < 4
+        bodies = [result.response.json() for result in results]
+        assert all(body == bodies[0] for body in bodies)
+        assert bodies[0] is not bodies[1]
+
+    def test_distinct_requests_not_merged(self, config):
+        """Test that different resources and writes are each sent."""
+        with StubServer(StubSettings(latency=0.05)) as server:
+            posts = PostAPI(config_for(config, server), metrics=MetricsRecorder())
+            gets = posts.batch(posts.get_post, range(1, 9), concurrency=8)
+            writes = posts.batch(lambda _: posts.create_post({"title": "t", "userId": 1}), range(4), concurrency=4)
+            assert server.stats[200] == 8
+            assert server.stats[201] == 4
+        assert [result.response.json()["id"] for result in gets] == list(range(1, 9))
+        assert all(result.status_code == 201 for result in writes)
+
+    def test_disabled(self, config):
+        """Test that every GET is sent when deduplication is off."""
+        with StubServer(StubSettings(latency=0.05)) as server:
+            users = UserAPI(config_for(config, server, SINGLE_FLIGHT=False), metrics=MetricsRecorder())
+            users.batch(lambda _: users.get_user(1), range(8), concurrency=8)
+            assert server.stats[200] == 8
+
+    def test_async_gets_share_a_call(self, config):
+        """Test that concurrent identical GETs on one loop reach the server once."""
+        with StubServer(StubSettings(latency=0.05)) as server:
+            settings = config_for(config, server)
+
+            async def run():
+                async with AsyncPostAPI(settings, metrics=MetricsRecorder()) as api:
+                    return await asyncio.gather(*(api.get_post(1) for _ in range(20)))
+
+            responses = asyncio.run(run())
+            assert server.stats[200] == 1
+        assert [response.json()["id"] for response in responses] == [1] * 20
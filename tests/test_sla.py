@@ -0,0 +1,143 @@
+"""
+Tests for latency SLA assertions and regression gating.
+"""
+
+import random
+
+import pytest
+from api import PostAPI
+from api.histogram import LatencyHistogram
+from api.metrics import recorder
+from perf.sla import check_sla, find_regressions, load_baseline, mann_whitney_p_value, save_baseline
+
+pytest_plugins = ["pytester"]
+
+
+def histogram_of(values) -> LatencyHistogram:
+    """Build a histogram from durations in seconds."""
+    histogram = LatencyHistogram()
+    for value in values:
+        histogram.record(value)
+    return histogram
+
+
+def latencies(mean: float, count: int = 200, seed: int = 1):
+    """Generate noisy latencies around a mean, in seconds."""
+    rng = random.Random(seed)
+    return [rng.gauss(mean, mean / 10) for _ in range(count)]
+
+
+class TestSLAChecks:
+    """Test suite for SLA budgets."""
+
+    def test_within_budget(self):
+        """Test that fast requests pass their budget."""
+        assert check_sla(histogram_of([0.05] * 10), {"p95_ms": 100}) == []
+
+    @pytest.mark.negative
+    def test_over_budget(self):
+        """Test that slow requests break their budget."""
+        violations = check_sla(histogram_of([0.05] * 9 + [0.5]), {"p95_ms": 100, "p50_ms": 100})
+        assert len(violations) == 1
+        assert violations[0].startswith("p95_ms")
+
+    def test_tolerance_scales_budget(self):
+        """Test that the environment tolerance loosens budgets."""
+        assert check_sla(histogram_of([0.15]), {"max_ms": 100}, tolerance=2.0) == []
+
+
+class TestRegressionGating:
+    """Test suite for baseline comparison."""
+
+    def test_same_distribution_not_significant(self):
+        """Test that identical distributions are not flagged."""
+        p_value = mann_whitney_p_value(histogram_of(latencies(0.1, seed=1)), histogram_of(latencies(0.1, seed=2)))
+        assert p_value > 0.01
+
+    def test_slower_distribution_significant(self):
+        """Test that a clearly slower distribution is flagged."""
+        p_value = mann_whitney_p_value(histogram_of(latencies(0.15)), histogram_of(latencies(0.1)))
+        assert p_value < 0.001
+
+    def test_find_regressions(self):
+        """Test that only significant regressions above the threshold are reported."""
+        baseline = {"GET /posts/{id}": histogram_of(latencies(0.1)), "GET /users": histogram_of(latencies(0.1))}
+        current = {"GET /posts/{id}": histogram_of(latencies(0.15)), "GET /users": histogram_of(latencies(0.105))}
+        regressions = find_regressions(current, baseline, threshold=0.2, alpha=0.01, min_samples=20)
+        assert [regression.endpoint for regression in regressions] == ["GET /posts/{id}"]
+        assert regressions[0].change == pytest.approx(0.5, abs=0.1)
+
+    def test_too_few_samples_ignored(self):
+        """Test that endpoints with too few samples are not judged."""
+        baseline = {"GET /users": histogram_of([0.1] * 5)}
+        current = {"GET /users": histogram_of([1.0] * 5)}
+        assert find_regressions(current, baseline, threshold=0.2, alpha=0.01, min_samples=20) == []
+
+    def test_baseline_round_trip(self, tmp_path):
+        """Test that baselines are saved and loaded intact."""
+        path = str(tmp_path / "baseline.json")
+        save_baseline(path, {"GET /users": histogram_of(latencies(0.1))})
+        assert load_baseline(path)["GET /users"].count == 200
+
+
+class TestSLAMarker:
+    """Test suite for the sla marker on requests to the local stub server."""
+
+    @pytest.mark.sla(p95_ms=1000)
+    def test_stub_requests_within_budget(self, stub_config):
+        """Test that requests to the stub stay within a generous p95 budget."""
+        posts = PostAPI(stub_config)
+        try:
+            assert all(posts.get_post(post_id).status_code == 200 for post_id in range(1, 21))
+        finally:
+            posts.close()
+
+
+class TestSLAPlugin:
+    """Test suite for the sla marker and baseline options."""
+
+    @pytest.fixture(autouse=True)
+    def isolated_recorder(self):
+        """Keep the inner runs' samples out of this session's metrics."""
+        saved = dict(recorder.endpoints)
+        recorder.reset()
+        yield
+        recorder.reset()
+        recorder.endpoints.update(saved)
+
+    def test_marker_fails_slow_test(self, pytester):
+        """Test that a test breaking its latency budget fails."""
+        pytester.makepyfile("""
+            import pytest
+            from api.metrics import recorder, RequestSample
+
+            @pytest.mark.sla(p95_ms=100)
+            def test_slow():
+                recorder.record(RequestSample("GET", "/posts/{id}", 200, 0.5))
+
+            @pytest.mark.sla(p95_ms=100)
+            def test_fast():
+                recorder.record(RequestSample("GET", "/posts/{id}", 200, 0.01))
+        """)
+        result = pytester.runpytest_inprocess("-p", "perf.sla")
+        result.assert_outcomes(passed=1, failed=1)
+        result.stdout.fnmatch_lines(["*Latency SLA broken over 1 requests*"])
+
+    def test_baseline_gates_session(self, pytester, tmp_path):
+        """Test that a significant regression against the baseline fails the session."""
+        test_file = """
+            import random
+            from api.metrics import recorder, RequestSample
+
+            def test_requests():
+                rng = random.Random(1)
+                for _ in range(100):
+                    recorder.record(RequestSample("GET", "/gated/{id}", 200, rng.gauss(LATENCY, LATENCY / 10)))
+        """
+        baseline = str(tmp_path / "baseline.json")
+        pytester.makepyfile(test_file.replace("LATENCY", "0.1"))
+        pytester.runpytest_inprocess("-p", "perf.sla", f"--sla-save-baseline={baseline}")
+        pytester.makepyfile(test_file.replace("LATENCY", "0.2"))
+        result = pytester.runpytest_inprocess("-p", "perf.sla", f"--sla-baseline={baseline}")
+        assert result.ret == pytest.ExitCode.TESTS_FAILED
+        result.stdout.fnmatch_lines(["*latency regressions: 1*", "GET /gated/{id}: p95*"])
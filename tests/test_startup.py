@@ -0,0 +1,106 @@
+"""
+Tests for import time and lazy configuration.
+"""
+
+import os
+import re
+import subprocess
+import sys
+
+import api
+import pytest
+from config import get_config
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cold import of ``api`` and ``config`` together, in milliseconds.
+IMPORT_BUDGET_MS = 25
+
+HEAVY_MODULES = ("requests", "httpx", "urllib3", "dotenv", "asyncio")
+
+
+def run_python(code: str, *options: str, env: dict = None) -> subprocess.CompletedProcess:
+    """Run code in a fresh interpreter from the repo root."""
+    return subprocess.run(
+        [sys.executable, *options, "-c", code],
+        cwd=ROOT,
+        env={**os.environ, **(env or {})},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def import_time_ms() -> float:
+    """Get the cumulative import time of the ``api`` and ``config`` packages in a fresh interpreter."""
+    stderr = run_python("import api, config", "-X", "importtime").stderr
+    times = re.findall(r"^import time:\s+\d+ \|\s+(\d+) \| (?:api|config)$", stderr, re.M)
+    assert len(times) == 2, stderr
+    return sum(int(microseconds) for microseconds in times) / 1000
+
+
+class TestStartup:
+    """Test suite for cold-start cost."""
+
+    def test_import_time_budget(self):
+        """Test that importing api and config stays within the budget (best of three runs)."""
+        best = min(import_time_ms() for _ in range(3))
+        assert best < IMPORT_BUDGET_MS, f"import api, config took {best:.1f} ms"
+
+    def test_import_loads_no_clients(self):
+        """Test that importing loads no HTTP stack or .env parser and reading the config loads only the parser."""
+        code = (
+            "import sys, api, config\n"
+            "loaded = lambda: ','.join(m for m in %r if m in sys.modules)\n"
+            "settings = config.get_config('dev')\n"
+            "print(loaded())\n"
+            "print(settings.BASE_URL)\n"
+            "print(loaded())" % (HEAVY_MODULES,)
+        )
+        output = run_python(code, env={"DEV_BASE_URL": "http://startup.test"}).stdout
+        imported, base_url, after_read = output.split("\n")[:3]
+        assert imported == ""
+        assert base_url == "http://startup.test"
+        assert after_read == "dotenv"
+
+    def test_lazy_exports(self):
+        """Test that exported classes import on first access and are kept on the package."""
+        from api.post_api import PostAPI
+
+        assert api.PostAPI is PostAPI
+        assert "PostAPI" in vars(api)
+        assert set(api.__all__) <= set(dir(api))
+        with pytest.raises(AttributeError):
+            api.MissingAPI
+
+
+class TestLazyConfig:
+    """Test suite for deferred, cached environment resolution."""
+
+    def test_resolved_on_first_access_and_cached(self):
+        """Test that settings read the environment when first accessed, once, until reset."""
+        code = (
+            "import os\n"
+            "from config.config import get_config, reset_config\n"
+            "os.environ['TIMEOUT'] = '9'\n"
+            "first = get_config().TIMEOUT\n"
+            "os.environ['TIMEOUT'] = '11'\n"
+            "cached = get_config('prod').TIMEOUT\n"
+            "reset_config()\n"
+            "print(first, cached, get_config().TIMEOUT)\n"
+        )
+        assert run_python(code, env={"TIMEOUT": "5"}).stdout.split() == ["9", "9", "11"]
+
+    def test_environment_specific_settings(self):
+        """Test that each environment class reads its own variables."""
+        code = "from config import get_config; print(get_config('dev').BASE_URL, get_config('staging').BASE_URL)"
+        env = {"DEV_BASE_URL": "http://dev.test", "STAGING_BASE_URL": "http://staging.test"}
+        assert run_python(code, env=env).stdout.split() == ["http://dev.test", "http://staging.test"]
+
+    def test_instance_override(self):
+        """Test that assigning a setting on one config leaves others untouched."""
+        config = get_config()
+        default = config.TIMEOUT
+        config.TIMEOUT = default + 1
+        assert config.TIMEOUT == default + 1
+        assert get_config().TIMEOUT == default
@@ -0,0 +1,127 @@
+"""
+Tests for the local stub server.
+"""
+
+import asyncio
+import time
+
+import pytest
+from api import AsyncPostAPI, CommentAPI, PostAPI, UserAPI
+from api.cache import MemoryCache
+from api.metrics import MetricsRecorder
+from perf.stub_server import StubServer, StubSettings, build_dataset
+from tests.conftest import config_for
+
+
+def client(cls, stub_config, **kwargs):
+    """Build a client on the stub with a private recorder."""
+    return cls(stub_config, metrics=MetricsRecorder(), **kwargs)
+
+
+class TestStubDataset:
+    """Test suite for the generated dataset."""
+
+    def test_sizes_follow_settings(self):
+        """Test that the dataset size is configurable."""
+        data = build_dataset(StubSettings(
+            users=3, posts_per_user=2, comments_per_post=4, todos_per_user=1, albums_per_user=2, photos_per_album=5
+        ))
+        names = ("users", "posts", "comments", "todos", "albums", "photos")
+        assert [len(data[name]) for name in names] == [3, 6, 24, 3, 6, 30]
+
+    def test_albums_leave_other_resources_unchanged(self):
+        """Test that album and photo settings do not change the rest of the dataset."""
+        small, large = build_dataset(StubSettings(albums_per_user=1)), build_dataset(StubSettings(albums_per_user=5))
+        assert all(small[name] == large[name] for name in ("users", "posts", "comments", "todos"))
+
+    def test_deterministic_per_seed(self):
+        """Test that the same seed always builds the same dataset."""
+        assert build_dataset(StubSettings(seed=7)) == build_dataset(StubSettings(seed=7))
+        assert build_dataset(StubSettings(seed=7)) != build_dataset(StubSettings(seed=8))
+
+
+class TestStubRoutes:
+    """Test suite for the routes the API clients call."""
+
+    def test_items_and_filters(self, stub_config):
+        """Test item lookups, field filters and nested routes."""
+        users, posts = client(UserAPI, stub_config), client(PostAPI, stub_config)
+        assert users.get_user(1).json()["id"] == 1
+        assert users.get_user(99999).status_code == 404
+        assert {post["userId"] for post in posts.get_posts_by_user(2).json()} == {2}
+        assert len(users.get_user_todos(1).json()) == 20
+        assert {comment["postId"] for comment in posts.get_post_comments(3).json()} == {3}
+        assert {photo["albumId"] for photo in users.get("/albums/4/photos").json()} == {4}
+        assert {album["userId"] for album in users.get_user_albums(2).json()} == {2}
+
+    def test_pagination(self, stub_config):
+        """Test that both paging styles walk the whole collection."""
+        comments = client(CommentAPI, stub_config)
+        total = len(comments.get_all_comments().json())
+        assert sum(1 for _ in comments.iter_comments(page_size=30)) == total
+        assert sum(1 for _ in comments.iter_comments(page_size=30, paging="range", incremental=True)) == total
+
+    def test_writes_echo_payload(self, stub_config):
+        """Test that writes echo the payload with an id."""
+        posts = client(PostAPI, stub_config)
+        created = posts.create_post({"title": "t", "userId": 1})
+        assert created.status_code == 201
+        assert created.json() == {"title": "t", "userId": 1, "id": 101}
+        assert posts.patch_post(1, {"title": "p"}).json()["body"]
+        assert posts.update_post(99999, {"title": "u"}).status_code == 404
+
+    def test_etag_revalidation(self, config):
+        """Test that stale cached GETs are revalidated with the stub's ETag."""
+        with StubServer(StubSettings(max_age=0)) as server:
+            posts = client(PostAPI, config_for(config, server), cache=MemoryCache())
+            first, second = posts.get_post(1), posts.get_post(1)
+            assert server.stats[304] == 1
+        assert not first.from_cache
+        assert second.from_cache
+        assert second.json() == first.json()
+
+    def test_async_clients(self, stub_config):
+        """Test that the async clients work against the stub."""
+        async def run():
+            async with AsyncPostAPI(stub_config, metrics=MetricsRecorder()) as api:
+                return await asyncio.gather(*(api.get_post(post_id) for post_id in range(1, 51)))
+
+        assert [response.json()["id"] for response in asyncio.run(run())] == list(range(1, 51))
+
+
+class TestStubFaults:
+    """Test suite for injected latency, errors and rate limiting."""
+
+    def test_latency(self, config):
+        """Test that every response is delayed by the configured latency."""
+        with StubServer(StubSettings(latency=0.05)) as server:
+            posts = client(PostAPI, config_for(config, server))
+            started = time.perf_counter()
+            posts.get_post(1)
+            assert time.perf_counter() - started >= 0.05
+
+    @pytest.mark.negative
+    def test_error_rate(self, config):
+        """Test that the configured fraction of requests fails with 500."""
+        with StubServer(StubSettings(error_rate=0.5, seed=3)) as server:
+            posts = client(PostAPI, config_for(config, server))
+            statuses = [posts.get_post(1).status_code for _ in range(200)]
+        assert 60 < statuses.count(500) < 140
+        assert set(statuses) == {200, 500}
+
+    @pytest.mark.negative
+    def test_rate_limit(self, config):
+        """Test that requests beyond the rate limit get 429 with Retry-After."""
+        with StubServer(StubSettings(rate_limit=1, rate_limit_burst=5)) as server:
+            posts = client(PostAPI, config_for(config, server))
+            responses = [posts.get_post(1) for _ in range(8)]
+            assert server.stats[429] == 3
+        assert [response.status_code for response in responses] == [200] * 5 + [429] * 3
+        assert int(responses[-1].headers["Retry-After"]) >= 1
+
+    @pytest.mark.negative
+    def test_start_raises_when_port_taken(self):
+        """Test that a server that cannot bind raises from start instead of hanging."""
+        with StubServer(StubSettings(users=1)) as server:
+            with pytest.raises(OSError):
+                StubServer(StubSettings(users=1), port=server.port).start(timeout=5)
@@ -0,0 +1,116 @@
+"""
+Tests for columnar tables.
+"""
+
+import time
+from array import array
+
+import pytest
+from api.table import Table, TableAssertionError
+from perf.stub_server import StubSettings, build_dataset
+
+
+@pytest.fixture(scope="module")
+def dataset():
+    """Build a stub dataset shaped like JSONPlaceholder's."""
+    return build_dataset(StubSettings(users=5, posts_per_user=4, comments_per_post=3))
+
+
+@pytest.fixture
+def tables(dataset):
+    """Build users, posts and comments tables."""
+    return (
+        Table.from_records(dataset["users"], ["id", "username", "address.geo.lat"], name="users"),
+        Table.from_records(dataset["posts"], name="posts"),
+        Table.from_records(dataset["comments"], name="comments"),
+    )
+
+
+class TestTable:
+    """Test suite for building and querying tables."""
+
+    def test_columns_are_compact(self, tables):
+        """Test that numeric columns are packed and others kept as lists."""
+        users, posts, _ = tables
+        assert len(posts) == 20
+        assert list(posts.columns) == ["userId", "id", "title", "body"]
+        assert isinstance(posts["id"], array) or hasattr(posts["id"], "dtype")
+        assert isinstance(posts["title"], list)
+        assert users.records()[0]["address.geo.lat"] is not None
+
+    def test_round_trip(self, dataset, tables):
+        """Test that records come back unchanged."""
+        _, posts, _ = tables
+        assert posts.records() == dataset["posts"]
+
+    def test_index_and_where(self, tables):
+        """Test hash index lookups."""
+        _, posts, _ = tables
+        assert posts.index("userId")[2] == [4, 5, 6, 7]
+        assert [post["id"] for post in posts.where("userId", 2).records()] == [5, 6, 7, 8]
+        assert len(posts.where("userId", 99)) == 0
+        assert len(posts.filter("id", lambda value: value % 2 == 0)) == 10
+
+    def test_group_counts(self, tables):
+        """Test group counts and group splits."""
+        _, posts, comments = tables
+        assert posts.count_by("userId") == {1: 4, 2: 4, 3: 4, 4: 4, 5: 4}
+        posts.assert_counts("userId", 4)
+        comments.assert_counts("postId", 3)
+        assert {user_id: len(group) for user_id, group in posts.group_by("userId").items()} == posts.count_by("userId")
+
+    def test_join(self, tables):
+        """Test inner and left joins on unique and repeated keys."""
+        users, posts, comments = tables
+        joined = comments.join(posts, "postId")
+        assert len(joined) == len(comments)
+        assert all(record["postId"] == record["id_right"] for record in joined.records())
+        fan_out = posts.join(comments, "id", "postId")
+        assert len(fan_out) == len(comments)
+        partial = posts.take(range(0, 20, 5))
+        assert len(comments.join(partial, "postId")) == 12
+        left = comments.join(partial, "postId", how="left")
+        assert len(left) == len(comments)
+        assert sum(record["title"] is None for record in left.records()) == len(comments) - 12
+        with pytest.raises(ValueError):
+            comments.join(posts, "postId", how="outer")
+
+
+class TestTableAssertions:
+    """Test suite for uniqueness and referential integrity assertions."""
+
+    def test_valid_dataset(self, tables):
+        """Test that the generated dataset passes every check."""
+        users, posts, comments = tables
+        comments.assert_references("postId", posts)
+        posts.assert_references("userId", users)
+        for table in tables:
+            table.assert_unique("id")
+            assert table.is_unique("id")
+
+    @pytest.mark.negative
+    def test_reports_offending_values(self, dataset):
+        """Test that duplicates and dangling references are listed."""
+        posts = Table.from_records(dataset["posts"] + [{**dataset["posts"][0], "userId": 42}], name="posts")
+        users = Table.from_records(dataset["users"], name="users")
+        assert posts.duplicates("id") == [1]
+        assert posts.missing_references("userId", users) == [42]
+        with pytest.raises(AssertionError, match=r"posts.id has 1 duplicated value\(s\): 1"):
+            posts.assert_unique("id")
+        with pytest.raises(TableAssertionError, match="posts.userId has 1 value"):
+            posts.assert_references("userId", users)
+        with pytest.raises(TableAssertionError) as error:
+            posts.assert_counts("userId", 4)
+        assert error.value.values == [42]
+
+    def test_large_dataset_is_linear(self):
+        """Test that integrity checks over 100k comments take well under a second."""
+        data = build_dataset(StubSettings(users=20, posts_per_user=100, comments_per_post=50))
+        posts = Table.from_records(data["posts"], name="posts")
+        comments = Table.from_records(data["comments"], ["id", "postId"], name="comments")
+        started = time.perf_counter()
+        comments.assert_references("postId", posts)
+        comments.assert_unique("id")
+        comments.assert_counts("postId", 50)
+        assert len(comments.join(posts, "postId")) == 100_000
+        assert time.perf_counter() - started < 1.0
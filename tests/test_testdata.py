@@ -0,0 +1,73 @@
+"""
+Tests for the seeded test-data generator.
+"""
+
+import itertools
+import tracemalloc
+
+import pytest
+from schemas import COMMENT, POST, USER
+from testdata import MALFORMED_EMAILS, TITLE_LENGTHS, PayloadGenerator
+
+SCHEMAS = {"user": USER, "post": POST, "comment": COMMENT}
+
+
+class TestPayloadGenerator:
+    """Test suite for PayloadGenerator."""
+
+    def test_same_seed_same_cases(self):
+        """Test that cases depend only on the seed and index."""
+        first, second = PayloadGenerator(seed=7), PayloadGenerator(seed=7)
+        assert list(first.cases("post", 50, invalid_ratio=0.5)) == list(second.cases("post", 50, invalid_ratio=0.5))
+        assert first.case("comment", 12_345) == second.case("comment", 12_345)
+        assert list(first.cases("user", 5, start=100)) == [first.case("user", index) for index in range(100, 105)]
+        assert PayloadGenerator(seed=8).post(3) != first.post(3)
+
+    @pytest.mark.parametrize("kind", PayloadGenerator.KINDS)
+    def test_valid_payloads_match_schema(self, kind):
+        """Test that valid payloads pass the resource schema once the server adds an id."""
+        for case in PayloadGenerator(seed=1).cases(kind, 500):
+            assert case.valid
+            SCHEMAS[kind].assert_valid({"id": 1, **case.payload})
+
+    @pytest.mark.negative
+    @pytest.mark.parametrize("kind", PayloadGenerator.KINDS)
+    def test_invalid_payloads_fail_schema(self, kind):
+        """Test that every invalid payload is rejected by the schema, covering every defect."""
+        generator = PayloadGenerator(seed=1)
+        reasons = set()
+        for index in range(500):
+            case = generator.invalid(kind, index)
+            assert not case.valid
+            assert SCHEMAS[kind].validate({"id": 1, **case.payload}), case
+            reasons.add(case.reason)
+        assert len(reasons) >= 4
+
+    def test_invalid_ratio(self):
+        """Test that roughly the requested share of cases is invalid."""
+        cases = list(PayloadGenerator().cases("comment", 2000, invalid_ratio=0.25))
+        assert 400 < sum(not case.valid for case in cases) < 600
+        with pytest.raises(ValueError):
+            PayloadGenerator().case("album", 0)
+
+    def test_boundaries(self):
+        """Test the boundary-length titles and malformed emails."""
+        generator = PayloadGenerator()
+        assert [len(case.payload["title"]) for case in generator.title_lengths()] == list(TITLE_LENGTHS)
+        emails = list(generator.malformed_emails(extra=20))
+        assert [case.payload["email"] for case in emails[:len(MALFORMED_EMAILS)]] == list(MALFORMED_EMAILS)
+        assert len(emails) == len(MALFORMED_EMAILS) + 20
+        assert all(not USER.check({"id": 1, **case.payload}) for case in emails)
+        assert str(emails[0]) == "user-0-malformed-email"
+
+    def test_streaming_keeps_memory_flat(self):
+        """Test that consuming 100k streamed cases never holds them all."""
+        tracemalloc.start()
+        try:
+            for _ in PayloadGenerator().cases("post", 100_000, invalid_ratio=0.1):
+                pass
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        assert peak < 1_000_000
+        assert len(list(itertools.islice(PayloadGenerator().cases("user"), 3))) == 3
@@ -0,0 +1,177 @@
+"""
+Tests for the record/replay transports and cassette store.
+"""
+
+import asyncio
+import copy
+import threading
+
+import httpx
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+from api import PostAPI
+from api.metrics import MetricsRecorder
+from api.retry import RETRY_ERRORS
+from api.transport import (
+    AsyncRecordingTransport,
+    AsyncReplayTransport,
+    Cassette,
+    CassetteMissError,
+    RecordingAdapter,
+    ReplayAdapter,
+    request_key,
+)
+
+
+class FakeAdapter(BaseAdapter):
+    """Adapter stand-in answering every request with a JSON echo of its method and URL."""
+
+    def __init__(self):
+        super().__init__()
+        self.sent = 0
+
+    def send(self, request, **kwargs):
+        self.sent += 1
+        response = requests.Response()
+        response.request = request
+        response.url = request.url
+        response.status_code = 201 if request.method == "POST" else 200
+        response.reason = "OK"
+        response.headers["Content-Type"] = "application/json; charset=utf-8"
+        response.headers["Content-Encoding"] = "gzip"
+        response._content = f'{{"method": "{request.method}", "url": "{request.url}"}}'.encode()
+        return response
+
+    def close(self):
+        pass
+
+
+def session_with(adapter) -> requests.Session:
+    """Build a session sending every request through ``adapter``."""
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def make_client(config, adapter) -> PostAPI:
+    """Build a PostAPI on ``adapter`` with a private recorder."""
+    return PostAPI(config, session=session_with(adapter), metrics=MetricsRecorder())
+
+
+class TestRequestKey:
+    """Test suite for request keys."""
+
+    def test_query_order_ignored(self):
+        """Test that parameter order does not change the key."""
+        assert request_key("GET", "https://x.test/posts?b=2&a=1") == request_key("GET", "https://x.test/posts?a=1&b=2")
+
+    def test_json_body_canonicalized(self):
+        """Test that JSON key order and spacing do not change the key."""
+        first = request_key("POST", "https://x.test/posts", b'{"a": 1, "b": 2}', "application/json")
+        second = request_key("POST", "https://x.test/posts", b'{"b":2,"a":1}', "application/json")
+        assert first == second
+
+    def test_body_and_method_distinguish(self):
+        """Test that different bodies and methods get different keys."""
+        url = "https://x.test/posts"
+        assert request_key("POST", url, b'{"a": 1}', "application/json") != request_key("POST", url, b'{"a": 2}')
+        assert request_key("GET", url) != request_key("DELETE", url)
+
+
+class TestCassette:
+    """Test suite for recording and replaying through the cassette store."""
+
+    def test_record_then_replay(self, config, tmp_path):
+        """Test that recorded responses replay without the live adapter."""
+        path = str(tmp_path / "api.cassette")
+        live = FakeAdapter()
+        recording = make_client(config, RecordingAdapter(live, Cassette(path)))
+        recorded = [recording.get_post(1), recording.create_post({"title": "t", "userId": 1})]
+        recording.session.close()
+
+        replayer = make_client(config, ReplayAdapter(Cassette(path)))
+        replayed = [replayer.get_post(1), replayer.create_post({"userId": 1, "title": "t"})]
+        assert live.sent == 2
+        assert [response.status_code for response in replayed] == [200, 201]
+        assert [response.json() for response in replayed] == [response.json() for response in recorded]
+        assert "Content-Encoding" not in replayed[0].headers
+
+    @pytest.mark.negative
+    def test_replay_miss_raises(self, config, tmp_path):
+        """Test that an unrecorded request fails instead of going to the network."""
+        api = make_client(config, ReplayAdapter(Cassette(str(tmp_path / "empty.cassette"))))
+        with pytest.raises(CassetteMissError):
+            api.get_post(99)
+
+    @pytest.mark.negative
+    def test_replay_miss_not_retried(self, config, tmp_path, caplog):
+        """Test that a replay miss fails on the first attempt even when retries are enabled."""
+        config = copy.copy(config)
+        config.RETRY_TOTAL = 3
+        api = make_client(config, ReplayAdapter(Cassette(str(tmp_path / "empty.cassette"))))
+        with pytest.raises(CassetteMissError):
+            api.get_post(99)
+        assert not isinstance(CassetteMissError(), RETRY_ERRORS)
+        assert "Retrying" not in caplog.text
+
+    def test_replay_during_save(self, tmp_path):
+        """Test that lookups running while another thread saves always see the recorded response."""
+        path = str(tmp_path / "api.cassette")
+        key = request_key("GET", "https://x.test/a")
+        cassette = Cassette(path)
+        cassette.put(key, b"\x02\x00\x00\x00{}a")
+        cassette.save()
+        stop = threading.Event()
+
+        def save_repeatedly():
+            for index in range(50):
+                cassette.put(request_key("GET", f"https://x.test/{index}"), b"\x02\x00\x00\x00{}b")
+                cassette.save()
+            stop.set()
+
+        saver = threading.Thread(target=save_repeatedly)
+        saver.start()
+        try:
+            while not stop.is_set():
+                assert cassette.get(key) == ({}, b"a")
+        finally:
+            saver.join()
+
+    def test_saves_merge(self, tmp_path):
+        """Test that separate recorders add to the same cassette file."""
+        path = str(tmp_path / "api.cassette")
+        first, second = Cassette(path), Cassette(path)
+        first.put(request_key("GET", "https://x.test/a"), b"\x02\x00\x00\x00{}a")
+        second.put(request_key("GET", "https://x.test/b"), b"\x02\x00\x00\x00{}b")
+        first.save()
+        second.save()
+        cassette = Cassette(path)
+        assert len(cassette) == 2
+        assert cassette.get(request_key("GET", "https://x.test/a")) == ({}, b"a")
+        assert cassette.get(request_key("GET", "https://x.test/c")) is None
+
+    @pytest.mark.negative
+    def test_rejects_foreign_file(self, tmp_path):
+        """Test that a file that is not a cassette is refused."""
+        path = tmp_path / "other.cassette"
+        path.write_bytes(b"x" * 64)
+        with pytest.raises(ValueError):
+            Cassette(str(path))
+
+    def test_async_record_then_replay(self, tmp_path):
+        """Test that the httpx transports record and replay through the same store."""
+        path = str(tmp_path / "api.cassette")
+
+        async def live(request):
+            return httpx.Response(200, json={"id": 1}, headers={"ETag": '"v1"'})
+
+        async def fetch(transport):
+            async with httpx.AsyncClient(transport=transport) as client:
+                return await client.get("https://x.test/posts/1", params={"b": 2, "a": 1})
+
+        recorded = asyncio.run(fetch(AsyncRecordingTransport(httpx.MockTransport(live), Cassette(path))))
+        replayed = asyncio.run(fetch(AsyncReplayTransport(Cassette(path))))
+        assert replayed.json() == recorded.json() == {"id": 1}
+        assert replayed.headers["ETag"] == '"v1"'
@@ -4,6 +4,7 @@ Tests for User API endpoints.
 
 import pytest
 from api import UserAPI
+from schemas import USER
 
 
 class TestUsersAPI:
@@ -24,8 +25,7 @@ class TestUsersAPI:
         assert response.status_code == 200
         user = response.json()
         assert user["id"] == 1
-        assert "name" in user
-        assert "email" in user
+        USER.assert_valid(user)
 
     @pytest.mark.positive
     def test_create_user(self, user_api: UserAPI):